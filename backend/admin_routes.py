@@ -1,12 +1,14 @@
 """Admin management endpoints for platform statistics and monitoring"""
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Literal
 from bson import ObjectId
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 import database
+from platform_stats import get_platform_stats, record_role_change
+from archive import count_with_archive
 from schemas import UserInDB, UserResponse
 from utils import as_response, get_current_user
 
@@ -29,39 +31,97 @@ def require_admin(current_user: UserInDB = Depends(get_current_user)) -> UserInD
 
 @router.get("/admin/stats")
 async def get_admin_stats(current_user: UserInDB = Depends(require_admin)):
-    """Get platform-wide statistics for admin dashboard"""
+    """Get platform-wide statistics for admin dashboard
 
-    # Count total managers
-    total_managers = await database.users_collection.count_documents(
-        {"role": "manager"}
-    )
+    Served from the materialized platform_stats snapshot (see platform_stats),
+    which is at most PLATFORM_STATS_MAX_AGE_SECONDS behind a full reconcile.
+    """
+    stats = await get_platform_stats()
+    stats["pending_tasks"] = max(0, stats["total_tasks"] - stats["completed_tasks"])
+    return stats
 
-    # Count total annotators
-    total_annotators = await database.users_collection.count_documents(
-        {"role": "annotator"}
-    )
 
-    # Count total projects
-    total_projects = await database.projects_collection.count_documents({})
+def _project_totals_lookup(local_field: str, foreign_field: str, as_field: str):
+    """$lookup summing the project counters of the joined projects.
+
+    Task totals come from the incrementally maintained project counters (see
+    project_counters), so listing pages never count the tasks collections.
+    """
+    return {
+        "$lookup": {
+            "from": "projects",
+            "localField": local_field,
+            "foreignField": foreign_field,
+            "pipeline": [
+                {
+                    "$group": {
+                        "_id": None,
+                        "project_count": {"$sum": 1},
+                        "total_tasks": {"$sum": {"$ifNull": ["$counters.total", 0]}},
+                        "completed_tasks": {
+                            "$sum": {"$ifNull": ["$counters.completed", 0]}
+                        },
+                    }
+                }
+            ],
+            "as": as_field,
+        }
+    }
+
+
+def _task_role_counts(role_field: str, done_field: str, prefix: str) -> List[Dict]:
+    """Pipeline counting assigned and done tasks per user for one workflow role.
+
+    Matches on the partial ``(<role_field>, <done_field>)`` index, so the group
+    is fed by an index scan rather than by task documents.
+    """
+    return [
+        {"$match": {role_field: {"$exists": True}}},
+        {
+            "$group": {
+                "_id": f"${role_field}",
+                f"{prefix}_tasks": {"$sum": 1},
+                f"{prefix}_done": {"$sum": {"$cond": [f"${done_field}", 1, 0]}},
+            }
+        },
+    ]
 
-    # Count total tasks
-    total_tasks = await database.tasks_collection.count_documents({})
 
-    # Count completed tasks (where both annotator and QA parts are done)
-    completed_tasks = await database.tasks_collection.count_documents(
-        {"completed_status.annotator_part": True, "completed_status.qa_part": True}
+async def _annotator_task_counts() -> Dict[ObjectId, Dict[str, int]]:
+    """Per-user annotation and QA task counts across both tiers in one aggregate."""
+    annotate = _task_role_counts(
+        "assigned_annotator_id", "completed_status.annotator_part", "annotate"
     )
+    qa = _task_role_counts("assigned_qa_id", "completed_status.qa_part", "qa")
+    pipeline = [
+        *annotate,
+        {"$unionWith": {"coll": "tasks", "pipeline": qa}},
+        {"$unionWith": {"coll": database.archive_name("tasks"), "pipeline": annotate}},
+        {"$unionWith": {"coll": database.archive_name("tasks"), "pipeline": qa}},
+        {
+            "$group": {
+                "_id": "$_id",
+                "assigned_tasks": {"$sum": "$annotate_tasks"},
+                "completed_tasks": {"$sum": "$annotate_done"},
+                "qa_tasks": {"$sum": "$qa_tasks"},
+                "qa_completed": {"$sum": "$qa_done"},
+            }
+        },
+    ]
+    return {
+        row.pop("_id"): row
+        async for row in database.tasks_collection.aggregate(pipeline)
+    }
 
-    # Count pending tasks
-    pending_tasks = total_tasks - completed_tasks
 
+async def _accepted_invite_counts(group_field: str) -> Dict[ObjectId, int]:
+    pipeline = [
+        {"$match": {"accepted_status": True}},
+        {"$group": {"_id": f"${group_field}", "count": {"$sum": 1}}},
+    ]
     return {
-        "total_managers": total_managers,
-        "total_annotators": total_annotators,
-        "total_projects": total_projects,
-        "total_tasks": total_tasks,
-        "completed_tasks": completed_tasks,
-        "pending_tasks": pending_tasks,
+        row["_id"]: row["count"]
+        async for row in database.invites_collection.aggregate(pipeline)
     }
 
 
@@ -69,45 +129,22 @@ async def get_admin_stats(current_user: UserInDB = Depends(require_admin)):
 async def get_all_managers(current_user: UserInDB = Depends(require_admin)):
     """Get all managers with their project counts"""
 
-    managers = await database.users_collection.find({"role": "manager"}).to_list(None)
+    pipeline = [
+        {"$match": {"role": "manager"}},
+        _project_totals_lookup("_id", "manager_id", "project_totals"),
+    ]
 
     result = []
-    for manager in managers:
-        # Count projects created by this manager
-        project_count = await database.projects_collection.count_documents(
-            {"manager_id": manager["_id"]}
-        )
-
-        # Get list of projects for this manager
-        projects = await database.projects_collection.find(
-            {"manager_id": manager["_id"]}
-        ).to_list(None)
-
-        # Calculate total tasks across all projects
-        total_tasks = 0
-        completed_tasks = 0
-        for project in projects:
-            task_count = await database.tasks_collection.count_documents(
-                {"project_id": project["_id"]}
-            )
-            total_tasks += task_count
-
-            completed_count = await database.tasks_collection.count_documents(
-                {
-                    "project_id": project["_id"],
-                    "completed_status.annotator_part": True,
-                    "completed_status.qa_part": True,
-                }
-            )
-            completed_tasks += completed_count
-
+    async for manager in database.users_collection.aggregate(pipeline):
+        totals = manager.pop("project_totals")
+        totals = totals[0] if totals else {}
         manager_data = as_response(UserResponse, manager)
         result.append(
             {
                 **manager_data.model_dump(),
-                "project_count": project_count,
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
+                "project_count": totals.get("project_count", 0),
+                "total_tasks": totals.get("total_tasks", 0),
+                "completed_tasks": totals.get("completed_tasks", 0),
                 "created_at": manager.get("created_at", None),
             }
         )
@@ -122,46 +159,21 @@ async def get_all_annotators(current_user: UserInDB = Depends(require_admin)):
     annotators = await database.users_collection.find({"role": "annotator"}).to_list(
         None
     )
+    task_counts = await _annotator_task_counts()
+    invited_projects = await _accepted_invite_counts("user_id")
 
     result = []
     for annotator in annotators:
-        # Count tasks assigned to this annotator
-        assigned_tasks = await database.tasks_collection.count_documents(
-            {"assigned_annotator_id": annotator["_id"]}
-        )
-
-        # Count completed tasks by this annotator
-        completed_tasks = await database.tasks_collection.count_documents(
-            {
-                "assigned_annotator_id": annotator["_id"],
-                "completed_status.annotator_part": True,
-            }
-        )
-
-        # Count tasks where they are assigned as QA
-        qa_tasks = await database.tasks_collection.count_documents(
-            {"assigned_qa_id": annotator["_id"]}
-        )
-
-        # Count completed QA tasks
-        qa_completed = await database.tasks_collection.count_documents(
-            {"assigned_qa_id": annotator["_id"], "completed_status.qa_part": True}
-        )
-
-        # Count projects they're invited to
-        invited_projects = await database.invites_collection.count_documents(
-            {"user_id": annotator["_id"], "accepted_status": True}
-        )
-
+        counts = task_counts.get(annotator["_id"], {})
         annotator_data = as_response(UserResponse, annotator)
         result.append(
             {
                 **annotator_data.model_dump(),
-                "assigned_tasks": assigned_tasks,
-                "completed_tasks": completed_tasks,
-                "qa_tasks": qa_tasks,
-                "qa_completed": qa_completed,
-                "invited_projects": invited_projects,
+                "assigned_tasks": counts.get("assigned_tasks", 0),
+                "completed_tasks": counts.get("completed_tasks", 0),
+                "qa_tasks": counts.get("qa_tasks", 0),
+                "qa_completed": counts.get("qa_completed", 0),
+                "invited_projects": invited_projects.get(annotator["_id"], 0),
                 "created_at": annotator.get("created_at", None),
             }
         )
@@ -173,44 +185,52 @@ async def get_all_annotators(current_user: UserInDB = Depends(require_admin)):
 async def get_all_projects_admin(current_user: UserInDB = Depends(require_admin)):
     """Get all projects with detailed statistics for admin"""
 
-    projects = await database.projects_collection.find().to_list(None)
-
-    result = []
-    for project in projects:
-        # Get manager info
-        manager = await database.users_collection.find_one(
-            {"_id": project["manager_id"]}
-        )
-        manager_name = manager["name"] if manager else "Unknown"
-
-        # Count tasks
-        total_tasks = await database.tasks_collection.count_documents(
-            {"project_id": project["_id"]}
-        )
-
-        completed_tasks = await database.tasks_collection.count_documents(
-            {
-                "project_id": project["_id"],
-                "completed_status.annotator_part": True,
-                "completed_status.qa_part": True,
+    pipeline = [
+        {
+            "$lookup": {
+                "from": "users",
+                "localField": "manager_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"_id": 0, "name": 1}}],
+                "as": "manager",
             }
-        )
-
-        # Count invited annotators
-        invited_count = await database.invites_collection.count_documents(
-            {"project_id": project["_id"], "accepted_status": True}
-        )
+        },
+        {
+            "$lookup": {
+                "from": "invites",
+                "localField": "_id",
+                "foreignField": "project_id",
+                "pipeline": [{"$match": {"accepted_status": True}}, {"$count": "n"}],
+                "as": "invited",
+            }
+        },
+        {
+            "$project": {
+                "details": 1,
+                "category": 1,
+                "manager_id": 1,
+                "counters": 1,
+                "created_at": 1,
+                "is_completed": 1,
+                "manager_name": {"$first": "$manager.name"},
+                "invited_annotators": {"$first": "$invited.n"},
+            }
+        },
+    ]
 
+    result = []
+    async for project in database.projects_collection.aggregate(pipeline):
+        counters = project.get("counters") or {}
         result.append(
             {
                 "id": str(project["_id"]),
                 "details": project.get("details", ""),
                 "category": project.get("category", ""),
                 "manager_id": str(project["manager_id"]),
-                "manager_name": manager_name,
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-                "invited_annotators": invited_count,
+                "manager_name": project.get("manager_name") or "Unknown",
+                "total_tasks": counters.get("total", 0),
+                "completed_tasks": counters.get("completed", 0),
+                "invited_annotators": project.get("invited_annotators") or 0,
                 "created_at": project.get("created_at", None),
                 "is_completed": project.get("is_completed", False),
             }
@@ -223,13 +243,24 @@ async def get_all_projects_admin(current_user: UserInDB = Depends(require_admin)
 async def get_all_users(current_user: UserInDB = Depends(require_admin)):
     """Get all users (non-admin) for admin management"""
 
-    # Get all users except admins
-    users = await database.users_collection.find(
-        {"role": {"$in": ["manager", "annotator"]}}
-    ).to_list(None)
+    # Get all users except admins, with project counts (only reported for managers)
+    pipeline = [
+        {"$match": {"role": {"$in": ["manager", "annotator"]}}},
+        {
+            "$lookup": {
+                "from": "projects",
+                "localField": "_id",
+                "foreignField": "manager_id",
+                "pipeline": [{"$count": "n"}],
+                "as": "projects",
+            }
+        },
+        {"$set": {"project_count": {"$first": "$projects.n"}}},
+        {"$project": {"projects": 0, "hashed_password": 0}},
+    ]
 
     result = []
-    for user in users:
+    async for user in database.users_collection.aggregate(pipeline):
         user_data = {
             "id": str(user["_id"]),
             "name": user.get("name", ""),
@@ -243,11 +274,7 @@ async def get_all_users(current_user: UserInDB = Depends(require_admin)):
             user_data["skills"] = user.get("skills", [])
         elif user.get("role") == "manager":
             user_data["paid"] = user.get("paid", False)
-            # Count projects for manager
-            project_count = await database.projects_collection.count_documents(
-                {"manager_id": user["_id"]}
-            )
-            user_data["project_count"] = project_count
+            user_data["project_count"] = user.get("project_count") or 0
 
         result.append(user_data)
 
@@ -311,6 +338,7 @@ async def promote_user_to_admin(
             "$unset": {"skills": "", "paid": ""},  # Remove role-specific fields
         },
     )
+    await record_role_change(user.get("role"), "admin")
 
     # Get updated user
     updated_user = await database.users_collection.find_one(
@@ -367,6 +395,7 @@ async def demote_admin_to_manager(
     await database.users_collection.update_one(
         {"_id": ObjectId(request.user_id)}, {"$set": {"role": "manager", "paid": False}}
     )
+    await record_role_change("admin", "manager")
 
     # Get updated user
     updated_user = await database.users_collection.find_one(
@@ -384,108 +413,179 @@ async def demote_admin_to_manager(
     }
 
 
-@router.get("/admin/growth-data")
-async def get_growth_data(current_user: UserInDB = Depends(require_admin)):
-    """Get growth data for tasks, managers, and annotators over time"""
+GROWTH_MAX_BUCKETS = 366
+WEEKDAY_NAMES = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+
+def _bucket_starts(today: datetime, granularity: str, count: int) -> List[datetime]:
+    """Start dates of the ``count`` most recent buckets, oldest first.
+
+    Day and week buckets end today (weeks are the 7-day periods ending today);
+    month buckets are calendar months.
+    """
+    if granularity == "month":
+        starts = []
+        year, month = today.year, today.month
+        for _ in range(count):
+            starts.insert(0, datetime(year, month, 1))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        return starts
+    step = 7 if granularity == "week" else 1
+    first = today - timedelta(days=step - 1)
+    return [first - timedelta(days=step * i) for i in range(count - 1, -1, -1)]
+
+
+def _trunc(granularity: str, today: datetime) -> Dict[str, Any]:
+    expr: Dict[str, Any] = {"date": "$created_at", "unit": granularity}
+    if granularity == "week":
+        # Align weeks so the latest one ends today
+        expr["startOfWeek"] = WEEKDAY_NAMES[(today.weekday() + 1) % 7]
+    return {"$dateTrunc": expr}
+
+
+def _growth_facets(
+    series_granularity: str,
+    since: datetime,
+    weeks_since: datetime,
+    today: datetime,
+    amount: Any = 1,
+) -> Dict[str, Any]:
+    """$facet summing ``amount`` by created_at into the series and weekly buckets."""
+    return {
+        "$facet": {
+            "series": [
+                {"$match": {"created_at": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "role": "$role",
+                            "bucket": _trunc(series_granularity, today),
+                        },
+                        "count": {"$sum": amount},
+                    }
+                },
+            ],
+            "weekly": [
+                {"$match": {"created_at": {"$gte": weeks_since}}},
+                {
+                    "$group": {
+                        "_id": {"role": "$role", "bucket": _trunc("week", today)},
+                        "count": {"$sum": amount},
+                    }
+                },
+            ],
+        }
+    }
 
-    now = datetime.utcnow()
-    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    # Initialize data for past 30 days
-    daily_data = {}
-    for i in range(30):
-        date = start_of_today - timedelta(days=29 - i)
-        date_str = date.strftime("%Y-%m-%d")
-        daily_data[date_str] = {
-            "date": date_str,
-            "tasks_created": 0,
-            "managers_registered": 0,
-            "annotators_registered": 0,
-            "cumulative_tasks": 0,
-            "cumulative_managers": 0,
-            "cumulative_annotators": 0,
+async def _growth_counts(collection, pipeline: List[Dict]) -> Dict[str, Dict]:
+    """Run a growth pipeline and index its rows as {facet: {(role, bucket): count}}."""
+    rows = await collection.aggregate(pipeline).to_list(1)
+    facets = rows[0] if rows else {}
+    return {
+        name: {
+            (row["_id"].get("role"), row["_id"]["bucket"]): row["count"]
+            for row in facets.get(name, [])
         }
+        for name in ("series", "weekly")
+    }
 
-    # Get all tasks with created_at
-    tasks = await database.tasks_collection.find(
-        {"created_at": {"$exists": True}}
-    ).to_list(None)
-
-    # Get all managers with created_at
-    managers = await database.users_collection.find(
-        {"role": "manager", "created_at": {"$exists": True}}
-    ).to_list(None)
-
-    # Get all annotators with created_at
-    annotators = await database.users_collection.find(
-        {"role": "annotator", "created_at": {"$exists": True}}
-    ).to_list(None)
-
-    # Count tasks by date
-    for task in tasks:
-        created_at = task.get("created_at")
-        if created_at:
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-            date_str = created_at.strftime("%Y-%m-%d")
-            if date_str in daily_data:
-                daily_data[date_str]["tasks_created"] += 1
-
-    # Count managers by date
-    for manager in managers:
-        created_at = manager.get("created_at")
-        if created_at:
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-            date_str = created_at.strftime("%Y-%m-%d")
-            if date_str in daily_data:
-                daily_data[date_str]["managers_registered"] += 1
-
-    # Count annotators by date
-    for annotator in annotators:
-        created_at = annotator.get("created_at")
-        if created_at:
-            if isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-            date_str = created_at.strftime("%Y-%m-%d")
-            if date_str in daily_data:
-                daily_data[date_str]["annotators_registered"] += 1
-
-    # Calculate cumulative totals
-    # First, count everything before the 30-day window
-    thirty_days_ago = start_of_today - timedelta(days=29)
-
-    tasks_before = await database.tasks_collection.count_documents(
-        {"created_at": {"$lt": thirty_days_ago}}
-    )
-    managers_before = await database.users_collection.count_documents(
-        {"role": "manager", "created_at": {"$lt": thirty_days_ago}}
+
+@router.get("/admin/growth-data")
+async def get_growth_data(
+    window: int = 30,
+    granularity: Literal["day", "week", "month"] = "day",
+    weeks: int = 12,
+    current_user: UserInDB = Depends(require_admin),
+):
+    """Get growth data for tasks, managers, and annotators over time
+
+    ``daily_data`` holds the last ``window`` buckets of ``granularity`` with
+    cumulative totals; ``weekly_data`` the last ``weeks`` 7-day periods. Both
+    are grouped in the database: task creations from the daily rollups,
+    registrations from the (role, created_at) index.
+    """
+    window = max(1, min(window, GROWTH_MAX_BUCKETS))
+    weeks = max(1, min(weeks, GROWTH_MAX_BUCKETS // 7))
+
+    now = datetime.utcnow()
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    series_starts = _bucket_starts(start_of_today, granularity, window)
+    week_starts = _bucket_starts(start_of_today, "week", weeks)
+    since = series_starts[0]
+    since_all = min(since, week_starts[0])
+
+    task_counts = await _growth_counts(
+        database.daily_rollups_collection,
+        [
+            {
+                "$match": {
+                    "day": {"$gte": since_all},
+                    "user_id": None,
+                    "tasks_created": {"$gt": 0},
+                }
+            },
+            {"$project": {"_id": 0, "created_at": "$day", "tasks_created": 1}},
+            _growth_facets(
+                granularity,
+                since,
+                week_starts[0],
+                start_of_today,
+                amount="$tasks_created",
+            ),
+        ],
     )
-    annotators_before = await database.users_collection.count_documents(
-        {"role": "annotator", "created_at": {"$lt": thirty_days_ago}}
+    # Index-only: the range match and the role/created_at projection are
+    # answered from the (role, created_at) index
+    user_counts = await _growth_counts(
+        database.users_collection,
+        [
+            {
+                "$match": {
+                    "role": {"$in": ["manager", "annotator"]},
+                    "created_at": {"$gte": since_all},
+                }
+            },
+            {"$project": {"_id": 0, "role": 1, "created_at": 1}},
+            _growth_facets(granularity, since, week_starts[0], start_of_today),
+        ],
     )
 
-    # Also count users without created_at (legacy users)
-    tasks_no_date = await database.tasks_collection.count_documents(
-        {"created_at": {"$exists": False}}
-    )
-    managers_no_date = await database.users_collection.count_documents(
-        {"role": "manager", "created_at": {"$exists": False}}
+    def bucket_counts(facet: str, bucket: datetime) -> Dict[str, int]:
+        return {
+            "tasks_created": task_counts[facet].get((None, bucket), 0),
+            "managers_registered": user_counts[facet].get(("manager", bucket), 0),
+            "annotators_registered": user_counts[facet].get(("annotator", bucket), 0),
+        }
+
+    # Cumulative totals start from everything created before the window,
+    # including legacy documents without created_at
+    before = {
+        "$or": [{"created_at": {"$lt": since}}, {"created_at": {"$exists": False}}]
+    }
+    cumulative_tasks = await count_with_archive("tasks", before)
+    cumulative_managers = await database.users_collection.count_documents(
+        {"role": "manager", **before}
     )
-    annotators_no_date = await database.users_collection.count_documents(
-        {"role": "annotator", "created_at": {"$exists": False}}
+    cumulative_annotators = await database.users_collection.count_documents(
+        {"role": "annotator", **before}
     )
 
-    cumulative_tasks = tasks_before + tasks_no_date
-    cumulative_managers = managers_before + managers_no_date
-    cumulative_annotators = annotators_before + annotators_no_date
-
-    # Convert to list and calculate cumulative
+    label_format = "%Y-%m" if granularity == "month" else "%Y-%m-%d"
     result = []
-    for i in range(30):
-        date = start_of_today - timedelta(days=29 - i)
-        date_str = date.strftime("%Y-%m-%d")
-        day_data = daily_data[date_str]
+    for bucket in series_starts:
+        day_data = {
+            "date": bucket.strftime(label_format),
+            **bucket_counts("series", bucket),
+        }
 
         cumulative_tasks += day_data["tasks_created"]
         cumulative_managers += day_data["managers_registered"]
@@ -497,59 +597,18 @@ async def get_growth_data(current_user: UserInDB = Depends(require_admin)):
 
         result.append(day_data)
 
-    # Weekly aggregation for the past 12 weeks
-    weekly_data = []
-    for week in range(12):
-        week_end = start_of_today - timedelta(days=week * 7)
-        week_start = week_end - timedelta(days=6)
-
-        tasks_in_week = 0
-        managers_in_week = 0
-        annotators_in_week = 0
-
-        for task in tasks:
-            created_at = task.get("created_at")
-            if created_at:
-                if isinstance(created_at, str):
-                    created_at = datetime.fromisoformat(
-                        created_at.replace("Z", "+00:00")
-                    )
-                if week_start <= created_at.replace(tzinfo=None) <= week_end:
-                    tasks_in_week += 1
-
-        for manager in managers:
-            created_at = manager.get("created_at")
-            if created_at:
-                if isinstance(created_at, str):
-                    created_at = datetime.fromisoformat(
-                        created_at.replace("Z", "+00:00")
-                    )
-                if week_start <= created_at.replace(tzinfo=None) <= week_end:
-                    managers_in_week += 1
-
-        for annotator in annotators:
-            created_at = annotator.get("created_at")
-            if created_at:
-                if isinstance(created_at, str):
-                    created_at = datetime.fromisoformat(
-                        created_at.replace("Z", "+00:00")
-                    )
-                if week_start <= created_at.replace(tzinfo=None) <= week_end:
-                    annotators_in_week += 1
-
-        weekly_data.insert(
-            0,
-            {
-                "week_start": week_start.strftime("%Y-%m-%d"),
-                "week_end": week_end.strftime("%Y-%m-%d"),
-                "week_label": f"Week {12 - week}",
-                "tasks_created": tasks_in_week,
-                "managers_registered": managers_in_week,
-                "annotators_registered": annotators_in_week,
-            },
-        )
+    weekly_data = [
+        {
+            "week_start": week_start.strftime("%Y-%m-%d"),
+            "week_end": (week_start + timedelta(days=6)).strftime("%Y-%m-%d"),
+            "week_label": f"Week {i + 1}",
+            **bucket_counts("weekly", week_start),
+        }
+        for i, week_start in enumerate(week_starts)
+    ]
 
     return {
+        "granularity": granularity,
         "daily_data": result,
         "weekly_data": weekly_data,
         "totals": {
@@ -0,0 +1,6 @@
+"""Annotation quality analytics.
+
+Modules here are pure NumPy computations over label arrays; the endpoints in
+analytics_routes stream the needed annotation fields out of MongoDB and hand
+them over as arrays.
+"""
@@ -0,0 +1,153 @@
+"""Annotator-vs-QA agreement: confusion matrices and Cohen's kappa.
+
+Labels are integer codes into a shared vocabulary. The confusion matrices of
+every group (one per annotator) come out of a single ``bincount`` over
+``(group, annotator label, QA label)`` and kappa is evaluated for all groups
+at once, so the cost is a few passes over the arrays regardless of how many
+annotators or labels a project has.
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+WEIGHTINGS = ("linear", "quadratic")
+
+
+def encode_labels(
+    annotator: Sequence[Any], qa: Sequence[Any], categories: Optional[Sequence] = None
+) -> Tuple[List[Any], np.ndarray, np.ndarray, np.ndarray]:
+    """Integer-code two label columns against one vocabulary.
+
+    Returns ``(vocabulary, annotator_codes, qa_codes, valid)``. Without
+    ``categories`` the vocabulary is every label seen (sorted); with them, rows
+    holding a label outside the categories are marked invalid.
+    """
+    a = np.asarray(annotator)
+    q = np.asarray(qa)
+    if categories is None:
+        vocab, codes = np.unique(np.concatenate([a, q]), return_inverse=True)
+        codes = codes.reshape(-1)
+        return vocab.tolist(), codes[: len(a)], codes[len(a) :], np.ones(len(a), bool)
+
+    vocab = np.asarray(categories)
+    order = np.argsort(vocab)
+    ordered = vocab[order]
+
+    def lookup(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.searchsorted(ordered, values).clip(max=len(ordered) - 1)
+        return order[positions], ordered[positions] == values
+
+    a_codes, a_valid = lookup(a)
+    q_codes, q_valid = lookup(q)
+    return vocab.tolist(), a_codes, q_codes, a_valid & q_valid
+
+
+def confusion_matrices(
+    groups: np.ndarray, annotator: np.ndarray, qa: np.ndarray, n_groups: int, k: int
+) -> np.ndarray:
+    """Return a ``(n_groups, k, k)`` array counting (annotator, QA) label pairs."""
+    flat = (groups.astype(np.int64) * k + annotator) * k + qa
+    return np.bincount(flat, minlength=n_groups * k * k).reshape(n_groups, k, k)
+
+
+def agreement_weights(k: int, weighting: Optional[str] = None) -> np.ndarray:
+    """Credit given to each (i, j) label pair: identity, or linear/quadratic."""
+    if weighting is None or k < 2:
+        return np.eye(k)
+    distance = np.abs(np.subtract.outer(np.arange(k), np.arange(k))) / (k - 1)
+    if weighting == "linear":
+        return 1 - distance
+    if weighting == "quadratic":
+        return 1 - distance**2
+    raise ValueError(f"Unknown weighting: {weighting}")
+
+
+def kappa(
+    matrices: np.ndarray, weighting: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Cohen's kappa of each ``(k, k)`` confusion matrix in ``matrices``.
+
+    Returns ``(n, observed, expected, kappa)`` arrays with one entry per
+    matrix; kappa is NaN where it is undefined (no rows, or chance agreement 1).
+    """
+    counts = np.asarray(matrices, dtype=float)
+    if counts.ndim == 2:
+        counts = counts[None]
+    weights = agreement_weights(counts.shape[-1], weighting)
+    n = counts.sum(axis=(1, 2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = counts / n[:, None, None]
+        observed = (p * weights).sum(axis=(1, 2))
+        expected = np.einsum("gi,gj,ij->g", p.sum(axis=2), p.sum(axis=1), weights)
+        result = (observed - expected) / (1 - expected)
+    result[~np.isfinite(result)] = np.nan
+    return n, observed, expected, result
+
+
+def binary_agreement(
+    n: np.ndarray, annotator_yes: np.ndarray, qa_yes: np.ndarray, both_yes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Agreement of yes/no judgments from their marginal counts.
+
+    Returns ``(observed, kappa, specific)`` where ``specific`` is the positive
+    specific agreement ``2 * both / (annotator_yes + qa_yes)``. All inputs are
+    arrays of the same shape (one entry per label or flag).
+    """
+    n, a, q, both = (
+        np.asarray(values, dtype=float)
+        for values in (n, annotator_yes, qa_yes, both_yes)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        observed = (n - a - q + 2 * both) / n
+        expected = (a * q + (n - a) * (n - q)) / n**2
+        result = (observed - expected) / (1 - expected)
+        specific = 2 * both / (a + q)
+    for values in (observed, result, specific):
+        values[~np.isfinite(values)] = np.nan
+    return observed, result, specific
+
+
+def label_agreement(
+    matrix: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """One-vs-rest agreement of each label of a confusion matrix.
+
+    Returns ``(annotator_count, qa_count, kappa, specific)`` per label.
+    """
+    matrix = np.asarray(matrix)
+    annotator_count = matrix.sum(axis=1)
+    qa_count = matrix.sum(axis=0)
+    n = np.full(len(matrix), matrix.sum())
+    _, result, specific = binary_agreement(
+        n, annotator_count, qa_count, np.diagonal(matrix)
+    )
+    return annotator_count, qa_count, result, specific
+
+
+def flag_agreement(
+    annotator: np.ndarray, qa: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Agreement of each boolean column of two ``(rows, flags)`` arrays.
+
+    Returns ``(n, observed, kappa, specific)`` per flag; rows where either side
+    left a flag unset (NaN) are excluded from that flag.
+    """
+    annotator = np.asarray(annotator, dtype=float)
+    qa = np.asarray(qa, dtype=float)
+    present = ~(np.isnan(annotator) | np.isnan(qa))
+    a_yes = (annotator == 1) & present
+    q_yes = (qa == 1) & present
+    n = present.sum(axis=0)
+    observed, result, specific = binary_agreement(
+        n, a_yes.sum(axis=0), q_yes.sum(axis=0), (a_yes & q_yes).sum(axis=0)
+    )
+    return n, observed, result, specific
+
+
+def as_json(values: np.ndarray, digits: int = 4) -> List[Optional[float]]:
+    """Round an array for a JSON response, with None for NaN."""
+    return [
+        None if np.isnan(value) else round(float(value), digits)
+        for value in np.asarray(values, dtype=float)
+    ]
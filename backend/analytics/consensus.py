@@ -0,0 +1,142 @@
+"""Consensus labels from redundant judgments: majority vote and Dawid–Skene.
+
+Judgments are three parallel integer arrays: item (task), worker (annotator)
+and label codes. Dawid–Skene models each worker with a confusion matrix
+``P(labelled l | true class k)`` and alternates, by EM, between the class
+posteriors of every item and the class priors and confusion matrices:
+
+- M-step: the ``(workers, k, k)`` confusion counts are ``k`` weighted
+  ``bincount`` passes over ``(worker, label)``, one per true class;
+- E-step: each judgment contributes the log-probability row
+  ``log_confusion[worker, :, label]``; the rows are summed per item with one
+  ``np.add.reduceat`` over the judgments sorted by item.
+
+Each iteration is a few passes over the judgment arrays, so hundreds of
+thousands of judgments converge in well under a second. EM starts from the
+majority vote, which is also returned on its own for ``method="majority"``.
+"""
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+METHODS = ("dawid_skene", "majority")
+# Pseudo-count added to every confusion matrix cell and class prior
+SMOOTHING = 0.01
+TOLERANCE = 1e-7
+MAX_ITERATIONS = 100
+
+
+def majority_posteriors(
+    items: np.ndarray, labels: np.ndarray, n_items: int, k: int
+) -> np.ndarray:
+    """``(n_items, k)`` vote shares of every item."""
+    votes = np.bincount(items * k + labels, minlength=n_items * k).reshape(n_items, k)
+    return votes / votes.sum(axis=1, keepdims=True)
+
+
+def confusion_matrices(
+    posteriors: np.ndarray,
+    items: np.ndarray,
+    workers: np.ndarray,
+    labels: np.ndarray,
+    n_workers: int,
+    smoothing: float = SMOOTHING,
+) -> np.ndarray:
+    """``(n_workers, k, k)`` estimated P(label | true class) of every worker."""
+    k = posteriors.shape[1]
+    flat = workers * k + labels
+    counts = np.stack(
+        [
+            np.bincount(flat, weights=posteriors[items, true], minlength=n_workers * k)
+            for true in range(k)
+        ]
+    )
+    counts = counts.reshape(k, n_workers, k).transpose(1, 0, 2) + smoothing
+    return counts / counts.sum(axis=2, keepdims=True)
+
+
+def dawid_skene(
+    items: np.ndarray,
+    workers: np.ndarray,
+    labels: np.ndarray,
+    n_items: int,
+    n_workers: int,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Fit Dawid–Skene by EM.
+
+    Every item needs at least one judgment. Returns ``(posteriors,
+    confusions, priors, iterations)``.
+    """
+    posteriors = majority_posteriors(items, labels, n_items, k)
+    # Judgments sorted by item, so per-item sums are one reduceat
+    order = np.argsort(items, kind="stable")
+    sorted_items = items[order]
+    starts = np.flatnonzero(np.r_[True, sorted_items[1:] != sorted_items[:-1]])
+    workers, labels = workers[order], labels[order]
+
+    previous = -np.inf
+    for iteration in range(1, MAX_ITERATIONS + 1):
+        priors = (posteriors.sum(axis=0) + SMOOTHING) / (n_items + k * SMOOTHING)
+        confusions = confusion_matrices(
+            posteriors, sorted_items, workers, labels, n_workers
+        )
+        contributions = np.log(confusions)[workers, :, labels]
+        log_joint = np.log(priors) + np.add.reduceat(contributions, starts, axis=0)
+        # Normalize in log space
+        peak = log_joint.max(axis=1, keepdims=True)
+        joint = np.exp(log_joint - peak)
+        evidence = joint.sum(axis=1, keepdims=True)
+        posteriors = joint / evidence
+        likelihood = float((np.log(evidence) + peak).sum())
+        if abs(likelihood - previous) <= TOLERANCE * abs(likelihood):
+            break
+        previous = likelihood
+    return posteriors, confusions, priors, iteration
+
+
+def aggregate_labels(
+    items: np.ndarray,
+    workers: np.ndarray,
+    labels: np.ndarray,
+    n_items: int,
+    n_workers: int,
+    k: int,
+    method: str = "dawid_skene",
+) -> Dict[str, Any]:
+    """Consensus label and confidence per item, and per-worker estimates.
+
+    This is what the process pool runs. ``accuracy`` is the worker's estimated
+    probability of giving the true class (Dawid–Skene; the agreement with the
+    consensus for a majority vote) and ``agreement`` the share of its labels
+    equal to the consensus.
+    """
+    if method == "majority":
+        posteriors = majority_posteriors(items, labels, n_items, k)
+        priors = posteriors.mean(axis=0)
+        iterations = 0
+    else:
+        posteriors, confusions, priors, iterations = dawid_skene(
+            items, workers, labels, n_items, n_workers, k
+        )
+    consensus = posteriors.argmax(axis=1)
+    judged = np.bincount(workers, minlength=n_workers)
+    agreed = np.bincount(
+        workers, weights=labels == consensus[items], minlength=n_workers
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        agreement = agreed / judged
+    if method == "majority":
+        accuracy = agreement
+    else:
+        accuracy = np.einsum("jkk,k->j", confusions, priors)
+    return {
+        "labels": consensus,
+        "confidence": posteriors.max(axis=1),
+        "priors": priors,
+        "judged": judged,
+        "accuracy": accuracy,
+        "agreement": agreement,
+        "iterations": iterations,
+    }
@@ -0,0 +1,180 @@
+"""Bounding box agreement between annotator and QA for object detection.
+
+Each task's boxes are matched class by class: pairwise IoU is computed for all
+boxes at once by broadcasting, then pairs are taken greedily in descending IoU
+order (the usual detection-benchmark matching) while they clear the IoU
+threshold. Treating the QA boxes as ground truth, matches are counted as true
+positives, so precision is the share of annotator boxes QA kept and recall the
+share of QA boxes the annotator drew.
+
+``match_chunk`` is what the process pool runs; it takes raw stored
+annotations (possibly column-packed) and returns summable counts. Tasks whose
+QA submitted no boxes are left out and counted.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from annotation_codec import decode_annotation
+
+IOU_THRESHOLD = 0.5
+
+# Counts per (annotator, class): matches, annotator boxes, QA boxes, IoU sum
+Counts = Dict[Tuple[Any, str], List[float]]
+
+
+def _box(item: Dict[str, Any]) -> Optional[Tuple[List[float], str]]:
+    """(x, y, width, height) and label of one stored box, in any of its formats."""
+    bbox = item.get("bbox")
+    if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
+        coords = list(bbox)
+    elif isinstance(bbox, dict):
+        coords = [bbox.get(key) for key in ("x", "y", "width", "height")]
+    else:
+        coords = [item.get(key) for key in ("x", "y", "width", "height")]
+    if any(not isinstance(value, (int, float)) for value in coords):
+        return None
+    label = item.get("label", item.get("class"))
+    return coords, str(label) if label is not None else ""
+
+
+def extract_boxes(annotation: Any) -> Optional[Tuple[np.ndarray, List[str]]]:
+    """Return ``(boxes, labels)`` with boxes as ``(n, 4)`` x1, y1, x2, y2 corners.
+
+    Reads the current ``annotations`` shapes (bbox type only), then the legacy
+    ``bounding_boxes`` and ``objects`` lists. None if the annotation has none
+    of them.
+    """
+    annotation = decode_annotation(annotation)
+    if not isinstance(annotation, dict):
+        return None
+    if isinstance(annotation.get("annotations"), list):
+        items = [
+            item
+            for item in annotation["annotations"]
+            if isinstance(item, dict) and item.get("type", "bbox") == "bbox"
+        ]
+    elif isinstance(annotation.get("bounding_boxes"), list):
+        items = annotation["bounding_boxes"]
+    elif isinstance(annotation.get("objects"), list):
+        items = annotation["objects"]
+    else:
+        return None
+
+    coords, labels = [], []
+    for item in items:
+        box = _box(item) if isinstance(item, dict) else None
+        if box is not None:
+            coords.append(box[0])
+            labels.append(box[1])
+    boxes = np.asarray(coords, dtype=float).reshape(-1, 4)
+    boxes[:, 2:] += boxes[:, :2]
+    return boxes, labels
+
+
+def pairwise_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every box in ``a`` (n, 4) with every box in ``b`` (m, 4)."""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    overlap = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    union = area_a[:, None] + area_b[None, :] - overlap
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iou = overlap / union
+    iou[~np.isfinite(iou)] = 0
+    return iou
+
+
+def greedy_match(
+    iou: np.ndarray, threshold: float = IOU_THRESHOLD
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Match rows to columns greedily by descending IoU; returns index arrays."""
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_rows, used_cols = set(), set()
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            matched_rows.append(row)
+            matched_cols.append(col)
+    return np.asarray(matched_rows, dtype=int), np.asarray(matched_cols, dtype=int)
+
+
+def match_task(
+    annotator: Tuple[np.ndarray, List[str]],
+    qa: Tuple[np.ndarray, List[str]],
+    threshold: float = IOU_THRESHOLD,
+) -> Dict[str, List[float]]:
+    """Per-class [matches, annotator boxes, QA boxes, IoU sum] for one task."""
+    a_boxes, a_labels = annotator
+    q_boxes, q_labels = qa
+    a_labels_arr = np.asarray(a_labels, dtype=object)
+    q_labels_arr = np.asarray(q_labels, dtype=object)
+    counts: Dict[str, List[float]] = {}
+    for label in set(a_labels) | set(q_labels):
+        a_class = a_boxes[a_labels_arr == label]
+        q_class = q_boxes[q_labels_arr == label]
+        matched = 0
+        iou_sum = 0.0
+        if len(a_class) and len(q_class):
+            iou = pairwise_iou(a_class, q_class)
+            rows, cols = greedy_match(iou, threshold)
+            matched = len(rows)
+            iou_sum = float(iou[rows, cols].sum())
+        counts[label] = [matched, len(a_class), len(q_class), iou_sum]
+    return counts
+
+
+def match_chunk(
+    rows: Iterable[Tuple[Any, Any, Any]], threshold: float = IOU_THRESHOLD
+) -> Tuple[Counts, int]:
+    """Match a chunk of ``(annotator_id, annotation, qa_annotation)`` rows.
+
+    Returns counts summed per (annotator_id, class) and the number of tasks
+    skipped because QA submitted no boxes. Matching those against the
+    annotator's own boxes would score them as perfect agreement.
+    """
+    totals: Counts = defaultdict(lambda: [0, 0, 0, 0.0])
+    without_qa = 0
+    for annotator_id, annotation, qa_annotation in rows:
+        annotator = extract_boxes(annotation)
+        if annotator is None:
+            continue
+        qa = None
+        if isinstance(qa_annotation, dict):
+            qa = extract_boxes(qa_annotation.get("corrections"))
+            if qa is None:
+                qa = extract_boxes(qa_annotation)
+        if qa is None:
+            without_qa += 1
+            continue
+        task_counts = match_task(annotator, qa, threshold)
+        for label, counts in task_counts.items():
+            total = totals[(annotator_id, label)]
+            for index, value in enumerate(counts):
+                total[index] += value
+    return dict(totals), without_qa
+
+
+def summarize(counts: Iterable[List[float]]) -> Dict[str, Any]:
+    """Precision, recall and mean IoU of summed [matches, ann, QA, IoU sum] counts."""
+    matched, annotator_boxes, qa_boxes, iou_sum = np.sum(
+        np.asarray(list(counts), dtype=float).reshape(-1, 4), axis=0
+    )
+
+    def ratio(numerator: float, denominator: float) -> Optional[float]:
+        return round(float(numerator / denominator), 4) if denominator else None
+
+    return {
+        "matched": int(matched),
+        "annotator_boxes": int(annotator_boxes),
+        "qa_boxes": int(qa_boxes),
+        "precision": ratio(matched, annotator_boxes),
+        "recall": ratio(matched, qa_boxes),
+        "mean_iou": ratio(iou_sum, matched),
+    }
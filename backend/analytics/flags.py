@@ -0,0 +1,58 @@
+"""Flag rates and co-occurrence from chatbot assessment bitmasks.
+
+With ``k`` flags a task's flags are one of ``2**k`` bitmasks (see
+chatbot_flags), so a group of tasks (one per model) is fully described by a
+histogram over the bitmasks: MongoDB groups the tasks by model and bitmask and
+only the counts leave the server. Per-flag counts are that histogram times the
+``(2**k, k)`` bit matrix, and the co-occurrence counts of every flag pair are
+``B.T @ diag(h) @ B``, for all groups in one batched product.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def bit_matrix(n_flags: int) -> np.ndarray:
+    """``(2**n_flags, n_flags)`` 0/1 array: row m holds the bits of bitmask m."""
+    masks = np.arange(1 << n_flags)
+    return ((masks[:, None] >> np.arange(n_flags)) & 1).astype(np.int64)
+
+
+def flag_histograms(
+    groups: np.ndarray,
+    bits: np.ndarray,
+    counts: np.ndarray,
+    n_groups: int,
+    n_flags: int,
+) -> np.ndarray:
+    """``(n_groups, 2**n_flags)`` task counts per group and bitmask."""
+    size = 1 << n_flags
+    flat = groups.astype(np.int64) * size + bits
+    return np.bincount(flat, weights=counts, minlength=n_groups * size).reshape(
+        n_groups, size
+    ).astype(np.int64)
+
+
+def flag_statistics(
+    histograms: np.ndarray, n_flags: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(tasks, flag_counts, cooccurrence)`` per group.
+
+    ``flag_counts[g, i]`` is the number of tasks of group ``g`` with flag ``i``
+    and ``cooccurrence[g, i, j]`` the number with both ``i`` and ``j`` (its
+    diagonal is ``flag_counts``).
+    """
+    bits = bit_matrix(n_flags)
+    tasks = histograms.sum(axis=1)
+    flag_counts = histograms @ bits
+    weighted = histograms[:, :, None] * bits
+    cooccurrence = np.matmul(weighted.transpose(0, 2, 1), bits)
+    return tasks, flag_counts, cooccurrence
+
+
+def rates(counts: np.ndarray, tasks: np.ndarray) -> np.ndarray:
+    """``counts`` divided by the task count of their group (NaN for none)."""
+    tasks = tasks.reshape(tasks.shape + (1,) * (counts.ndim - tasks.ndim))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return counts / tasks
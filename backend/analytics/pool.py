@@ -0,0 +1,37 @@
+"""Process pool for CPU-bound analytics work.
+
+NumPy releases the GIL only inside individual array operations; per-task
+matching loops still hold it, so analyses that run them over a whole project
+fan chunks of tasks out to worker processes instead of blocking the event
+loop. The pool is created on first use and shut down with the app.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+# Worker processes for analytics (defaults to the number of CPUs)
+ANALYTICS_WORKERS = int(os.getenv("ANALYTICS_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def analytics_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=ANALYTICS_WORKERS)
+    return _pool
+
+
+async def run_in_pool(function: Callable, *args: Any) -> Any:
+    """Run a picklable module-level function in the analytics pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(analytics_pool(), function, *args)
+
+
+def shutdown_analytics_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,46 @@
+"""Per-model score statistics for LLM response grading projects.
+
+Ratings and criterion scores are small integers, so MongoDB reduces a
+project's graded tasks to a histogram of ``(group, score) -> count`` rows
+(a group is a model, or a model and criterion) and only those rows leave the
+server. Counts, means, standard deviations and confidence intervals of every
+group then come out of weighted ``bincount`` passes over the histogram.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Two-sided 95% quantile of the normal distribution
+Z_95 = 1.959963984540054
+
+
+def score_moments(
+    groups: np.ndarray, scores: np.ndarray, counts: np.ndarray, n_groups: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(n, mean, std)`` per group from ``(group, score, count)`` rows.
+
+    ``std`` is the sample standard deviation (NaN below two scores); ``mean``
+    is NaN for a group without scores.
+    """
+    scores = scores.astype(float)
+    counts = counts.astype(float)
+    n = np.bincount(groups, weights=counts, minlength=n_groups)
+    total = np.bincount(groups, weights=counts * scores, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / n
+        # Sum of squared deviations around each group's own mean
+        deviations = counts * (scores - mean[groups]) ** 2
+        squares = np.bincount(groups, weights=deviations, minlength=n_groups)
+        std = np.sqrt(squares / (n - 1))
+    std[n < 2] = np.nan
+    return n.astype(np.int64), mean, std
+
+
+def confidence_intervals(
+    n: np.ndarray, mean: np.ndarray, std: np.ndarray, z: float = Z_95
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Normal-approximation confidence interval of each group's mean."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half_width = z * std / np.sqrt(n)
+    return mean - half_width, mean + half_width
@@ -0,0 +1,850 @@
+"""Annotation quality analytics endpoints"""
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import Any, Dict, List, Literal, Optional
+from bson import ObjectId
+from collections import defaultdict
+from datetime import datetime
+import asyncio
+
+import numpy as np
+from pymongo import UpdateOne
+
+import database
+from analytics.agreement import (
+    as_json,
+    confusion_matrices,
+    encode_labels,
+    flag_agreement,
+    kappa,
+    label_agreement,
+)
+from analytics.bradley_terry import (
+    ELO_SCALE,
+    elo,
+    fit_bradley_terry,
+    standard_errors,
+)
+from analytics.consensus import aggregate_labels
+from analytics.detection import IOU_THRESHOLD, match_chunk, summarize
+from analytics.flags import flag_histograms, flag_statistics, rates
+from analytics.pool import run_in_pool
+from analytics.scoreboard import confidence_intervals, score_moments
+from archive import collections_for
+from chatbot_flags import FLAG_NAMES, FLAGS_FIELD, flags_filter
+from judgments import CONSENSUS_FIELD, JUDGMENT_FIELDS
+from preferences import project_preferences
+from project_counters import DATA_VERSION_FIELD
+from report_cache import cached_report, load_report, save_report
+from schemas import ChatbotModelAssessmentAnnotation, TaskCategory, UserInDB
+from utils import get_current_user
+
+router = APIRouter()
+
+# Rows fetched per cursor batch when streaming annotation fields
+STREAM_BATCH_SIZE = 10000
+
+# Tasks per process pool job when matching detection boxes
+MATCH_CHUNK_SIZE = 500
+
+# Task updates per bulk_write when storing consensus labels
+WRITE_BATCH_SIZE = 1000
+
+# Label field compared per category, its fixed categories (None: any label
+# seen) and the default kappa weighting
+AGREEMENT_FIELDS: Dict[str, tuple] = {
+    TaskCategory.IMAGE_CLASSIFICATION.value: ("selected_label", None, None),
+    TaskCategory.TEXT_CLASSIFICATION.value: ("selected_label", None, None),
+    TaskCategory.SENTIMENT_ANALYSIS.value: ("selected_label", None, None),
+    TaskCategory.LLM_RESPONSE_GRADING.value: ("rating", range(1, 6), "quadratic"),
+    TaskCategory.CHATBOT_MODEL_ASSESSMENT.value: (
+        "likert_scale",
+        range(1, 8),
+        "quadratic",
+    ),
+    TaskCategory.RESPONSE_SELECTION.value: ("selected_response", range(1, 4), None),
+}
+
+CHATBOT_FLAGS = [
+    name
+    for name, field in ChatbotModelAssessmentAnnotation.model_fields.items()
+    if field.annotation is bool
+]
+
+
+def model_order(item: tuple) -> tuple:
+    """Sort key of ``(model_name, ...)`` items: by name, unnamed models last."""
+    return item[0] is None, str(item[0] or "")
+
+
+async def get_managed_project(project_id: str, current_user: UserInDB) -> Dict:
+    """Return a project the current user may analyse (its manager or an admin)."""
+    if not ObjectId.is_valid(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid project ID"
+        )
+
+    project = await database.projects_collection.find_one({"_id": ObjectId(project_id)})
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    if current_user.role not in ["admin", "manager"] or (
+        current_user.role == "manager" and project["manager_id"] != current_user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view project analytics",
+        )
+    return project
+
+
+def qa_value(field: str) -> Dict[str, Any]:
+    """Expression for the QA's value of an annotation field.
+
+    QA reviewers record values under ``qa_annotation.corrections`` (or at the
+    top level of ``qa_annotation``). A field the QA did not record is null
+    rather than the annotator's value, which would count as agreement.
+    """
+    return {
+        "$ifNull": [
+            f"$qa_annotation.corrections.{field}",
+            f"$qa_annotation.{field}",
+        ]
+    }
+
+
+def reviewed_tasks_pipeline(project_id: ObjectId, fields: Dict[str, Any]) -> List:
+    """Pipeline projecting ``fields`` from a project's QA-completed tasks."""
+    return [
+        {
+            "$match": {
+                "project_id": project_id,
+                "completed_status.annotator_part": True,
+                "completed_status.qa_part": True,
+            }
+        },
+        {"$project": {"_id": 0, "annotator_id": "$assigned_annotator_id", **fields}},
+    ]
+
+
+async def stream_reviewed_tasks(project: Dict, fields: Dict[str, Any]):
+    """Yield the projected fields of a project's reviewed tasks from both tiers."""
+    pipeline = reviewed_tasks_pipeline(project["_id"], fields)
+    for collection in collections_for(project, "tasks"):
+        async for row in collection.aggregate(pipeline, batchSize=STREAM_BATCH_SIZE):
+            yield row
+
+
+async def user_names(user_ids: List[ObjectId]) -> Dict[ObjectId, Dict]:
+    return {
+        user["_id"]: user
+        async for user in database.users_collection.find(
+            {"_id": {"$in": user_ids}}, {"name": 1, "email": 1}
+        )
+    }
+
+
+@router.get("/projects/{project_id}/agreement-report")
+async def get_agreement_report(
+    project_id: str,
+    weighting: Optional[Literal["none", "linear", "quadratic"]] = Query(None),
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Annotator-vs-QA agreement (Cohen's kappa) for a classification or rating project
+
+    Compares each reviewed task's annotation with the QA's value per project,
+    per annotator and per label; chatbot assessments also get per-flag
+    agreement. Tasks the QA recorded no value for are excluded and counted.
+    ``weighting`` overrides the category's default kappa weights.
+    """
+    project = await get_managed_project(project_id, current_user)
+    category = project.get("category")
+    if category not in AGREEMENT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Agreement reports are not available for {category} projects",
+        )
+    field, categories, default_weighting = AGREEMENT_FIELDS[category]
+    if weighting is None:
+        weighting = default_weighting
+    elif weighting == "none":
+        weighting = None
+    flags = CHATBOT_FLAGS if category == TaskCategory.CHATBOT_MODEL_ASSESSMENT else []
+
+    fields: Dict[str, Any] = {"a": f"$annotation.{field}", "q": qa_value(field)}
+    if flags:
+        fields["fa"] = [f"$annotation.{flag}" for flag in flags]
+        fields["fq"] = [qa_value(flag) for flag in flags]
+
+    # Stream only the compared fields into flat columns
+    annotator_index: Dict[ObjectId, int] = {}
+    groups: List[int] = []
+    annotator_labels: List[Any] = []
+    qa_labels: List[Any] = []
+    annotator_flags: List[List[Any]] = []
+    qa_flags: List[List[Any]] = []
+    without_qa = 0
+    async for row in stream_reviewed_tasks(project, fields):
+        if flags:
+            annotator_flags.append(row["fa"])
+            qa_flags.append(row["fq"])
+        a, q = row.get("a"), row.get("q")
+        if q is None:
+            without_qa += 1
+            continue
+        if a is None:
+            continue
+        if categories is None:
+            a, q = str(a), str(q)
+        elif not (isinstance(a, int) and isinstance(q, int)):
+            continue
+        annotator_id = row.get("annotator_id")
+        groups.append(annotator_index.setdefault(annotator_id, len(annotator_index)))
+        annotator_labels.append(a)
+        qa_labels.append(q)
+
+    report: Dict[str, Any] = {
+        "project_id": project_id,
+        "category": category,
+        "field": field,
+        "weighting": weighting,
+        "tasks": len(qa_labels),
+        # Reviewed tasks left out because the QA recorded no value to compare
+        "excluded_without_qa": without_qa,
+    }
+
+    if qa_labels:
+        vocab, a_codes, q_codes, valid = encode_labels(
+            annotator_labels, qa_labels, categories
+        )
+        group_codes = np.asarray(groups)[valid]
+        matrices = confusion_matrices(
+            group_codes,
+            a_codes[valid],
+            q_codes[valid],
+            len(annotator_index),
+            len(vocab),
+        )
+        overall = matrices.sum(axis=0)
+        n, observed, expected, overall_kappa = kappa(overall, weighting)
+        report["overall"] = {
+            "n": int(n[0]),
+            "observed_agreement": as_json(observed)[0],
+            "expected_agreement": as_json(expected)[0],
+            "kappa": as_json(overall_kappa)[0],
+        }
+        report["confusion_matrix"] = {"labels": vocab, "counts": overall.tolist()}
+
+        annotator_count, qa_count, label_kappa, specific = label_agreement(overall)
+        report["labels"] = [
+            {
+                "label": label,
+                "annotator_count": int(a_count),
+                "qa_count": int(q_count),
+                "kappa": k,
+                "specific_agreement": agreement,
+            }
+            for label, a_count, q_count, k, agreement in zip(
+                vocab,
+                annotator_count,
+                qa_count,
+                as_json(label_kappa),
+                as_json(specific),
+            )
+        ]
+
+        n, observed, _, group_kappa = kappa(matrices, weighting)
+        observed_json, kappa_json = as_json(observed), as_json(group_kappa)
+        users = await user_names([oid for oid in annotator_index if oid is not None])
+        report["annotators"] = [
+            {
+                "annotator_id": str(annotator_id) if annotator_id else None,
+                "annotator_name": users.get(annotator_id, {}).get("name", "Unknown"),
+                "n": int(n[index]),
+                "observed_agreement": observed_json[index],
+                "kappa": kappa_json[index],
+            }
+            for annotator_id, index in annotator_index.items()
+        ]
+    else:
+        report.update(overall=None, confusion_matrix=None, labels=[], annotators=[])
+
+    if flags:
+        qa_flag_values = np.array(qa_flags, dtype=float).reshape(-1, len(flags))
+        n, observed, flag_kappa, specific = flag_agreement(
+            np.array(annotator_flags, dtype=float).reshape(-1, len(flags)),
+            qa_flag_values,
+        )
+        flags_without_qa = np.isnan(qa_flag_values).sum(axis=0)
+        report["flags"] = [
+            {
+                "flag": flag,
+                "n": int(count),
+                "observed_agreement": agreement,
+                "kappa": k,
+                "specific_agreement": positive,
+                "excluded_without_qa": int(missing),
+            }
+            for flag, count, missing, agreement, k, positive in zip(
+                flags,
+                n,
+                flags_without_qa,
+                as_json(observed),
+                as_json(flag_kappa),
+                as_json(specific),
+            )
+        ]
+
+    return report
+
+
+@router.get("/projects/{project_id}/detection-agreement")
+async def get_detection_agreement(
+    project_id: str,
+    iou_threshold: float = Query(IOU_THRESHOLD, gt=0, le=1),
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """How much QA changed the annotators' boxes in an object detection project
+
+    Matches each reviewed task's annotator boxes against the QA boxes (see
+    analytics.detection) in the analytics process pool and reports precision,
+    recall and mean IoU overall, per class and per annotator. Tasks the QA
+    submitted no boxes for are excluded and counted.
+    """
+    project = await get_managed_project(project_id, current_user)
+    if project.get("category") != TaskCategory.OBJECT_DETECTION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Detection agreement is only available for object detection",
+        )
+
+    fields = {
+        "a": {
+            "annotations": "$annotation.annotations",
+            "bounding_boxes": "$annotation.bounding_boxes",
+            "objects": "$annotation.objects",
+        },
+        "q": "$qa_annotation",
+    }
+
+    # Matching runs in worker processes while the next chunks stream in
+    jobs = []
+    chunk: List[tuple] = []
+    tasks = 0
+
+    def submit(rows: List[tuple]) -> None:
+        job = run_in_pool(match_chunk, rows, iou_threshold)
+        jobs.append(asyncio.ensure_future(job))
+
+    async for row in stream_reviewed_tasks(project, fields):
+        annotator_id = row.get("annotator_id")
+        annotator_key = str(annotator_id) if annotator_id else None
+        chunk.append((annotator_key, row["a"], row.get("q")))
+        tasks += 1
+        if len(chunk) >= MATCH_CHUNK_SIZE:
+            submit(chunk)
+            chunk = []
+    if chunk:
+        submit(chunk)
+
+    by_class: Dict[str, List[List[float]]] = defaultdict(list)
+    by_annotator: Dict[Optional[str], List[List[float]]] = defaultdict(list)
+    without_qa = 0
+    for result, skipped in await asyncio.gather(*jobs):
+        without_qa += skipped
+        for (annotator_id, label), counts in result.items():
+            by_class[label].append(counts)
+            by_annotator[annotator_id].append(counts)
+
+    users = await user_names(
+        [ObjectId(annotator_id) for annotator_id in by_annotator if annotator_id]
+    )
+    return {
+        "project_id": project_id,
+        "iou_threshold": iou_threshold,
+        "tasks": tasks - without_qa,
+        # Reviewed tasks left out because the QA submitted no boxes to compare
+        "excluded_without_qa": without_qa,
+        "overall": summarize(
+            counts for class_counts in by_class.values() for counts in class_counts
+        ),
+        "classes": [
+            {"class": label, **summarize(counts)}
+            for label, counts in sorted(by_class.items())
+        ],
+        "annotators": [
+            {
+                "annotator_id": annotator_id,
+                "annotator_name": users.get(
+                    ObjectId(annotator_id) if annotator_id else None, {}
+                ).get("name", "Unknown"),
+                **summarize(counts),
+            }
+            for annotator_id, counts in by_annotator.items()
+        ],
+    }
+
+
+@router.get("/projects/{project_id}/chatbot-flags")
+async def get_chatbot_flag_rates(
+    project_id: str,
+    all_of: List[str] = Query([]),
+    none_of: List[str] = Query([]),
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Flag rates and co-occurrence per model in a chatbot assessment project
+
+    Counts the submitted assessments by model and flag bitmask (see
+    chatbot_flags) in MongoDB and derives per-flag rates and flag pair
+    co-occurrence counts from the histograms (see analytics.flags). ``all_of``
+    and ``none_of`` restrict the counts to tasks with all, or none, of the
+    given flags.
+    """
+    project = await get_managed_project(project_id, current_user)
+    if project.get("category") != TaskCategory.CHATBOT_MODEL_ASSESSMENT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Flag rates are only available for chatbot model assessment",
+        )
+    try:
+        match = flags_filter(all_of, none_of)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    pipeline = [
+        {"$match": {"project_id": project["_id"], **match}},
+        {
+            "$group": {
+                "_id": {"model": "$task_data.model_name", "bits": f"${FLAGS_FIELD}"},
+                "n": {"$sum": 1},
+            }
+        },
+    ]
+    model_index: Dict[Optional[str], int] = {}
+    groups: List[int] = []
+    bits: List[int] = []
+    counts: List[int] = []
+    for collection in collections_for(project, "tasks"):
+        async for row in collection.aggregate(pipeline):
+            model = row["_id"].get("model")
+            groups.append(model_index.setdefault(model, len(model_index)))
+            bits.append(row["_id"]["bits"])
+            counts.append(row["n"])
+
+    n_flags = len(FLAG_NAMES)
+    histograms = flag_histograms(
+        np.asarray(groups, dtype=np.int64),
+        np.asarray(bits, dtype=np.int64),
+        np.asarray(counts, dtype=float),
+        len(model_index),
+        n_flags,
+    )
+    # Row 0 is the whole project, then one row per model
+    histograms = np.concatenate([histograms.sum(axis=0, keepdims=True), histograms])
+    tasks, flag_counts, cooccurrence = flag_statistics(histograms, n_flags)
+    flag_rates = rates(flag_counts, tasks)
+
+    def summary(index: int) -> Dict[str, Any]:
+        return {
+            "tasks": int(tasks[index]),
+            "flags": [
+                {"flag": flag, "count": int(count), "rate": rate}
+                for flag, count, rate in zip(
+                    FLAG_NAMES, flag_counts[index], as_json(flag_rates[index])
+                )
+            ],
+            "cooccurrence": cooccurrence[index].tolist(),
+        }
+
+    return {
+        "project_id": project_id,
+        "all_of": all_of,
+        "none_of": none_of,
+        "flags": list(FLAG_NAMES),
+        "overall": summary(0),
+        "models": [
+            {"model_name": model, **summary(index + 1)}
+            for model, index in sorted(model_index.items(), key=model_order)
+        ],
+    }
+
+
+def scoreboard_pipeline(project_id: ObjectId) -> List[Dict[str, Any]]:
+    """Histograms of ratings per model and of criterion scores per model."""
+    model = "$task_data.model_name"
+    criteria = "$annotation.criteria_scores"
+    return [
+        {
+            "$match": {
+                "project_id": project_id,
+                "completed_status.annotator_part": True,
+            }
+        },
+        {
+            "$facet": {
+                "ratings": [
+                    {
+                        "$group": {
+                            "_id": {"model": model, "score": "$annotation.rating"},
+                            "n": {"$sum": 1},
+                        }
+                    }
+                ],
+                "criteria": [
+                    {
+                        "$project": {
+                            "model": model,
+                            "scores": {
+                                "$objectToArray": {
+                                    "$cond": [
+                                        {"$eq": [{"$type": criteria}, "object"]},
+                                        criteria,
+                                        {},
+                                    ]
+                                }
+                            },
+                        }
+                    },
+                    {"$unwind": "$scores"},
+                    {
+                        "$group": {
+                            "_id": {
+                                "model": "$model",
+                                "criterion": "$scores.k",
+                                "score": "$scores.v",
+                            },
+                            "n": {"$sum": 1},
+                        }
+                    },
+                ],
+            }
+        },
+    ]
+
+
+def _is_score(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _score_summary(n, mean, std, low, high) -> Dict[str, Any]:
+    return {
+        "count": int(n),
+        "mean": as_json([mean])[0],
+        "std": as_json([std])[0],
+        "ci_low": as_json([low])[0],
+        "ci_high": as_json([high])[0],
+    }
+
+
+async def compute_scoreboard(project: Dict) -> Dict[str, Any]:
+    pipeline = scoreboard_pipeline(project["_id"])
+    # Histograms of both tiers simply add up
+    ratings: Dict[tuple, int] = defaultdict(int)
+    criteria: Dict[tuple, int] = defaultdict(int)
+    for collection in collections_for(project, "tasks"):
+        async for facets in collection.aggregate(pipeline):
+            for row in facets["ratings"]:
+                key = row["_id"]
+                if _is_score(key.get("score")):
+                    ratings[key.get("model"), key["score"]] += row["n"]
+            for row in facets["criteria"]:
+                key = row["_id"]
+                if _is_score(key.get("score")):
+                    group = (key.get("model"), key["criterion"], key["score"])
+                    criteria[group] += row["n"]
+
+    models = sorted(
+        {model for model, _ in ratings} | {model for model, _, _ in criteria},
+        key=lambda model: model_order((model,)),
+    )
+    model_index = {model: index for index, model in enumerate(models)}
+    criterion_names = sorted({criterion for _, criterion, _ in criteria})
+    criterion_index = {name: index for index, name in enumerate(criterion_names)}
+
+    def moments(rows: Dict[tuple, int], group_of, n_groups: int):
+        groups = np.fromiter((group_of(key) for key in rows), np.int64, len(rows))
+        scores = np.fromiter((key[-1] for key in rows), float, len(rows))
+        counts = np.fromiter(rows.values(), float, len(rows))
+        n, mean, std = score_moments(groups, scores, counts, n_groups)
+        return (n, mean, std, *confidence_intervals(n, mean, std))
+
+    rating_stats = moments(ratings, lambda key: model_index[key[0]], len(models))
+    n_criteria = len(criterion_names)
+    criterion_stats = moments(
+        criteria,
+        lambda key: model_index[key[0]] * n_criteria + criterion_index[key[1]],
+        len(models) * n_criteria,
+    )
+    distributions: Dict[Any, Dict[str, int]] = defaultdict(dict)
+    for (model, score), count in sorted(ratings.items(), key=lambda item: item[0][1]):
+        distributions[model][str(score)] = count
+
+    board = []
+    for model, index in model_index.items():
+        offset = index * n_criteria
+        board.append(
+            {
+                "model_name": model,
+                "rating": {
+                    **_score_summary(*(stat[index] for stat in rating_stats)),
+                    "distribution": distributions.get(model, {}),
+                },
+                "criteria": {
+                    name: _score_summary(
+                        *(stat[offset + position] for stat in criterion_stats)
+                    )
+                    for position, name in enumerate(criterion_names)
+                    if criterion_stats[0][offset + position]
+                },
+            }
+        )
+    # Best mean rating first; models without ratings last
+    board.sort(
+        key=lambda entry: (
+            entry["rating"]["mean"] is None,
+            -(entry["rating"]["mean"] or 0),
+        )
+    )
+    return {
+        "project_id": str(project["_id"]),
+        "graded_tasks": int(rating_stats[0].sum()),
+        "criteria": criterion_names,
+        "models": board,
+    }
+
+
+@router.get("/projects/{project_id}/scoreboard")
+async def get_scoreboard(
+    project_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Per-model rating scoreboard of an LLM response grading project
+
+    Mean, standard deviation and 95% confidence interval (normal approximation)
+    of the rating and of every criterion score, per ``model_name``, over the
+    submitted annotations. Served from the report cache until the project's
+    tasks or annotations change.
+    """
+    project = await get_managed_project(project_id, current_user)
+    if project.get("category") != TaskCategory.LLM_RESPONSE_GRADING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Scoreboards are only available for LLM response grading",
+        )
+    return await cached_report(
+        project, "scoreboard", lambda previous: compute_scoreboard(project)
+    )
+
+
+async def compute_ranking(project: Dict, previous: Optional[Dict]) -> Dict[str, Any]:
+    rows = await project_preferences(project["_id"])
+    names = sorted({name for winner, loser, _ in rows for name in (winner, loser)})
+    index = {name: position for position, name in enumerate(names)}
+    winners = np.fromiter((index[row[0]] for row in rows), np.int64, len(rows))
+    losers = np.fromiter((index[row[1]] for row in rows), np.int64, len(rows))
+    counts = np.fromiter((row[2] for row in rows), float, len(rows))
+
+    # Start from the previous fit; only the new judgments need to be absorbed
+    initial = np.zeros(len(names))
+    for entry in (previous or {}).get("candidates", []):
+        if entry["candidate"] in index:
+            initial[index[entry["candidate"]]] = entry["log_strength"]
+    log_strength, iterations = fit_bradley_terry(
+        winners, losers, counts, len(names), initial
+    )
+    errors = standard_errors(log_strength, winners, losers, counts)
+    ratings = elo(log_strength)
+    margin = 1.96 * ELO_SCALE * errors
+    wins = np.bincount(winners, weights=counts, minlength=len(names))
+    losses = np.bincount(losers, weights=counts, minlength=len(names))
+
+    order = np.argsort(-log_strength, kind="stable")
+    return {
+        "project_id": str(project["_id"]),
+        "judgments": int(counts.sum()),
+        "iterations": iterations,
+        "candidates": [
+            {
+                "rank": rank,
+                "candidate": names[position],
+                "log_strength": float(log_strength[position]),
+                "elo": round(float(ratings[position]), 1),
+                "elo_ci_low": as_json([ratings[position] - margin[position]], 1)[0],
+                "elo_ci_high": as_json([ratings[position] + margin[position]], 1)[0],
+                "wins": int(wins[position]),
+                "losses": int(losses[position]),
+            }
+            for rank, position in enumerate(order.tolist(), start=1)
+        ],
+    }
+
+
+@router.get("/projects/{project_id}/ranking")
+async def get_ranking(
+    project_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Bradley–Terry ranking of the candidates of a response selection project
+
+    Every selection counts as a win of the selected candidate over each other
+    option's candidate (``task_data.response_models``). The strengths are
+    fitted from the project's preference counters (see preferences and
+    analytics.bradley_terry) and reported on the Elo scale with approximate
+    95% intervals. Served from the report cache until the project's
+    annotations change, and refitted starting from the cached strengths.
+    """
+    project = await get_managed_project(project_id, current_user)
+    if project.get("category") != TaskCategory.RESPONSE_SELECTION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Rankings are only available for response selection",
+        )
+    return await cached_report(
+        project, "ranking", lambda previous: compute_ranking(project, previous)
+    )
+
+
+@router.post("/projects/{project_id}/consensus")
+async def compute_consensus(
+    project_id: str,
+    method: Literal["dawid_skene", "majority"] = Query("dawid_skene"),
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Aggregate the judgments of every task into a consensus label
+
+    With ``dawid_skene`` every annotator gets an estimated confusion matrix
+    and labels are weighted by it (see analytics.consensus); ``majority`` is a
+    plain vote. The label and its posterior probability are stored on each
+    task as ``consensus`` and the summary (per-annotator accuracy, class
+    priors) is kept as the project's ``consensus`` report.
+    """
+    project = await get_managed_project(project_id, current_user)
+    if project.get("category") not in JUDGMENT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Consensus is not available for this project category",
+        )
+    if project.get("archive_state"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Restore the project before computing consensus",
+        )
+    started_at = datetime.utcnow()
+
+    task_index: Dict[ObjectId, int] = {}
+    annotator_index: Dict[ObjectId, int] = {}
+    label_index: Dict[Any, int] = {}
+    items: List[int] = []
+    workers: List[int] = []
+    labels: List[int] = []
+    cursor = database.judgments_collection.find(
+        {"project_id": project["_id"]},
+        {"_id": 0, "task_id": 1, "annotator_id": 1, "label": 1},
+        batch_size=STREAM_BATCH_SIZE,
+    )
+    async for judgment in cursor:
+        items.append(task_index.setdefault(judgment["task_id"], len(task_index)))
+        workers.append(
+            annotator_index.setdefault(judgment["annotator_id"], len(annotator_index))
+        )
+        labels.append(label_index.setdefault(judgment["label"], len(label_index)))
+
+    result = None
+    if items:
+        result = await run_in_pool(
+            aggregate_labels,
+            np.array(items, dtype=np.int64),
+            np.array(workers, dtype=np.int64),
+            np.array(labels, dtype=np.int64),
+            len(task_index),
+            len(annotator_index),
+            len(label_index),
+            method,
+        )
+
+        label_names = list(label_index)
+        judged = np.bincount(items, minlength=len(task_index))
+        operations = [
+            UpdateOne(
+                {"_id": task_id},
+                {
+                    "$set": {
+                        CONSENSUS_FIELD: {
+                            "label": label_names[result["labels"][index]],
+                            "confidence": round(
+                                float(result["confidence"][index]), 4
+                            ),
+                            "judgments": int(judged[index]),
+                            "method": method,
+                            "computed_at": started_at,
+                        }
+                    }
+                },
+            )
+            for task_id, index in task_index.items()
+        ]
+        for start in range(0, len(operations), WRITE_BATCH_SIZE):
+            await database.tasks_collection.bulk_write(
+                operations[start : start + WRITE_BATCH_SIZE], ordered=False
+            )
+    # Tasks that lost all their judgments since the last run
+    await database.tasks_collection.update_many(
+        {
+            "project_id": project["_id"],
+            f"{CONSENSUS_FIELD}.computed_at": {"$lt": started_at},
+        },
+        {"$unset": {CONSENSUS_FIELD: ""}},
+    )
+
+    summary: Dict[str, Any] = {
+        "project_id": project_id,
+        "method": method,
+        "tasks": len(task_index),
+        "judgments": len(items),
+        "iterations": result["iterations"] if result else 0,
+        "classes": [],
+        "annotators": [],
+        "computed_at": started_at,
+    }
+    if result:
+        priors = as_json(result["priors"])
+        summary["classes"] = [
+            {"label": label, "prior": priors[index]}
+            for label, index in label_index.items()
+        ]
+        accuracy = as_json(result["accuracy"])
+        agreement = as_json(result["agreement"])
+        users = await user_names(list(annotator_index))
+        summary["annotators"] = [
+            {
+                "annotator_id": str(annotator_id),
+                "annotator_name": users.get(annotator_id, {}).get("name", "Unknown"),
+                "judgments": int(result["judged"][index]),
+                "accuracy": accuracy[index],
+                "agreement": agreement[index],
+            }
+            for annotator_id, index in annotator_index.items()
+        ]
+    return await save_report(project, "consensus", summary)
+
+
+@router.get("/projects/{project_id}/consensus")
+async def get_consensus(
+    project_id: str,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Summary of the project's last consensus run
+
+    ``stale`` is set once the project's annotations changed after the run.
+    """
+    project = await get_managed_project(project_id, current_user)
+    report = await load_report(project["_id"], "consensus")
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Consensus has not been computed for this project",
+        )
+    stale = report.get(DATA_VERSION_FIELD) != project.get(DATA_VERSION_FIELD, 0)
+    return {**report, "stale": stale}
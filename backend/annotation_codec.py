@@ -0,0 +1,421 @@
+"""Columnar storage codec for large annotation lists.
+
+Dense object detection and NER annotations are long lists of small dicts
+(``annotations``/``objects``/``bounding_boxes`` shapes, ``entities`` spans)
+that repeat every key name in every element. ``encode_annotation`` replaces
+such lists, once they have at least ``MIN_ITEMS`` elements, with a packed
+column set:
+
+    {"_codec": "columnar1", "n": 5000, "z": True, "cols": [
+        {"k": "x", "t": "f4", "d": <float32 bytes>},
+        {"k": "score", "t": "f8", "i": <int flags>, "d": <float64 bytes>},
+        {"k": "label", "t": "vocab", "v": ["car", "bus"], "d": <uint8 ids>},
+        {"k": "bounds.x", "t": "f4", "p": <presence codes>, "d": ...},
+        ...]}
+
+Nested dicts are flattened into dotted columns, point lists (polygons,
+polylines) become offsets plus interleaved coordinates, repeated strings
+become a small vocabulary and anything else is kept as JSON. Column data is
+zlib-compressed when the packed size reaches ``COMPRESS_THRESHOLD_BYTES``.
+
+Decoding reproduces the input exactly. Numbers are stored as float32 (read
+back rounded to 7 significant digits, which covers the percentage
+coordinates the annotators produce) only when every value of the column
+survives that round trip, and as float64 otherwise; integers in a column
+that also holds floats are flagged so they come back as ints.
+
+``decode_annotation`` restores the lists and is applied by the task response
+model and the export paths, so callers never see the packed form.
+
+Run ``python annotation_codec.py`` for a size and latency benchmark.
+"""
+
+import json
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CODEC_NAME = "columnar1"
+PACKED_LIST_KEYS = ("objects", "annotations", "bounding_boxes", "entities")
+MIN_ITEMS = 32
+# Annotations with a list this long are encoded off the event loop
+OFFLOAD_ITEMS = 1000
+COMPRESS_THRESHOLD_BYTES = 4096
+MAX_VOCAB = 256
+
+# Per-item presence codes of a column
+_MISSING, _PRESENT, _NULL = 0, 1, 2
+_ABSENT = object()
+
+
+def _to_bytes(typecode: str, values: Iterable[Any]) -> bytes:
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    packed = array(typecode)
+    packed.frombytes(data)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_point_list(value: Any) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(p, dict)
+        and p.keys() == {"x", "y"}
+        and _is_number(p["x"])
+        and _is_number(p["y"])
+        for p in value
+    )
+
+
+def _flatten(item: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat: Dict[str, Any] = {}
+    for key, value in item.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value and all("." not in k for k in value):
+            flat.update(_flatten(value, path + "."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def _assign(item: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        item = item.setdefault(part, {})
+    item[parts[-1]] = value
+
+
+def _column_type(present: List[Any]) -> str:
+    if not present:
+        return "json"
+    if all(isinstance(v, bool) for v in present):
+        return "bool"
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return "i4" if all(-(2**31) <= v < 2**31 for v in present) else "i8"
+    if all(_is_number(v) for v in present):
+        return "number"
+    if all(isinstance(v, str) for v in present):
+        distinct = len(set(present))
+        if distinct <= MAX_VOCAB and distinct * 2 <= len(present):
+            return "vocab"
+        if not any("\x00" in v for v in present):
+            return "str"
+    if all(_is_point_list(v) for v in present):
+        return "points"
+    return "json"
+
+
+def _round_f4(value: float) -> float:
+    # float32 keeps ~7 significant digits; drop the binary noise beyond that
+    return float(f"{value:.7g}")
+
+
+def _pack_numbers(values: List[Any]) -> Tuple[str, bytes, Optional[bytes]]:
+    """Pack numbers losslessly: ``(float typecode, data, int flags or None)``."""
+    ints = bytes(isinstance(v, int) for v in values)
+    if any(ints) and any(abs(v) > 2**53 for v in values if isinstance(v, int)):
+        raise OverflowError("integer not exactly representable as a float")
+    single = _to_bytes("f", values)
+    # NaN never compares equal, so it is kept as float64 too
+    if all(
+        _round_f4(stored) == value
+        for stored, value in zip(_from_bytes("f", single), values)
+    ):
+        return "f", single, ints if any(ints) else None
+    return "d", _to_bytes("d", values), ints if any(ints) else None
+
+
+def _unpack_numbers(
+    typecode: str, data: bytes, ints: Optional[bytes]
+) -> List[Any]:
+    values = _from_bytes(typecode, data)
+    numbers = [_round_f4(v) for v in values] if typecode == "f" else list(values)
+    if ints is not None:
+        numbers = [int(v) if flag else v for v, flag in zip(numbers, ints)]
+    return numbers
+
+
+def _encode_column(key: str, values: List[Any]) -> Dict[str, Any]:
+    codes = bytes(
+        _MISSING if v is _ABSENT else _NULL if v is None else _PRESENT
+        for v in values
+    )
+    present = [v for v in values if v is not _ABSENT and v is not None]
+    kind = _column_type(present)
+    column: Dict[str, Any] = {"k": key, "t": kind}
+
+    if kind == "bool":
+        column["d"] = bytes(int(v) for v in present)
+    elif kind == "i4":
+        column["d"] = _to_bytes("i", present)
+    elif kind == "i8":
+        column["d"] = _to_bytes("q", present)
+    elif kind == "number":
+        typecode, column["d"], ints = _pack_numbers(present)
+        column["t"] = "f4" if typecode == "f" else "f8"
+        if ints is not None:
+            column["i"] = ints
+    elif kind == "vocab":
+        vocab = list(dict.fromkeys(present))
+        index = {value: i for i, value in enumerate(vocab)}
+        column["v"] = vocab
+        column["d"] = bytes(index[v] for v in present)
+    elif kind == "str":
+        column["d"] = "\x00".join(present).encode("utf-8")
+    elif kind == "points":
+        counts = _to_bytes("I", (len(points) for points in present))
+        typecode, coords, ints = _pack_numbers(
+            [c for points in present for p in points for c in (p["x"], p["y"])]
+        )
+        column["d"] = counts + coords
+        if typecode == "d":
+            column["f"] = "f8"
+        if ints is not None:
+            column["i"] = ints
+    else:
+        column["d"] = json.dumps(present, ensure_ascii=False).encode("utf-8")
+
+    if any(code != _PRESENT for code in codes):
+        column["p"] = codes
+    return column
+
+
+def _decode_values(
+    column: Dict[str, Any], data: bytes, count: int, ints: Optional[bytes]
+) -> List[Any]:
+    kind = column["t"]
+    if kind == "bool":
+        return [bool(b) for b in data]
+    if kind == "i4":
+        return list(_from_bytes("i", data))
+    if kind == "i8":
+        return list(_from_bytes("q", data))
+    if kind == "f4":
+        return _unpack_numbers("f", data, ints)
+    if kind == "f8":
+        return _unpack_numbers("d", data, ints)
+    if kind == "vocab":
+        vocab = column["v"]
+        return [vocab[i] for i in data]
+    if kind == "str":
+        return data.decode("utf-8").split("\x00")
+    if kind == "points":
+        split = 4 * count
+        counts = _from_bytes("I", data[:split])
+        typecode = "d" if column.get("f") == "f8" else "f"
+        coords = _unpack_numbers(typecode, data[split:], ints)
+        points, offset = [], 0
+        for n in counts:
+            points.append(
+                [
+                    {"x": coords[i], "y": coords[i + 1]}
+                    for i in range(offset, offset + 2 * n, 2)
+                ]
+            )
+            offset += 2 * n
+        return points
+    return json.loads(data.decode("utf-8"))
+
+
+def encode_list(items: List[Any]) -> Optional[Dict[str, Any]]:
+    """Pack a list of dicts column-wise; returns None when packing does not apply."""
+    if len(items) < MIN_ITEMS or not all(isinstance(item, dict) for item in items):
+        return None
+    if any(not isinstance(k, str) or "." in k for item in items for k in item):
+        return None
+
+    flat = [_flatten(item) for item in items]
+    keys: Dict[str, None] = {}
+    for item in flat:
+        keys.update(dict.fromkeys(item))
+    try:
+        columns = [
+            _encode_column(key, [item.get(key, _ABSENT) for item in flat])
+            for key in keys
+        ]
+    except (TypeError, ValueError, OverflowError):
+        # Not JSON-serialisable or out of range; keep the list as it is
+        return None
+
+    packed: Dict[str, Any] = {"_codec": CODEC_NAME, "n": len(items), "cols": columns}
+    size = sum(
+        len(c["d"]) + len(c.get("p", b"")) + len(c.get("i", b"")) for c in columns
+    )
+    if size >= COMPRESS_THRESHOLD_BYTES:
+        for column in columns:
+            for part in ("d", "p", "i"):
+                if part in column:
+                    column[part] = zlib.compress(column[part])
+        packed["z"] = True
+    return packed
+
+
+def decode_list(packed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Restore a list packed by ``encode_list``."""
+    n = packed["n"]
+    compressed = packed.get("z", False)
+    items: List[Dict[str, Any]] = [{} for _ in range(n)]
+    for column in packed["cols"]:
+        data = bytes(column["d"])
+        codes = bytes(column["p"]) if "p" in column else None
+        ints = bytes(column["i"]) if "i" in column else None
+        if compressed:
+            data = zlib.decompress(data)
+            codes = zlib.decompress(codes) if codes is not None else None
+            ints = zlib.decompress(ints) if ints is not None else None
+        if codes is None:
+            codes = bytes([_PRESENT]) * n
+        values = iter(_decode_values(column, data, codes.count(_PRESENT), ints))
+        for item, code in zip(items, codes):
+            if code == _PRESENT:
+                _assign(item, column["k"], next(values))
+            elif code == _NULL:
+                _assign(item, column["k"], None)
+    return items
+
+
+def is_packed(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("_codec") == CODEC_NAME
+
+
+def encode_annotation(annotation: Any) -> Any:
+    """Return a copy of an annotation with its large lists packed for storage."""
+    if not isinstance(annotation, dict):
+        return annotation
+    encoded = dict(annotation)
+    for key in PACKED_LIST_KEYS:
+        value = annotation.get(key)
+        if isinstance(value, list):
+            packed = encode_list(value)
+            if packed is not None:
+                encoded[key] = packed
+    return encoded
+
+
+def should_offload(annotation: Any) -> bool:
+    """Whether encoding this annotation is worth a trip to the process pool."""
+    return isinstance(annotation, dict) and any(
+        isinstance(annotation.get(key), list)
+        and len(annotation[key]) >= OFFLOAD_ITEMS
+        for key in PACKED_LIST_KEYS
+    )
+
+
+def decode_annotation(annotation: Any) -> Any:
+    """Return a copy of a stored annotation with packed lists restored."""
+    if not isinstance(annotation, dict):
+        return annotation
+    if not any(is_packed(annotation.get(key)) for key in PACKED_LIST_KEYS):
+        return annotation
+    decoded = dict(annotation)
+    for key in PACKED_LIST_KEYS:
+        if is_packed(annotation.get(key)):
+            decoded[key] = decode_list(annotation[key])
+    return decoded
+
+
+def _benchmark(sizes=(100, 1000, 10000), repeat: int = 5) -> None:
+    import random
+    import time
+
+    try:
+        from bson import encode as bson_encode
+    except ImportError:  # pragma: no cover - pymongo is a hard dependency
+        bson_encode = None
+
+    def stored_size(doc: Dict[str, Any]) -> int:
+        if bson_encode is not None:
+            return len(bson_encode(doc))
+        return len(json.dumps(doc, default=lambda b: "x" * len(b)))
+
+    rng = random.Random(0)
+    labels = ["car", "person", "bicycle", "bus", "truck", "traffic light"]
+    entity_types = ["PERSON", "ORG", "LOC", "DATE", "MISC"]
+
+    def od_annotation(n: int) -> Dict[str, Any]:
+        shapes = []
+        for i in range(n):
+            if i % 4 == 3:
+                shapes.append(
+                    {
+                        "id": f"shape-{i}",
+                        "type": "polygon",
+                        "points": [
+                            {
+                                "x": round(rng.uniform(0, 100), 2),
+                                "y": round(rng.uniform(0, 100), 2),
+                            }
+                            for _ in range(rng.randint(3, 12))
+                        ],
+                        "label": rng.choice(labels),
+                        "confidence": rng.randint(1, 5),
+                    }
+                )
+            else:
+                shapes.append(
+                    {
+                        "id": f"shape-{i}",
+                        "type": "bbox",
+                        "x": round(rng.uniform(0, 90), 2),
+                        "y": round(rng.uniform(0, 90), 2),
+                        "width": round(rng.uniform(1, 10), 2),
+                        "height": round(rng.uniform(1, 10), 2),
+                        "label": rng.choice(labels),
+                        "confidence": rng.randint(1, 5),
+                    }
+                )
+        return {"annotations": shapes, "image_url": "https://example.com/img.jpg"}
+
+    def ner_annotation(n: int) -> Dict[str, Any]:
+        entities, offset = [], 0
+        for _ in range(n):
+            offset += rng.randint(1, 40)
+            length = rng.randint(2, 15)
+            entities.append(
+                {
+                    "entity": "w" * length,
+                    "type": rng.choice(entity_types),
+                    "start": offset,
+                    "end": offset + length,
+                }
+            )
+            offset += length
+        return {"entities": entities}
+
+    print(
+        f"{'payload':<10}{'items':>7}{'raw B':>11}{'packed B':>11}{'ratio':>7}"
+        f"{'enc ms':>9}{'dec ms':>9}"
+    )
+    for name, build in (("od", od_annotation), ("ner", ner_annotation)):
+        for n in sizes:
+            annotation = build(n)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                encoded = encode_annotation(annotation)
+            encode_ms = (time.perf_counter() - start) * 1000 / repeat
+            start = time.perf_counter()
+            for _ in range(repeat):
+                decode_annotation(encoded)
+            decode_ms = (time.perf_counter() - start) * 1000 / repeat
+
+            raw = stored_size({"annotation": annotation})
+            packed = stored_size({"annotation": encoded})
+            print(
+                f"{name:<10}{n:>7}{raw:>11}{packed:>11}{raw / packed:>7.1f}"
+                f"{encode_ms:>9.2f}{decode_ms:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    _benchmark()
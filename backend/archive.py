@@ -0,0 +1,238 @@
+"""Hot/cold tiering for completed projects.
+
+Archiving moves a completed project's documents out of the working
+collections (``tasks``, ``annotator_tasks``, ``notifications``,
+``task_remarks``) into ``<name>_archive`` collections, which are created with
+zstd block compression. Restoring moves them back. While a move is in
+progress the project's ``archive_state`` is ``archiving`` or ``restoring`` and
+reads consult both tiers, so data stays readable throughout.
+
+Moves are idempotent and run in the background. A move that fails keeps its
+``archive_state`` and records ``archive_error``; one that never finishes (the
+process died) is considered failed after ``ARCHIVE_MOVE_TIMEOUT_SECONDS``.
+Either way it can be rerun in the same direction or reversed (reopening the
+project restores it).
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteOne, ReplaceOne
+
+import database
+
+ARCHIVED_COLLECTIONS = database.ARCHIVED_COLLECTION_NAMES
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_MOVE_TIMEOUT_SECONDS = float(os.getenv("ARCHIVE_MOVE_TIMEOUT_SECONDS", "3600"))
+
+
+def live_collection(name: str):
+    return getattr(database, f"{name}_collection")
+
+
+def archive_collection(name: str):
+    return getattr(database, f"{database.archive_name(name)}_collection")
+
+
+def collections_for(project: Optional[Dict[str, Any]], name: str) -> List[Any]:
+    """Return the collection(s) holding a project's documents of the given kind."""
+    state = (project or {}).get("archive_state")
+    if state == "archived":
+        return [archive_collection(name)]
+    if state in ("archiving", "restoring"):
+        return [live_collection(name), archive_collection(name)]
+    return [live_collection(name)]
+
+
+async def find_project_documents(
+    project: Dict[str, Any],
+    name: str,
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Find a project's documents in whichever tier currently holds them."""
+    docs: Dict[ObjectId, Dict[str, Any]] = {}
+    for collection in collections_for(project, name):
+        async for doc in collection.find(query, projection):
+            # A document being moved can briefly exist in both tiers
+            docs.setdefault(doc["_id"], doc)
+    return list(docs.values())
+
+
+async def count_project_documents(
+    project: Dict[str, Any], name: str, query: Dict[str, Any]
+) -> int:
+    total = 0
+    for collection in collections_for(project, name):
+        total += await collection.count_documents(query)
+    return total
+
+
+async def find_one_with_archive(
+    name: str, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Find a document in the live tier, falling back to the archive."""
+    doc = await live_collection(name).find_one(query, projection)
+    if doc is None:
+        doc = await archive_collection(name).find_one(query, projection)
+    return doc
+
+
+async def find_with_archive(
+    name: str,
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Find matching documents across both tiers (for non project-scoped reads)."""
+    docs: Dict[ObjectId, Dict[str, Any]] = {}
+    for collection in (live_collection(name), archive_collection(name)):
+        async for doc in collection.find(query, projection):
+            docs.setdefault(doc["_id"], doc)
+    return list(docs.values())
+
+
+async def find_page_with_archive(
+    name: str,
+    query: Dict[str, Any],
+    limit: int,
+    before_id: Optional[ObjectId] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[ObjectId]]:
+    """Return one page of matching documents across both tiers, newest ``_id`` first.
+
+    Each tier is read with the same ``_id`` bound and limit and the results are
+    merged, so a page costs two index range reads however large the history
+    is. Also returns the cursor for the next page (None on the last page).
+    """
+    if before_id is not None:
+        query = {**query, "_id": {"$lt": before_id}}
+    docs: Dict[ObjectId, Dict[str, Any]] = {}
+    for collection in (live_collection(name), archive_collection(name)):
+        cursor = collection.find(query, projection).sort("_id", -1)
+        async for doc in cursor.limit(limit + 1):
+            docs.setdefault(doc["_id"], doc)
+    page = sorted(docs.values(), key=lambda doc: doc["_id"], reverse=True)
+    if len(page) > limit:
+        return page[:limit], page[limit - 1]["_id"]
+    return page, None
+
+
+async def count_with_archive(name: str, query: Dict[str, Any]) -> int:
+    live = await live_collection(name).count_documents(query)
+    archived = await archive_collection(name).count_documents(query)
+    return live + archived
+
+
+def move_failed(project: Dict[str, Any]) -> bool:
+    """Whether the project's archive or restore move failed or was abandoned."""
+    if project.get("archive_state") not in ("archiving", "restoring"):
+        return False
+    if project.get("archive_error"):
+        return True
+    started_at = project.get("archive_started_at")
+    timeout = timedelta(seconds=ARCHIVE_MOVE_TIMEOUT_SECONDS)
+    return started_at is None or started_at < datetime.utcnow() - timeout
+
+
+async def _move_documents(source, target, query: Dict[str, Any]) -> int:
+    """Copy matching documents to ``target`` in batches, then delete them from ``source``.
+
+    Copies are idempotent replaces keyed on ``_id``, so a move interrupted at
+    any point can be rerun. A source document is only deleted if it still
+    equals the copy; one written to in between stays in the source and is
+    copied again by the next pass.
+    """
+    moved = 0
+    while True:
+        batch = (
+            await source.find(query)
+            .sort("_id", 1)
+            .limit(ARCHIVE_BATCH_SIZE)
+            .to_list(ARCHIVE_BATCH_SIZE)
+        )
+        if not batch:
+            return moved
+        await target.bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in batch],
+            ordered=False,
+        )
+        result = await source.bulk_write(
+            [DeleteOne(doc) for doc in batch], ordered=False
+        )
+        moved += result.deleted_count
+
+
+async def _move_project(project_id: ObjectId, to_archive: bool) -> Dict[str, int]:
+    moved: Dict[str, int] = {}
+    for name in ARCHIVED_COLLECTIONS:
+        live, archived = live_collection(name), archive_collection(name)
+        source, target = (live, archived) if to_archive else (archived, live)
+        moved[name] = await _move_documents(
+            source, target, {"project_id": project_id}
+        )
+    return moved
+
+
+async def start_move(project_id: ObjectId, state: str) -> None:
+    """Mark a project as being archived or restored, before the move is queued."""
+    await database.projects_collection.update_one(
+        {"_id": project_id},
+        {
+            "$set": {"archive_state": state, "archive_started_at": datetime.utcnow()},
+            "$unset": {"archive_error": ""},
+        },
+    )
+
+
+async def _run_move(
+    project_id: ObjectId, to_archive: bool, done: Dict[str, Any]
+) -> Optional[Dict[str, int]]:
+    state = "archiving" if to_archive else "restoring"
+    await start_move(project_id, state)
+    try:
+        moved = await _move_project(project_id, to_archive)
+    except Exception as e:
+        # Both tiers stay readable; the move can be retried or reversed
+        await database.projects_collection.update_one(
+            {"_id": project_id, "archive_state": state},
+            {"$set": {"archive_error": str(e) or type(e).__name__}},
+        )
+        print(f"Moving project {project_id} failed while {state}: {e}")
+        return None
+    await database.projects_collection.update_one(
+        {"_id": project_id, "archive_state": state},
+        {**done, "$unset": {**done.get("$unset", {}), "archive_started_at": ""}},
+    )
+    return moved
+
+
+async def archive_project(project_id: ObjectId) -> Optional[Dict[str, int]]:
+    """Move a project's documents to the archive tier.
+
+    Returns the documents moved per collection, or None if the move failed.
+    """
+    moved = await _run_move(
+        project_id,
+        to_archive=True,
+        done={"$set": {"archive_state": "archived", "archived_at": datetime.utcnow()}},
+    )
+    if moved is not None:
+        print(f"Archived project {project_id}: {moved}")
+    return moved
+
+
+async def restore_project(project_id: ObjectId) -> Optional[Dict[str, int]]:
+    """Move a project's documents back to the working collections.
+
+    Returns the documents moved per collection, or None if the move failed.
+    """
+    moved = await _run_move(
+        project_id,
+        to_archive=False,
+        done={"$unset": {"archive_state": "", "archived_at": ""}},
+    )
+    if moved is not None:
+        print(f"Restored project {project_id}: {moved}")
+    return moved
@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from datetime import datetime
 
 import database
+from platform_stats import record_role_change
 from schemas import UserCreate, UserResponse, LoginRequest, Token
 from auth import get_password_hash, verify_password, create_access_token
 from utils import as_response, get_current_user
@@ -41,6 +42,7 @@ async def register_user(user: UserCreate):
 
     # Insert user
     result = await database.users_collection.insert_one(user_dict)
+    await record_role_change(None, user.role)
 
     # Get created user
     created_user = await database.users_collection.find_one({"_id": result.inserted_id})
@@ -0,0 +1,134 @@
+"""Content-addressed storage for large task_data fields.
+
+Large values (typically the source ``document`` of LLM response grading tasks,
+which is often shared by many tasks grading different summaries) are stored
+once in the ``blobs`` collection under the SHA-256 of their canonical JSON
+encoding, with a reference count. The task keeps the rest of ``task_data``
+inline and records the externalized fields in ``task_data_blobs``:
+
+    {"document": {"sha256": "<hex>", "size": 48213}}
+
+References are resolved only where the full payload is needed: opening a single
+task, the completed-task review list and exports (batched, one query per call).
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+import database
+
+# task_data fields whose encoded size is at least this many bytes are externalized
+BLOB_THRESHOLD_BYTES = int(os.getenv("BLOB_THRESHOLD_BYTES", "16384"))
+
+
+def blob_key(value: Any) -> Tuple[str, int]:
+    """Return the SHA-256 hex digest and byte size of a value's canonical JSON form."""
+    encoded = json.dumps(
+        value, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest(), len(encoded)
+
+
+async def put_blob(value: Any) -> Dict[str, Any]:
+    """Store a value (or add a reference to an identical stored one)."""
+    digest, size = blob_key(value)
+    update = {
+        "$setOnInsert": {
+            "data": value,
+            "size": size,
+            "created_at": datetime.utcnow(),
+        },
+        "$inc": {"ref_count": 1},
+    }
+    try:
+        await database.blobs_collection.update_one({"_id": digest}, update, upsert=True)
+    except DuplicateKeyError:
+        # Lost an upsert race with an identical insert; the document exists now
+        await database.blobs_collection.update_one({"_id": digest}, update)
+    return {"sha256": digest, "size": size}
+
+
+async def release_blobs(digests: Iterable[str]) -> None:
+    """Drop one reference from each blob, deleting blobs no longer referenced."""
+    blobs = database.blobs_collection
+    for digest in digests:
+        await blobs.update_one({"_id": digest}, {"$inc": {"ref_count": -1}})
+        await blobs.delete_one({"_id": digest, "ref_count": {"$lte": 0}})
+
+
+async def externalize_task_data(
+    task_data: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Split task_data into inline fields and blob references for large fields."""
+    inline: Dict[str, Any] = {}
+    refs: Dict[str, Dict[str, Any]] = {}
+    for field, value in task_data.items():
+        if (
+            isinstance(value, (str, list, dict))
+            and blob_key(value)[1] >= BLOB_THRESHOLD_BYTES
+        ):
+            refs[field] = await put_blob(value)
+        else:
+            inline[field] = value
+    return inline, refs
+
+
+def task_blob_digests(task: Dict[str, Any]) -> List[str]:
+    return [ref["sha256"] for ref in (task.get("task_data_blobs") or {}).values()]
+
+
+async def release_task_blobs(task: Dict[str, Any]) -> None:
+    await release_blobs(task_blob_digests(task))
+
+
+async def resolve_task_data_many(
+    tasks: List[Dict[str, Any]],
+    keep_refs: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """Inline the externalized fields of several tasks with one blob query.
+
+    Tasks are updated in place (and returned); shared blobs are fetched once.
+    Fields named in ``keep_refs`` stay in ``task_data_blobs`` unresolved.
+    """
+    keep_refs = set(keep_refs)
+    digests = {
+        ref["sha256"]
+        for task in tasks
+        for field, ref in (task.get("task_data_blobs") or {}).items()
+        if field not in keep_refs
+    }
+    if not digests:
+        return tasks
+
+    blobs = {
+        blob["_id"]: blob["data"]
+        async for blob in database.blobs_collection.find(
+            {"_id": {"$in": list(digests)}}, {"data": 1}
+        )
+    }
+    for task in tasks:
+        refs: Optional[Dict[str, Any]] = task.pop("task_data_blobs", None)
+        if not refs:
+            continue
+        task_data = dict(task.get("task_data") or {})
+        kept = {}
+        for field, ref in refs.items():
+            if field in keep_refs:
+                kept[field] = ref
+            elif ref["sha256"] in blobs:
+                task_data[field] = blobs[ref["sha256"]]
+        task["task_data"] = task_data
+        if kept:
+            task["task_data_blobs"] = kept
+    return tasks
+
+
+async def resolve_task_data(
+    task: Dict[str, Any], keep_refs: Iterable[str] = ()
+) -> Dict[str, Any]:
+    return (await resolve_task_data_many([task], keep_refs))[0]
@@ -0,0 +1,325 @@
+"""Normalization and overlap checks for submitted object detection boxes.
+
+Boxes arrive in three shapes (``annotations`` items of type bbox and legacy
+``bounding_boxes`` items with ``x/y/width/height`` keys, and legacy
+``objects`` items with a ``bbox`` list or dict), in percentage coordinates of
+the image. ``normalize_detection_annotation`` handles all of them in one
+vectorized pass:
+
+- boxes drawn right-to-left or bottom-to-top (negative width/height) are
+  flipped to a top-left origin;
+- boxes are clamped to the image (0..100 on both axes);
+- boxes left with zero area are dropped;
+- near-duplicates (same label, IoU of at least ``DUPLICATE_IOU``) are flagged.
+
+Coordinates and labels are read a field at a time with ``map`` over the
+items straight into NumPy columns, so no Python code runs per box except for
+the few boxes that are rewritten; irregular lists (mixed conventions, missing
+or non-numeric coordinates) fall back to reading each item.
+
+Near-duplicates are found with a sweep over the boxes sorted by label and left
+edge: a box can only reach ``DUPLICATE_IOU`` with boxes whose left edge lies
+within ``(1 - DUPLICATE_IOU)`` of its width to its right, so one
+``searchsorted`` gives every box its window of candidates and only those
+pairs are compared, instead of all n² of them.
+
+Run ``python box_validation.py`` for a latency benchmark; it exits non-zero
+when 5000 boxes take longer than ``BENCHMARK_BUDGET_MS``.
+"""
+
+from itertools import chain, repeat
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+IMAGE_BOUNDS = (0.0, 100.0)
+DUPLICATE_IOU = 0.9
+BOX_LIST_KEYS = ("annotations", "bounding_boxes", "objects")
+
+# Latency target of the benchmark for 5000 boxes
+BENCHMARK_BUDGET_MS = 8.0
+
+
+def _coords(item: Any) -> Optional[List[float]]:
+    """x, y, width, height of a box item, or None if it is not a box."""
+    if not isinstance(item, dict) or item.get("type", "bbox") != "bbox":
+        return None
+    bbox = item.get("bbox", item)
+    try:
+        if isinstance(bbox, dict):
+            x, y = bbox["x"], bbox["y"]
+            width, height = bbox["width"], bbox["height"]
+        else:
+            x, y, width, height = bbox
+        return [float(x), float(y), float(width), float(height)]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _label(item: Dict[str, Any]) -> str:
+    return str(item.get("label", item.get("class", "")))
+
+
+def _read_columns(sources: List[Any]) -> Optional[np.ndarray]:
+    """``(4, n)`` x, y, width, height of box sources sharing one convention.
+
+    Returns None when the sources mix conventions or any coordinate is
+    missing or not a number, for the caller to read them one at a time.
+    """
+    n = len(sources)
+    try:
+        columns = np.stack(
+            [
+                np.fromiter(map(itemgetter(key), sources), float, n)
+                for key in ("x", "y", "width", "height")
+            ]
+        )
+    except (KeyError, TypeError, ValueError):
+        try:
+            if set(map(len, sources)) - {4}:
+                return None
+            values = np.fromiter(chain.from_iterable(sources), float, 4 * n)
+        except (TypeError, ValueError):
+            return None
+        columns = np.ascontiguousarray(values.reshape(n, 4).T)
+    # fromiter reads None as NaN, where _coords rejects the item
+    return None if np.isnan(columns).any() else columns
+
+
+def _label_codes(boxes: List[Dict[str, Any]]) -> np.ndarray:
+    """Integer code per box; boxes share a code exactly when labels match."""
+    labels = list(map(dict.get, boxes, repeat("label")))
+    if not set(map(type, labels)) <= {str}:
+        labels = list(map(_label, boxes))
+    lookup = {label: code for code, label in enumerate(set(labels))}
+    return np.fromiter(map(lookup.__getitem__, labels), int, len(labels))
+
+
+def _box_columns(items: List[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions, ``(4, n)`` x, y, width, height and label codes of the boxes.
+
+    Lists of dicts are read a field at a time with C-level ``map`` calls
+    straight into NumPy; irregular lists fall back to ``_coords`` per item.
+    """
+    try:
+        kinds = list(map(dict.get, items, repeat("type"), repeat("bbox")))
+    except TypeError:
+        kinds = None
+    if kinds is not None:
+        if kinds.count("bbox") == len(kinds):
+            positions, boxes = np.arange(len(items)), items
+        else:
+            positions = np.flatnonzero([kind == "bbox" for kind in kinds])
+            boxes = [items[position] for position in positions.tolist()]
+        columns = _read_columns(list(map(dict.get, boxes, repeat("bbox"), boxes)))
+        if columns is not None:
+            return positions, columns, _label_codes(boxes)
+
+    found, rows = [], []
+    for position, item in enumerate(items):
+        values = _coords(item)
+        if values is not None:
+            found.append(position)
+            rows.append(values)
+    columns = np.array(rows, dtype=float).reshape(-1, 4).T
+    boxes = [items[position] for position in found]
+    positions = np.array(found, dtype=int)
+    return positions, np.ascontiguousarray(columns), _label_codes(boxes)
+
+
+def _with_coords(item: Dict[str, Any], x, y, width, height) -> Dict[str, Any]:
+    """Copy of a box item with new coordinates, in the item's own convention."""
+    item = dict(item)
+    bbox = item.get("bbox")
+    if isinstance(bbox, (list, tuple)):
+        item["bbox"] = [x, y, width, height]
+    elif isinstance(bbox, dict):
+        item["bbox"] = {**bbox, "x": x, "y": y, "width": width, "height": height}
+    else:
+        item.update(x=x, y=y, width=width, height=height)
+    return item
+
+
+def normalize_boxes(
+    xywh: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Flip and clamp boxes given as ``(4, n)`` x, y, width, height rows.
+
+    Returns ``(corners, changed, clamped, degenerate)``: ``(4, n)`` x1, y1,
+    x2, y2 corners inside the image, and masks of the boxes that were flipped
+    or clamped, clamped, or have no area left.
+    """
+    low, high = IMAGE_BOUNDS
+    x, y, width, height = xywh
+    x2, y2 = x + width, y + height
+    corners = np.stack(
+        [np.minimum(x, x2), np.minimum(y, y2), np.maximum(x, x2), np.maximum(y, y2)]
+    )
+    clamped_corners = corners.clip(low, high)
+    clamped = (clamped_corners != corners).any(axis=0)
+    changed = clamped | (width < 0) | (height < 0)
+    left, top, right, bottom = clamped_corners
+    degenerate = ~((right > left) & (bottom > top)) | ~np.isfinite(
+        clamped_corners
+    ).all(axis=0)
+    return clamped_corners, changed, clamped, degenerate
+
+
+def _iou_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of box ``a[:, i]`` with ``b[:, i]`` for ``(4, n)`` corner columns."""
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    width = np.minimum(ax2, bx2) - np.maximum(ax1, bx1)
+    height = np.minimum(ay2, by2) - np.maximum(ay1, by1)
+    overlap = np.maximum(width, 0) * np.maximum(height, 0)
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - overlap
+    return overlap / union
+
+
+def near_duplicates(
+    corners: np.ndarray, labels: np.ndarray, threshold: float = DUPLICATE_IOU
+) -> np.ndarray:
+    """Index pairs ``(i, j)``, i < j, of same-label boxes with IoU >= threshold."""
+    n = len(corners)
+    if n < 2:
+        return np.empty((0, 2), dtype=int)
+    # Sort by label, then left edge; labels are spaced further apart than any
+    # box can reach so windows never cross into the next label
+    span = IMAGE_BOUNDS[1] - IMAGE_BOUNDS[0]
+    keys = labels * (2 * span) + corners[:, 0]
+    # Boxes with equal keys are in each other's windows, so any sort order works
+    order = np.argsort(keys)
+    keys = keys[order]
+    columns = corners.T.take(order, axis=1)
+    reach = (1 - threshold) * (columns[2] - columns[0])
+    # Each box's candidates are the boxes after it up to the end of its window
+    window_end = np.searchsorted(keys, keys + reach, side="right")
+    counts = np.maximum(window_end - np.arange(n) - 1, 0)
+    first = np.repeat(np.arange(n), counts)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+    second = first + 1 + offsets
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit = (
+            _iou_rows(columns.take(first, axis=1), columns.take(second, axis=1))
+            >= threshold
+        )
+    pairs = np.sort(np.stack([order[first[hit]], order[second[hit]]], axis=1), axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def normalize_box_list(
+    items: List[Any], threshold: float = DUPLICATE_IOU
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """Normalize the boxes of one list; other items are kept unchanged.
+
+    Returns the new list and a report with the number of clamped and dropped
+    boxes and the near-duplicate index pairs (into the new list).
+    """
+    positions, coords, label_codes = _box_columns(items)
+    report: Dict[str, Any] = {"boxes": len(positions), "clamped": 0, "dropped": 0}
+    if not len(positions):
+        report["near_duplicates"] = []
+        return list(items), report
+
+    corners, changed, clamped, degenerate = normalize_boxes(coords)
+    report["clamped"] = int((clamped & ~degenerate).sum())
+    report["dropped"] = int(degenerate.sum())
+
+    x1, y1, x2, y2 = corners
+    rewrite = np.flatnonzero(changed & ~degenerate)
+    updates = np.stack([x1, y1, x2 - x1, y2 - y1]).take(rewrite, axis=1)
+    normalized = list(items)
+    for position, values in zip(positions[rewrite].tolist(), updates.T.tolist()):
+        normalized[position] = _with_coords(items[position], *values)
+    dropped = positions[degenerate]
+    if len(dropped):
+        keep = np.delete(np.arange(len(normalized)), dropped)
+        normalized = [normalized[position] for position in keep.tolist()]
+
+    kept = np.flatnonzero(~degenerate)
+    kept_corners = corners.take(kept, axis=1).T
+    pairs = near_duplicates(kept_corners, label_codes[kept], threshold)
+    # Positions in the new list shift left past every dropped box
+    pair_positions = positions[kept][pairs]
+    report["near_duplicates"] = (
+        pair_positions - np.searchsorted(dropped, pair_positions)
+    ).tolist()
+    return normalized, report
+
+
+def normalize_detection_annotation(
+    annotation: Dict[str, Any], threshold: float = DUPLICATE_IOU
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Normalize every box list of a detection annotation.
+
+    Returns a copy of the annotation and a report per normalized list key.
+    """
+    if not isinstance(annotation, dict):
+        return annotation, {}
+    normalized = dict(annotation)
+    reports: Dict[str, Dict[str, Any]] = {}
+    for key in BOX_LIST_KEYS:
+        if isinstance(annotation.get(key), list):
+            normalized[key], reports[key] = normalize_box_list(
+                annotation[key], threshold
+            )
+    return normalized, reports
+
+
+def _benchmark_boxes(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """``n`` random boxes plus about 5% near-duplicate copies."""
+    import random
+
+    rng = random.Random(seed)
+    labels = ["car", "person", "bicycle", "bus", "truck", "traffic light"]
+    boxes = []
+    for i in range(n):
+        # A few boxes are drawn from the bottom-right or hang off the image
+        sign = -1 if rng.random() < 0.03 else 1
+        box = {
+            "id": f"box-{i}",
+            "type": "bbox",
+            "label": rng.choice(labels),
+            "x": rng.uniform(-1, 99),
+            "y": rng.uniform(-1, 99),
+            "width": sign * rng.uniform(0, 6),
+            "height": sign * rng.uniform(0, 6),
+        }
+        boxes.append(box)
+        if rng.random() < 0.05:
+            boxes.append({**box, "id": f"box-{i}-copy", "x": box["x"] + 0.01})
+    return boxes
+
+
+def _benchmark(sizes=(100, 1000, 5000), repeat: int = 20) -> bool:
+    """Print per-size latencies; False if 5000 boxes miss the budget."""
+    import time
+
+    within_budget = True
+    for n in sizes:
+        boxes = _benchmark_boxes(n)
+        annotation = {"annotations": boxes}
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _, reports = normalize_detection_annotation(annotation)
+            timings.append((time.perf_counter() - start) * 1000)
+        # The fastest run is the least disturbed by other load
+        elapsed = min(timings)
+        report = reports["annotations"]
+        print(
+            f"{len(boxes):>6} boxes: {elapsed:7.2f} ms "
+            f"(clamped {report['clamped']}, dropped {report['dropped']}, "
+            f"near-duplicates {len(report['near_duplicates'])})"
+        )
+        if n == 5000 and elapsed > BENCHMARK_BUDGET_MS:
+            print(f"  over the {BENCHMARK_BUDGET_MS} ms budget")
+            within_budget = False
+    return within_budget
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(0 if _benchmark() else 1)
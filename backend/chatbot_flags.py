@@ -0,0 +1,75 @@
+"""Bitmask of the safety and quality flags of chatbot model assessments.
+
+A chatbot assessment annotation carries eleven boolean flags. Submitting one
+also stores them on the task as a single integer, ``flag_bits``, with bit
+``i`` set when ``FLAG_NAMES[i]`` is true. Flag rates are then grouped on one
+small integer instead of decoded from every annotation, and tasks carrying a
+given combination of flags are selected server-side with
+``{"flag_bits": {"$bitsAllSet": mask}}``.
+
+The bit positions are stored in the database: only append to ``FLAG_NAMES``.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+FLAGS_FIELD = "flag_bits"
+
+FLAG_NAMES = (
+    "fails_to_follow",
+    "inappropriate_for_customer",
+    "hallucination",
+    "satisfies_constraint",
+    "contains_sexual",
+    "contains_violent",
+    "encourages_violence",
+    "denigrates_protected_class",
+    "gives_harmful_advice",
+    "expresses_opinion",
+    "expresses_moral_judgment",
+)
+
+
+def flag_bits(annotation: Any) -> Optional[int]:
+    """Bitmask of an annotation's flags, or None if it records none of them."""
+    if not isinstance(annotation, dict):
+        return None
+    bits = 0
+    recorded = False
+    for bit, name in enumerate(FLAG_NAMES):
+        value = annotation.get(name)
+        if isinstance(value, bool):
+            recorded = True
+            if value:
+                bits |= 1 << bit
+    return bits if recorded else None
+
+
+def flags_mask(names: Iterable[str]) -> int:
+    """Bitmask of the named flags; raises ValueError for an unknown name."""
+    mask = 0
+    for name in names:
+        if name not in FLAG_NAMES:
+            raise ValueError(f"Unknown flag: {name}")
+        mask |= 1 << FLAG_NAMES.index(name)
+    return mask
+
+
+def flag_names(bits: int) -> List[str]:
+    return [name for bit, name in enumerate(FLAG_NAMES) if bits >> bit & 1]
+
+
+def flags_filter(
+    all_of: Iterable[str] = (), none_of: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """Query on ``flag_bits`` for tasks with all of ``all_of`` and none of ``none_of``.
+
+    Tasks without a stored bitmask never match.
+    """
+    condition: Dict[str, Any] = {"$exists": True}
+    required = flags_mask(all_of)
+    excluded = flags_mask(none_of)
+    if required:
+        condition["$bitsAllSet"] = required
+    if excluded:
+        condition["$bitsAllClear"] = excluded
+    return {FLAGS_FIELD: condition}
@@ -0,0 +1,76 @@
+"""Per-project and per-annotator sketches of annotation completion times.
+
+Each project keeps one DDSketch (see ddsketch) of its completion times with
+``annotator_id`` None, plus one per annotator, in the ``completion_sketches``
+collection. Submitting an annotation adds the task's completion time to both
+with a single ``$inc`` each; returning or unassigning the task removes it
+again. The annotator's task record stores the value that went into the
+sketches as ``sketched_time``, so exactly that sample is removed and the
+backfill (m0008) never counts a record twice.
+"""
+
+from typing import Dict, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+import database
+from ddsketch import sketch_increments
+
+
+def sketch_updates(
+    project_id: ObjectId, annotator_id: ObjectId, value: float, weight: int = 1
+):
+    """Upserts adding (weight -1: removing) a sample for project and annotator."""
+    increments = sketch_increments(value, weight)
+    return [
+        UpdateOne(
+            {"project_id": project_id, "annotator_id": owner},
+            {"$inc": increments},
+            upsert=True,
+        )
+        for owner in (None, annotator_id)
+    ]
+
+
+async def add_completion_time(
+    project_id: ObjectId, annotator_id: ObjectId, value: float
+) -> None:
+    await database.bulk_upsert(
+        database.completion_sketches_collection,
+        sketch_updates(project_id, annotator_id, value),
+    )
+
+
+async def remove_completion_time(
+    project_id: ObjectId, annotator_id: ObjectId, value: Optional[float]
+) -> None:
+    """Remove a sample added with ``add_completion_time`` (no-op for None)."""
+    if value is None:
+        return
+    await database.bulk_upsert(
+        database.completion_sketches_collection,
+        sketch_updates(project_id, annotator_id, value, -1),
+    )
+
+
+# Fields of an annotator task record needed to remove its sample
+RECORD_PROJECTION = {"project_id": 1, "annotator_id": 1, "sketched_time": 1}
+
+
+async def release_record_sample(record: Optional[Dict]) -> None:
+    """Remove the sample of an annotator task record (pre-image), if it had one."""
+    if record:
+        await remove_completion_time(
+            record["project_id"], record["annotator_id"], record.get("sketched_time")
+        )
+
+
+async def project_sketches(project_id: ObjectId) -> Dict[Optional[ObjectId], Dict]:
+    """Return a project's sketches keyed by annotator (None for the whole project)."""
+    return {
+        sketch["annotator_id"]: sketch
+        async for sketch in database.completion_sketches_collection.find(
+            {"project_id": project_id}, {"_id": 0}
+        )
+    }
@@ -30,5 +30,11 @@ class Settings(BaseModel):
     port: int = int(os.getenv("PORT", "8000"))
     reload: bool = os.getenv("RELOAD", "True").lower() == "true"
 
+    # Migrations
+    migration_batch_size: int = int(os.getenv("MIGRATION_BATCH_SIZE", "500"))
+    migration_ops_per_second: float = float(
+        os.getenv("MIGRATION_OPS_PER_SECOND", "1000")
+    )
+
 
 settings = Settings()
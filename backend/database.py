@@ -3,12 +3,25 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+from indexes import ensure_indexes
 
 load_dotenv()
 
 # MongoDB connection
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "patterncrafter")
+# "startup" waits for missing indexes before serving, "background" builds them
+# after startup, "off" skips index management entirely
+INDEX_BUILD_MODE = os.getenv("INDEX_BUILD_MODE", "startup").lower()
+# Block compressor for the cold-tier archive collections ("" keeps the server default)
+ARCHIVE_BLOCK_COMPRESSOR = os.getenv("ARCHIVE_BLOCK_COMPRESSOR", "zstd")
+ARCHIVE_SUFFIX = "_archive"
+ARCHIVED_COLLECTION_NAMES = ("tasks", "annotator_tasks", "notifications", "task_remarks")
+DUPLICATE_KEY_ERROR = 11000
 
 client: AsyncIOMotorClient = None
 database: AsyncIOMotorDatabase = None
@@ -22,6 +35,21 @@ manager_projects_collection = None
 project_working_collection = None
 annotator_tasks_collection = None
 notifications_collection = None
+task_assignments_collection = None
+task_remarks_collection = None
+blobs_collection = None
+platform_stats_collection = None
+daily_rollups_collection = None
+work_stats_cache_collection = None
+completion_sketches_collection = None
+report_cache_collection = None
+preference_counts_collection = None
+judgments_collection = None
+# Cold tier (see archive.py)
+tasks_archive_collection = None
+annotator_tasks_archive_collection = None
+notifications_archive_collection = None
+task_remarks_archive_collection = None
 
 
 async def connect_to_mongo():
@@ -30,6 +58,13 @@ async def connect_to_mongo():
     global users_collection, projects_collection, tasks_collection
     global invites_collection, manager_projects_collection
     global project_working_collection, annotator_tasks_collection, notifications_collection
+    global task_assignments_collection, task_remarks_collection
+    global blobs_collection, platform_stats_collection, daily_rollups_collection
+    global work_stats_cache_collection, completion_sketches_collection
+    global report_cache_collection, preference_counts_collection
+    global judgments_collection
+    global tasks_archive_collection, annotator_tasks_archive_collection
+    global notifications_archive_collection, task_remarks_archive_collection
 
     print(f"Connecting to MongoDB at {MONGODB_URL}...")
     client = AsyncIOMotorClient(MONGODB_URL)
@@ -44,13 +79,41 @@ async def connect_to_mongo():
     project_working_collection = database.get_collection("project_working")
     annotator_tasks_collection = database.get_collection("annotator_tasks")
     notifications_collection = database.get_collection("notifications")
+    task_assignments_collection = database.get_collection("task_assignments")
+    task_remarks_collection = database.get_collection("task_remarks")
+    blobs_collection = database.get_collection("blobs")
+    platform_stats_collection = database.get_collection("platform_stats")
+    daily_rollups_collection = database.get_collection("daily_rollups")
+    work_stats_cache_collection = database.get_collection("work_stats_cache")
+    completion_sketches_collection = database.get_collection("completion_sketches")
+    report_cache_collection = database.get_collection("report_cache")
+    preference_counts_collection = database.get_collection("preference_counts")
+    judgments_collection = database.get_collection("judgments")
+    tasks_archive_collection = database.get_collection(archive_name("tasks"))
+    annotator_tasks_archive_collection = database.get_collection(
+        archive_name("annotator_tasks")
+    )
+    notifications_archive_collection = database.get_collection(
+        archive_name("notifications")
+    )
+    task_remarks_archive_collection = database.get_collection(
+        archive_name("task_remarks")
+    )
 
     print("MongoDB connected successfully!")
     print(f"Collections initialized: users_collection={users_collection is not None}")
 
+    # Archive collections must exist before their indexes, otherwise createIndexes
+    # would create them implicitly without the compressed storage config
+    await create_archive_collections()
+
     # Create indexes for better performance
-    await create_indexes()
-    print("Indexes created successfully!")
+    if INDEX_BUILD_MODE == "background":
+        asyncio.create_task(_create_indexes_in_background())
+        print("Index build scheduled in background")
+    elif INDEX_BUILD_MODE != "off":
+        await create_indexes()
+        print("Indexes verified successfully!")
 
     # Seed default admin user
     # await seed_admin_user()
@@ -64,29 +127,61 @@ async def close_mongo_connection():
 
 
 async def create_indexes():
-    """Create database indexes for better performance"""
-    await users_collection.create_index("email", unique=True)
-    await users_collection.create_index("role")
-    await projects_collection.create_index("manager_id")
-    await projects_collection.create_index("category")
-    await tasks_collection.create_index("project_id")
-    await tasks_collection.create_index("category")
-    await tasks_collection.create_index("assigned_annotator_id")
-    await tasks_collection.create_index(
-        [("completed_status.annotator_part", 1), ("completed_status.qa_part", 1)]
-    )
-    await invites_collection.create_index([("project_id", 1), ("user_id", 1)])
-    await invites_collection.create_index("accepted_status")
-    await manager_projects_collection.create_index("project_id")
-    await project_working_collection.create_index("project_id")
-    await annotator_tasks_collection.create_index("project_id")
-    await annotator_tasks_collection.create_index("annotator_id")
-    await annotator_tasks_collection.create_index(
-        [("task_id", 1), ("annotator_id", 1)], unique=True
-    )
-    await notifications_collection.create_index("recipient_id")
-    await notifications_collection.create_index([("recipient_id", 1), ("is_read", 1)])
-    await notifications_collection.create_index("created_at")
+    """Create any registry indexes that are missing (see indexes.INDEXES)"""
+    created = await ensure_indexes(database)
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+
+
+def archive_name(name: str) -> str:
+    return f"{name}{ARCHIVE_SUFFIX}"
+
+
+async def bulk_upsert(collection, operations) -> None:
+    """Run counter upserts, retrying those that lost a race to insert the same key.
+
+    Two concurrent upserts of a new key can both try to insert it; the loser
+    fails with a duplicate key error and is simply applied again, now as an
+    update of the existing document.
+    """
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        await collection.bulk_write(
+            [operations[error["index"]] for error in errors], ordered=False
+        )
+
+
+async def create_archive_collections():
+    """Create the cold-tier archive collections with block compression if missing"""
+    existing = set(await database.list_collection_names())
+    for name in ARCHIVED_COLLECTION_NAMES:
+        if archive_name(name) in existing:
+            continue
+        options = {}
+        if ARCHIVE_BLOCK_COMPRESSOR:
+            options["storageEngine"] = {
+                "wiredTiger": {
+                    "configString": f"block_compressor={ARCHIVE_BLOCK_COMPRESSOR}"
+                }
+            }
+        try:
+            await database.create_collection(archive_name(name), **options)
+            print(f"Created archive collection {archive_name(name)}")
+        except Exception as e:
+            # Another instance may have created it concurrently
+            print(f"Could not create archive collection {archive_name(name)}: {e}")
+
+
+async def _create_indexes_in_background():
+    try:
+        await create_indexes()
+        print("Background index build finished")
+    except Exception as e:
+        print(f"Background index build failed: {e}")
 
 
 async def seed_admin_user():
@@ -100,7 +100,13 @@ async def create_sample_data():
             project = {
                 "manager_id": manager["_id"],
                 "details": "Sample text annotation project for sentiment analysis",
-                "task_ids": [],
+                "counters": {
+                    "total": 0,
+                    "annotated": 0,
+                    "qa_done": 0,
+                    "completed": 0,
+                    "returned": 0,
+                },
                 "created_at": datetime.utcnow(),
             }
 
@@ -114,7 +120,6 @@ async def create_sample_data():
                 "Tag intent classification for chatbot training",
             ]
 
-            task_ids = []
             for task_desc in sample_tasks:
                 task = {
                     "project_id": project_result.inserted_id,
@@ -123,13 +128,13 @@ async def create_sample_data():
                     "created_at": datetime.utcnow(),
                 }
 
-                task_result = await tasks_collection.insert_one(task)
-                task_ids.append(task_result.inserted_id)
+                await tasks_collection.insert_one(task)
                 print(f"Created task: {task_desc}")
 
-            # Update project with task IDs
+            # Update project counters with the sample tasks
             await projects_collection.update_one(
-                {"_id": project_result.inserted_id}, {"$set": {"task_ids": task_ids}}
+                {"_id": project_result.inserted_id},
+                {"$inc": {"counters.total": len(sample_tasks)}},
             )
 
     client.close()
@@ -149,6 +154,20 @@ async def clear_database():
         "manager_projects",
         "project_working",
         "annotator_tasks",
+        "task_assignments",
+        "task_remarks",
+        "tasks_archive",
+        "annotator_tasks_archive",
+        "notifications_archive",
+        "task_remarks_archive",
+        "blobs",
+        "platform_stats",
+        "daily_rollups",
+        "work_stats_cache",
+        "completion_sketches",
+        "report_cache",
+        "preference_counts",
+        "judgments",
     ]
 
     confirm = input("Are you sure you want to clear all data? Type 'YES' to confirm: ")
@@ -178,6 +197,20 @@ async def show_database_stats():
         "manager_projects",
         "project_working",
         "annotator_tasks",
+        "task_assignments",
+        "task_remarks",
+        "tasks_archive",
+        "annotator_tasks_archive",
+        "notifications_archive",
+        "task_remarks_archive",
+        "blobs",
+        "platform_stats",
+        "daily_rollups",
+        "work_stats_cache",
+        "completion_sketches",
+        "report_cache",
+        "preference_counts",
+        "judgments",
     ]
 
     print("Database Statistics:")
@@ -186,7 +219,7 @@ async def show_database_stats():
     for collection_name in collections:
         collection = database.get_collection(collection_name)
         count = await collection.count_documents({})
-        print(f"{collection_name:<20}: {count} documents")
+        print(f"{collection_name:<24}: {count} documents")
 
     # Show user role distribution
     users_collection = database.get_collection("users")
@@ -200,6 +233,148 @@ async def show_database_stats():
     client.close()
 
 
+async def reconcile_counters():
+    """Recompute project task counters and drop the legacy task_ids arrays"""
+    import database
+    from project_counters import reconcile_project_counters
+
+    await database.connect_to_mongo()
+    updated = await reconcile_project_counters()
+    print(f"Reconciled counters for {updated} projects")
+    await database.close_mongo_connection()
+
+
+async def run_migrations():
+    """Run pending schema migrations (see the migrations package)"""
+    import database
+    from config import settings
+    from migrations import MIGRATIONS
+    from migrations.runner import MigrationRunner
+
+    await database.connect_to_mongo()
+    runner = MigrationRunner(
+        MIGRATIONS,
+        batch_size=settings.migration_batch_size,
+        ops_per_second=settings.migration_ops_per_second,
+    )
+    ran = await runner.run_pending()
+    print(f"Ran migrations: {ran}" if ran else "No pending migrations")
+    await database.close_mongo_connection()
+
+
+async def benchmark_admin_listings(
+    users: int = 10000, projects: int = 1000, tasks_per_project: int = 50
+):
+    """Time the admin listing endpoints against a generated scratch database"""
+    import random
+    import time
+
+    import database
+    import admin_routes
+
+    # Start from an empty scratch database; connecting builds the registry indexes
+    bench_name = f"{DATABASE_NAME}_bench"
+    client = AsyncIOMotorClient(MONGODB_URL)
+    await client.drop_database(bench_name)
+    client.close()
+    database.DATABASE_NAME = bench_name
+    await database.connect_to_mongo()
+
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    managers = [
+        {
+            "_id": ObjectId(),
+            "name": f"Manager {i}",
+            "email": f"manager{i}@bench.example.com",
+            "role": "manager",
+            "paid": False,
+            "hashed_password": "x",
+            "created_at": now,
+        }
+        for i in range(max(1, users // 10))
+    ]
+    annotators = [
+        {
+            "_id": ObjectId(),
+            "name": f"Annotator {i}",
+            "email": f"annotator{i}@bench.example.com",
+            "role": "annotator",
+            "skills": ["NLP"],
+            "hashed_password": "x",
+            "created_at": now,
+        }
+        for i in range(users - len(managers))
+    ]
+    await database.users_collection.insert_many(managers + annotators)
+
+    project_docs, task_docs, invite_docs = [], [], []
+    for i in range(projects):
+        project_id = ObjectId()
+        members = rng.sample(annotators, min(5, len(annotators)))
+        counters = {"total": 0, "annotated": 0, "qa_done": 0, "completed": 0}
+        for j in range(tasks_per_project):
+            annotator, qa = rng.choice(members), rng.choice(members)
+            annotated = rng.random() < 0.6
+            qa_done = annotated and rng.random() < 0.5
+            task_docs.append(
+                {
+                    "project_id": project_id,
+                    "assigned_annotator_id": annotator["_id"],
+                    "assigned_qa_id": qa["_id"],
+                    "completed_status": {
+                        "annotator_part": annotated,
+                        "qa_part": qa_done,
+                    },
+                    "created_at": now,
+                }
+            )
+            counters["total"] += 1
+            counters["annotated"] += int(annotated)
+            counters["qa_done"] += int(qa_done)
+            counters["completed"] += int(qa_done)
+        project_docs.append(
+            {
+                "_id": project_id,
+                "manager_id": managers[i % len(managers)]["_id"],
+                "details": f"Benchmark project {i}",
+                "category": "NLP",
+                "counters": {**counters, "returned": 0},
+                "created_at": now,
+            }
+        )
+        invite_docs.extend(
+            {
+                "project_id": project_id,
+                "user_id": member["_id"],
+                "accepted_status": True,
+            }
+            for member in members
+        )
+    await database.projects_collection.insert_many(project_docs)
+    await database.tasks_collection.insert_many(task_docs)
+    await database.invites_collection.insert_many(invite_docs)
+    print(
+        f"Seeded {users} users, {projects} projects, {len(task_docs)} tasks "
+        f"into {bench_name}"
+    )
+
+    endpoints = [
+        ("/admin/managers", admin_routes.get_all_managers),
+        ("/admin/annotators", admin_routes.get_all_annotators),
+        ("/admin/projects", admin_routes.get_all_projects_admin),
+        ("/admin/users", admin_routes.get_all_users),
+    ]
+    for path, handler in endpoints:
+        start = time.perf_counter()
+        rows = await handler(current_user=None)
+        elapsed = time.perf_counter() - start
+        print(f"{path:<20} {len(rows):>6} rows {elapsed * 1000:>9.1f} ms")
+
+    await database.client.drop_database(bench_name)
+    await database.close_mongo_connection()
+
+
 async def send_task_assigned_notification(
     annotator_id: ObjectId,
     task_id: ObjectId,
@@ -286,7 +461,11 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python db_utils.py [create_admin|create_sample|clear|stats]")
+        print(
+            "Usage: python db_utils.py "
+            "[create_admin|create_sample|clear|stats|reconcile_counters|migrate|"
+            "bench_admin]"
+        )
         sys.exit(1)
 
     command = sys.argv[1]
@@ -300,7 +479,15 @@ if __name__ == "__main__":
         asyncio.run(clear_database())
     elif command == "stats":
         asyncio.run(show_database_stats())
+    elif command == "reconcile_counters":
+        asyncio.run(reconcile_counters())
+    elif command == "migrate":
+        asyncio.run(run_migrations())
+    elif command == "bench_admin":
+        asyncio.run(benchmark_admin_listings())
     else:
         print(
-            "Unknown command. Available commands: create_admin, create_sample, clear, stats"
+            "Unknown command. Available commands: "
+            "create_admin, create_sample, clear, stats, reconcile_counters, migrate, "
+            "bench_admin"
         )
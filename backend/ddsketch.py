@@ -0,0 +1,119 @@
+"""DDSketch: a mergeable quantile sketch with relative-error guarantees.
+
+A value ``x`` is counted in the logarithmic bin ``ceil(log_gamma(x))`` with
+``gamma = (1 + a) / (1 - a)``; every quantile read back from the bin counts is
+within relative error ``a`` of the true value. Bins are plain counters, so a
+sample is added or removed with a single increment and sketches merge by
+adding their bins. The number of bins grows with the spread of the values
+(about 600 for 1ms..1 day at 1% accuracy), not with the number of samples.
+
+Sketches are dicts shaped like their stored form:
+
+    {"count": 12, "sum": 3051.5, "zero_count": 0, "bins": {"271": 3, ...}}
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+# Values at or below this are counted in the zero bin
+MIN_VALUE = 1e-3
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def empty_sketch() -> Dict[str, Any]:
+    return {"count": 0, "sum": 0.0, "zero_count": 0, "bins": {}}
+
+
+def sketch_bin(value: float) -> Optional[int]:
+    """Return the bin index of a value, or None for the zero bin."""
+    if value <= MIN_VALUE:
+        return None
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def bin_value(index: int) -> float:
+    """Representative value of a bin (relative error at most RELATIVE_ACCURACY)."""
+    return 2 * GAMMA**index / (GAMMA + 1)
+
+
+def sketch_increments(value: float, weight: int = 1) -> Dict[str, float]:
+    """Flat counter increments adding (weight 1) or removing (weight -1) a sample.
+
+    Keys are dotted paths (``bins.<index>``), ready for a MongoDB ``$inc``.
+    """
+    index = sketch_bin(value)
+    key = "zero_count" if index is None else f"bins.{index}"
+    return {key: weight, "count": weight, "sum": weight * value}
+
+
+def add_sample(sketch: Dict[str, Any], value: float, weight: int = 1) -> None:
+    """Apply ``sketch_increments`` to an in-memory sketch."""
+    for key, delta in sketch_increments(value, weight).items():
+        if key.startswith("bins."):
+            index = key[len("bins.") :]
+            sketch["bins"][index] = sketch["bins"].get(index, 0) + delta
+        else:
+            sketch[key] = sketch.get(key, 0) + delta
+
+
+def merge_sketches(sketches: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add several sketches into a new one."""
+    merged = empty_sketch()
+    for sketch in sketches:
+        merged["count"] += sketch.get("count", 0)
+        merged["sum"] += sketch.get("sum", 0)
+        merged["zero_count"] += sketch.get("zero_count", 0)
+        for index, count in (sketch.get("bins") or {}).items():
+            merged["bins"][index] = merged["bins"].get(index, 0) + count
+    return merged
+
+
+def sketch_quantiles(
+    sketch: Dict[str, Any], quantiles: Iterable[float] = QUANTILES
+) -> Dict[float, Optional[float]]:
+    """Estimate quantiles from a sketch; None when it holds no samples."""
+    zero = max(0, sketch.get("zero_count", 0))
+    bins = sorted(
+        (int(index), count)
+        for index, count in (sketch.get("bins") or {}).items()
+        if count > 0
+    )
+    total = zero + sum(count for _, count in bins)
+    result: Dict[float, Optional[float]] = {}
+    for q in quantiles:
+        if total <= 0:
+            result[q] = None
+            continue
+        rank = q * (total - 1)
+        if rank < zero:
+            result[q] = 0.0
+            continue
+        seen = zero
+        estimate = bin_value(bins[-1][0])
+        for index, count in bins:
+            seen += count
+            if seen > rank:
+                estimate = bin_value(index)
+                break
+        result[q] = estimate
+    return result
+
+
+def sketch_summary(sketch: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Count, total, mean and p50/p90/p99 of a sketch, rounded to 2 decimals."""
+    sketch = sketch or {}
+    count = sketch.get("count", 0)
+    total = sketch.get("sum", 0)
+    summary: Dict[str, Any] = {
+        "count": count,
+        "total_seconds": round(total, 2),
+        "mean_seconds": round(total / count, 2) if count > 0 else None,
+    }
+    for q, value in sketch_quantiles(sketch).items():
+        summary[f"p{round(q * 100)}_seconds"] = (
+            round(value, 2) if value is not None else None
+        )
+    return summary
@@ -0,0 +1,290 @@
+"""Declarative index registry.
+
+Every index the application relies on is listed once in ``INDEXES``.
+``ensure_indexes`` compares the registry against the indexes that already exist
+and creates only the missing ones, one ``createIndexes`` command per collection,
+with all collections processed concurrently.
+"""
+
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+    partial_filter: Optional[Dict[str, Any]] = None
+
+    @property
+    def name(self) -> str:
+        # Same naming scheme MongoDB uses for unnamed indexes
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        return IndexModel(self.keys, **options)
+
+
+def _index(collection: str, *keys: Tuple[str, int], **options: Any) -> IndexSpec:
+    return IndexSpec(collection, list(keys), **options)
+
+
+def _present(field: str) -> Dict[str, Any]:
+    """Partial filter for fields that sparse task documents omit while unset."""
+    return {field: {"$exists": True}}
+
+
+INDEXES: List[IndexSpec] = [
+    # users
+    _index("users", ("email", ASCENDING), unique=True),
+    _index("users", ("role", ASCENDING), ("created_at", ASCENDING)),
+    # projects
+    _index("projects", ("manager_id", ASCENDING)),
+    _index("projects", ("category", ASCENDING)),
+    # tasks
+    _index("tasks", ("project_id", ASCENDING), ("assigned_annotator_id", ASCENDING)),
+    _index("tasks", ("project_id", ASCENDING), ("assigned_qa_id", ASCENDING)),
+    _index(
+        "tasks",
+        ("project_id", ASCENDING),
+        ("completed_status.annotator_part", ASCENDING),
+        ("completed_status.qa_part", ASCENDING),
+    ),
+    _index("tasks", ("category", ASCENDING)),
+    _index(
+        "tasks",
+        ("assigned_annotator_id", ASCENDING),
+        ("completed_status.annotator_part", ASCENDING),
+        partial_filter=_present("assigned_annotator_id"),
+    ),
+    _index(
+        "tasks",
+        ("assigned_qa_id", ASCENDING),
+        ("completed_status.qa_part", ASCENDING),
+        partial_filter=_present("assigned_qa_id"),
+    ),
+    _index(
+        "tasks",
+        ("completed_status.annotator_part", ASCENDING),
+        ("completed_status.qa_part", ASCENDING),
+    ),
+    _index("tasks", ("tag_task", ASCENDING), partial_filter=_present("tag_task")),
+    _index("tasks", ("created_at", ASCENDING)),
+    # chatbot assessment flag bitmasks (see chatbot_flags)
+    _index(
+        "tasks",
+        ("project_id", ASCENDING),
+        ("flag_bits", ASCENDING),
+        ("task_data.model_name", ASCENDING),
+        partial_filter=_present("flag_bits"),
+    ),
+    # judgment queue (see judgment_routes)
+    _index(
+        "tasks",
+        ("project_id", ASCENDING),
+        ("judgment_count", ASCENDING),
+        ("_id", ASCENDING),
+    ),
+    # invites
+    _index("invites", ("project_id", ASCENDING), ("user_id", ASCENDING)),
+    _index("invites", ("user_id", ASCENDING), ("accepted_status", ASCENDING)),
+    _index("invites", ("accepted_status", ASCENDING)),
+    # manager_projects / project_working
+    _index("manager_projects", ("project_id", ASCENDING)),
+    _index("project_working", ("project_id", ASCENDING)),
+    # annotator_tasks
+    _index("annotator_tasks", ("project_id", ASCENDING), ("annotator_id", ASCENDING)),
+    _index("annotator_tasks", ("annotator_id", ASCENDING), ("_id", ASCENDING)),
+    _index(
+        "annotator_tasks",
+        ("annotator_id", ASCENDING),
+        ("project_id", ASCENDING),
+        ("_id", ASCENDING),
+    ),
+    _index(
+        "annotator_tasks",
+        ("task_id", ASCENDING),
+        ("annotator_id", ASCENDING),
+        unique=True,
+    ),
+    # notifications
+    _index("notifications", ("recipient_id", ASCENDING), ("_id", DESCENDING)),
+    _index("notifications", ("recipient_id", ASCENDING), ("is_read", ASCENDING)),
+    _index("notifications", ("created_at", ASCENDING)),
+    _index("notifications", ("project_id", ASCENDING)),
+    # task_assignments
+    _index(
+        "task_assignments", ("project_id", ASCENDING), ("annotator_id", ASCENDING)
+    ),
+    _index(
+        "task_assignments",
+        ("task_id", ASCENDING),
+        ("annotator_id", ASCENDING),
+        unique=True,
+    ),
+    # task_remarks
+    _index(
+        "task_remarks",
+        ("task_id", ASCENDING),
+        ("created_at", ASCENDING),
+        ("_id", ASCENDING),
+    ),
+    _index("task_remarks", ("project_id", ASCENDING)),
+    # daily_rollups (see rollups.py)
+    _index(
+        "daily_rollups",
+        ("day", ASCENDING),
+        ("project_id", ASCENDING),
+        ("user_id", ASCENDING),
+        unique=True,
+    ),
+    _index("daily_rollups", ("user_id", ASCENDING), ("day", ASCENDING)),
+    _index("daily_rollups", ("project_id", ASCENDING), ("day", ASCENDING)),
+    # completion_sketches (see completion_sketches.py)
+    _index(
+        "completion_sketches",
+        ("project_id", ASCENDING),
+        ("annotator_id", ASCENDING),
+        unique=True,
+    ),
+    # report_cache (see report_cache.py)
+    _index(
+        "report_cache", ("project_id", ASCENDING), ("report", ASCENDING), unique=True
+    ),
+    # preference_counts (see preferences.py)
+    _index(
+        "preference_counts",
+        ("project_id", ASCENDING),
+        ("winner", ASCENDING),
+        ("loser", ASCENDING),
+        unique=True,
+    ),
+    # judgments (see judgments.py)
+    _index(
+        "judgments", ("task_id", ASCENDING), ("annotator_id", ASCENDING), unique=True
+    ),
+    _index("judgments", ("project_id", ASCENDING)),
+    # archive tier (see archive.py); only the read shapes served from the archive
+    _index(
+        "tasks_archive",
+        ("project_id", ASCENDING),
+        ("completed_status.annotator_part", ASCENDING),
+        ("completed_status.qa_part", ASCENDING),
+    ),
+    _index(
+        "tasks_archive", ("project_id", ASCENDING), ("assigned_annotator_id", ASCENDING)
+    ),
+    _index("tasks_archive", ("project_id", ASCENDING), ("assigned_qa_id", ASCENDING)),
+    _index(
+        "tasks_archive",
+        ("assigned_annotator_id", ASCENDING),
+        partial_filter=_present("assigned_annotator_id"),
+    ),
+    _index(
+        "tasks_archive",
+        ("assigned_qa_id", ASCENDING),
+        partial_filter=_present("assigned_qa_id"),
+    ),
+    _index("tasks_archive", ("created_at", ASCENDING)),
+    _index(
+        "tasks_archive",
+        ("project_id", ASCENDING),
+        ("flag_bits", ASCENDING),
+        ("task_data.model_name", ASCENDING),
+        partial_filter=_present("flag_bits"),
+    ),
+    _index(
+        "annotator_tasks_archive", ("project_id", ASCENDING), ("annotator_id", ASCENDING)
+    ),
+    _index("annotator_tasks_archive", ("annotator_id", ASCENDING), ("_id", ASCENDING)),
+    _index(
+        "annotator_tasks_archive",
+        ("annotator_id", ASCENDING),
+        ("project_id", ASCENDING),
+        ("_id", ASCENDING),
+    ),
+    _index("notifications_archive", ("project_id", ASCENDING)),
+    _index(
+        "notifications_archive", ("recipient_id", ASCENDING), ("_id", DESCENDING)
+    ),
+    _index(
+        "notifications_archive", ("recipient_id", ASCENDING), ("is_read", ASCENDING)
+    ),
+    _index(
+        "task_remarks_archive",
+        ("task_id", ASCENDING),
+        ("created_at", ASCENDING),
+        ("_id", ASCENDING),
+    ),
+    _index("task_remarks_archive", ("project_id", ASCENDING)),
+]
+
+
+def specs_by_collection(
+    specs: List[IndexSpec] = INDEXES,
+) -> Dict[str, List[IndexSpec]]:
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        grouped.setdefault(spec.collection, []).append(spec)
+    return grouped
+
+
+def _existing_keys(index_information: Dict[str, Any]) -> set:
+    return {
+        tuple(tuple(key) for key in info["key"])
+        for info in index_information.values()
+    }
+
+
+async def _ensure_collection_indexes(db, collection: str, specs: List[IndexSpec]):
+    coll = db.get_collection(collection)
+    existing = _existing_keys(await coll.index_information())
+    missing = [spec for spec in specs if tuple(spec.keys) not in existing]
+    if missing:
+        await coll.create_indexes([spec.model() for spec in missing])
+    return [f"{collection}.{spec.name}" for spec in missing]
+
+
+def _options_match(spec: IndexSpec, info: Dict[str, Any]) -> bool:
+    partial = info.get("partialFilterExpression")
+    return bool(info.get("unique", False)) == spec.unique and (
+        (dict(partial) if partial else None) == spec.partial_filter
+    )
+
+
+async def drop_outdated_indexes(db, specs: List[IndexSpec] = INDEXES) -> List[str]:
+    """Drop indexes whose keys match a registry spec but whose options differ.
+
+    ``ensure_indexes`` only compares keys, so changing an index's options (for
+    example making it partial) needs the old definition dropped first; the
+    caller then runs ``ensure_indexes`` to build the new one.
+    """
+    dropped = []
+    for collection, collection_specs in specs_by_collection(specs).items():
+        coll = db.get_collection(collection)
+        information = await coll.index_information()
+        for spec in collection_specs:
+            for name, info in information.items():
+                same_keys = tuple(tuple(k) for k in info["key"]) == tuple(spec.keys)
+                if same_keys and not _options_match(spec, info):
+                    await coll.drop_index(name)
+                    dropped.append(f"{collection}.{name}")
+    return dropped
+
+
+async def ensure_indexes(db, specs: List[IndexSpec] = INDEXES) -> List[str]:
+    """Create registry indexes that do not exist yet; returns the names created."""
+    results = await asyncio.gather(
+        *(
+            _ensure_collection_indexes(db, collection, collection_specs)
+            for collection, collection_specs in specs_by_collection(specs).items()
+        )
+    )
+    return [name for created in results for name in created]
@@ -0,0 +1,192 @@
+"""Redundant labelling endpoints: extra judgments of a task by project annotators"""
+
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import Any, Dict, List
+from bson import ObjectId
+
+import database
+from judgments import (
+    JUDGMENT_COUNT_FIELD,
+    JUDGMENT_FIELDS,
+    judgment_label,
+    open_slot_filter,
+    record_judgment,
+)
+from ner_tokens import TOKEN_OFFSETS_FIELD
+from schemas import SubmitAnnotationRequest, TaskCategory, TaskResponse, UserInDB
+from utils import ANNOTATION_MODEL_BY_CATEGORY, as_response, get_current_user
+
+router = APIRouter()
+
+# Tasks scanned per query while filling an annotator's judgment queue
+QUEUE_SCAN_BATCH = 200
+
+
+async def get_judging_project(project_id: ObjectId, current_user: UserInDB) -> Dict:
+    """Return a project collecting redundant labels that the annotator works on."""
+    project = await database.projects_collection.find_one({"_id": project_id})
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+    if current_user.role != "annotator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only annotators can submit judgments",
+        )
+    category = project.get("category")
+    if project.get("redundancy", 1) < 2 or category not in JUDGMENT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This project does not collect labels from several annotators",
+        )
+
+    member = await database.project_working_collection.find_one(
+        {
+            "project_id": project_id,
+            "annotator_assignments.annotator_id": current_user.id,
+        },
+        {"_id": 1},
+    )
+    if not member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this project",
+        )
+    return project
+
+
+@router.put("/tasks/{task_id}/judgment")
+async def submit_judgment(
+    task_id: str,
+    payload: SubmitAnnotationRequest,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Submit (or replace) an additional label for a task (project annotators)
+
+    Accepted until the task holds the project's ``redundancy`` judgments,
+    counting the assigned annotator's annotation, whose slot is kept free
+    until they submit.
+    """
+    if not ObjectId.is_valid(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid task ID"
+        )
+
+    task = await database.tasks_collection.find_one(
+        {"_id": ObjectId(task_id)},
+        {"project_id": 1, "category": 1, "assigned_annotator_id": 1},
+    )
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    project = await get_judging_project(task["project_id"], current_user)
+    if task.get("assigned_annotator_id") == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are assigned to this task; submit your annotation instead",
+        )
+
+    # Judgments feed the consensus, so unlike annotations they must validate
+    category = TaskCategory(task["category"])
+    annotation = payload.annotation
+    ann_model = ANNOTATION_MODEL_BY_CATEGORY.get(category)
+    if ann_model is not None:
+        try:
+            annotation = ann_model(**annotation).model_dump()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid annotation: {e}",
+            )
+    label = judgment_label(category, annotation)
+    if label is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Annotation has no {JUDGMENT_FIELDS[category.value]}",
+        )
+
+    stored = await record_judgment(
+        task,
+        current_user.id,
+        label,
+        slot_filter=open_slot_filter(project["redundancy"]),
+    )
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Task already has enough judgments",
+        )
+    return {"message": "Judgment submitted", "label": label}
+
+
+def _after(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Range filter for the tasks sorting after ``task`` by (judgment_count, _id)."""
+    count = task.get(JUDGMENT_COUNT_FIELD)
+    if count is None:
+        # Tasks never judged have no count and sort first
+        later = [
+            {JUDGMENT_COUNT_FIELD: None, "_id": {"$gt": task["_id"]}},
+            {JUDGMENT_COUNT_FIELD: {"$type": "number"}},
+        ]
+    else:
+        later = [
+            {JUDGMENT_COUNT_FIELD: {"$gt": count}},
+            {JUDGMENT_COUNT_FIELD: count, "_id": {"$gt": task["_id"]}},
+        ]
+    return {"$and": [{"$or": later}]}
+
+
+@router.get(
+    "/projects/{project_id}/judgment-queue",
+    response_model=List[TaskResponse],
+    response_model_by_alias=False,
+)
+async def get_judgment_queue(
+    project_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Tasks still short of judgments that the current annotator has not labelled
+
+    Tasks with the fewest judgments come first.
+    """
+    if not ObjectId.is_valid(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid project ID"
+        )
+    project = await get_judging_project(ObjectId(project_id), current_user)
+
+    query: Dict[str, Any] = {
+        "project_id": project["_id"],
+        **open_slot_filter(project["redundancy"]),
+        "assigned_annotator_id": {"$ne": current_user.id},
+    }
+    queue: List[Dict[str, Any]] = []
+    after: Dict[str, Any] = {}
+    while len(queue) < limit:
+        batch = (
+            await database.tasks_collection.find(
+                {**query, **after}, {TOKEN_OFFSETS_FIELD: 0}
+            )
+            .sort([(JUDGMENT_COUNT_FIELD, 1), ("_id", 1)])
+            .limit(QUEUE_SCAN_BATCH)
+            .to_list(QUEUE_SCAN_BATCH)
+        )
+        if not batch:
+            break
+        after = _after(batch[-1])
+        judged = {
+            judgment["task_id"]
+            async for judgment in database.judgments_collection.find(
+                {
+                    "task_id": {"$in": [task["_id"] for task in batch]},
+                    "annotator_id": current_user.id,
+                },
+                {"task_id": 1},
+            )
+        }
+        queue.extend(task for task in batch if task["_id"] not in judged)
+
+    return [as_response(TaskResponse, task) for task in queue[:limit]]
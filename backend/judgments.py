@@ -0,0 +1,131 @@
+"""Redundant labels of a task from several annotators, for consensus.
+
+A project's ``redundancy`` says how many annotators should label each task.
+Every label is a judgment in the ``judgments`` collection, one document per
+(task, annotator), holding just the compared field of the annotation
+(``JUDGMENT_FIELDS``). The assigned annotator's submission is a judgment like
+any other; further annotators submit theirs until the task holds
+``redundancy`` of them. ``judgment_count`` on the task counts them, and a new
+judgment reserves its slot there first, so concurrent annotators can never
+overfill a task. Until the assigned annotator submits, extra annotators only
+get ``redundancy - 1`` slots, so the primary label is never crowded out.
+
+Consensus labels (see analytics.consensus) are written back to the tasks as
+``consensus``. Every judgment change bumps the project's ``data_version``, so a
+stored consensus report shows as stale.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+import database
+from project_counters import DATA_VERSION_FIELD
+from schemas import TaskCategory
+
+# Annotation field holding the label of each category that supports consensus
+JUDGMENT_FIELDS: Dict[str, str] = {
+    TaskCategory.IMAGE_CLASSIFICATION.value: "selected_label",
+    TaskCategory.TEXT_CLASSIFICATION.value: "selected_label",
+    TaskCategory.SENTIMENT_ANALYSIS.value: "selected_label",
+    TaskCategory.LLM_RESPONSE_GRADING.value: "rating",
+    TaskCategory.CHATBOT_MODEL_ASSESSMENT.value: "likert_scale",
+    TaskCategory.RESPONSE_SELECTION.value: "selected_response",
+}
+
+JUDGMENT_COUNT_FIELD = "judgment_count"
+CONSENSUS_FIELD = "consensus"
+
+
+async def _bump_data_version(project_id: ObjectId) -> None:
+    await database.projects_collection.update_one(
+        {"_id": project_id}, {"$inc": {DATA_VERSION_FIELD: 1}}
+    )
+
+
+def open_slot_filter(redundancy: int) -> Dict[str, Any]:
+    """Task filter for room left for another extra annotator's judgment."""
+    return {
+        JUDGMENT_COUNT_FIELD: {"$not": {"$gte": redundancy}},
+        # The last slot is held for an assigned annotator yet to submit
+        "$or": [
+            {JUDGMENT_COUNT_FIELD: {"$not": {"$gte": redundancy - 1}}},
+            {"assigned_annotator_id": None},
+            {"completed_status.annotator_part": True},
+        ],
+    }
+
+
+def judgment_label(category: Any, annotation: Any) -> Optional[Any]:
+    """The label an annotation gives, or None if it has none usable."""
+    field = JUDGMENT_FIELDS.get(getattr(category, "value", category))
+    if field is None or not isinstance(annotation, dict):
+        return None
+    label = annotation.get(field)
+    if isinstance(label, bool) or not isinstance(label, (str, int)):
+        return None
+    return label
+
+
+async def record_judgment(
+    task: Dict[str, Any],
+    annotator_id: ObjectId,
+    label: Any,
+    limit: Optional[int] = None,
+    slot_filter: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Store or replace an annotator's label for a task.
+
+    A new judgment is refused (False) once the task holds ``limit`` of them,
+    or when the task no longer matches ``slot_filter``; without either it is
+    always stored.
+    """
+    key = {"task_id": task["_id"], "annotator_id": annotator_id}
+    set_label = {"$set": {"label": label, "submitted_at": datetime.utcnow()}}
+    replaced = await database.judgments_collection.update_one(key, set_label)
+    if replaced.matched_count:
+        await _bump_data_version(task["project_id"])
+        return True
+
+    slot: Dict[str, Any] = {**(slot_filter or {}), "_id": task["_id"]}
+    if limit is not None:
+        slot[JUDGMENT_COUNT_FIELD] = {"$not": {"$gte": limit}}
+    reserved = await database.tasks_collection.update_one(
+        slot, {"$inc": {JUDGMENT_COUNT_FIELD: 1}}
+    )
+    if not reserved.modified_count:
+        return False
+    try:
+        await database.judgments_collection.insert_one(
+            {**key, "project_id": task["project_id"], **set_label["$set"]}
+        )
+    except DuplicateKeyError:
+        # A concurrent request of the same annotator stored it; give the slot back
+        await database.tasks_collection.update_one(
+            {"_id": task["_id"]}, {"$inc": {JUDGMENT_COUNT_FIELD: -1}}
+        )
+        await database.judgments_collection.update_one(key, set_label)
+    await _bump_data_version(task["project_id"])
+    return True
+
+
+async def remove_judgment(task_id: ObjectId, annotator_id: Optional[ObjectId]) -> None:
+    if annotator_id is None:
+        return
+    removed = await database.judgments_collection.find_one_and_delete(
+        {"task_id": task_id, "annotator_id": annotator_id}, {"project_id": 1}
+    )
+    if removed:
+        await database.tasks_collection.update_one(
+            {"_id": task_id}, {"$inc": {JUDGMENT_COUNT_FIELD: -1}}
+        )
+        await _bump_data_version(removed["project_id"])
+
+
+async def delete_task_judgments(task_id: ObjectId, project_id: ObjectId) -> None:
+    """Drop every judgment of a deleted task."""
+    deleted = await database.judgments_collection.delete_many({"task_id": task_id})
+    if deleted.deleted_count:
+        await _bump_data_version(project_id)
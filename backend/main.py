@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 
+from analytics.pool import shutdown_analytics_pool
 from database import connect_to_mongo, close_mongo_connection
+from platform_stats import run_periodic_stats_reconciliation
+from project_counters import run_periodic_reconciliation
 from routes import router
 
 load_dotenv()
@@ -17,13 +21,40 @@ ALLOWED_ORIGINS = [
     ).split(",")
 ]
 
+# Interval for the background project counter reconciliation (0 disables it)
+COUNTER_RECONCILE_INTERVAL_SECONDS = float(
+    os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "3600")
+)
+# Interval for the background platform stats reconciliation (0 disables it)
+PLATFORM_STATS_RECONCILE_INTERVAL_SECONDS = float(
+    os.getenv("PLATFORM_STATS_RECONCILE_INTERVAL_SECONDS", "300")
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    background_tasks = []
+    if COUNTER_RECONCILE_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_reconciliation(COUNTER_RECONCILE_INTERVAL_SECONDS)
+            )
+        )
+    if PLATFORM_STATS_RECONCILE_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_periodic_stats_reconciliation(
+                    PLATFORM_STATS_RECONCILE_INTERVAL_SECONDS
+                )
+            )
+        )
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+    shutdown_analytics_pool()
     await close_mongo_connection()
 
 
@@ -0,0 +1,49 @@
+"""Versioned schema migrations.
+
+Run pending migrations with ``python -m migrations up`` and inspect them with
+``python -m migrations status``.
+"""
+
+from migrations.m0001_project_counters import ProjectCountersMigration
+from migrations.m0002_task_assignments import TaskAssignmentsMigration
+from migrations.m0003_task_remarks import TaskRemarksMigration
+from migrations.m0004_task_blobs import TaskBlobsMigration
+from migrations.m0005_sparse_tasks import SparseTasksMigration
+from migrations.m0006_daily_rollups import (
+    ArchivedDailyRollupsMigration,
+    DailyRollupsMigration,
+)
+from migrations.m0007_completion_sketches import (
+    ArchivedCompletionSketchesMigration,
+    CompletionSketchesMigration,
+)
+from migrations.m0008_token_offsets import (
+    ArchivedTokenOffsetsMigration,
+    TokenOffsetsMigration,
+)
+from migrations.m0009_flag_bits import ArchivedFlagBitsMigration, FlagBitsMigration
+from migrations.m0010_preference_counts import (
+    ArchivedPreferenceCountsMigration,
+    PreferenceCountsMigration,
+)
+from migrations.m0011_judgments import ArchivedJudgmentsMigration, JudgmentsMigration
+
+MIGRATIONS = [
+    ProjectCountersMigration(),
+    TaskAssignmentsMigration(),
+    TaskRemarksMigration(),
+    TaskBlobsMigration(),
+    SparseTasksMigration(),
+    DailyRollupsMigration(),
+    ArchivedDailyRollupsMigration(),
+    CompletionSketchesMigration(),
+    ArchivedCompletionSketchesMigration(),
+    TokenOffsetsMigration(),
+    ArchivedTokenOffsetsMigration(),
+    FlagBitsMigration(),
+    ArchivedFlagBitsMigration(),
+    PreferenceCountsMigration(),
+    ArchivedPreferenceCountsMigration(),
+    JudgmentsMigration(),
+    ArchivedJudgmentsMigration(),
+]
@@ -0,0 +1,45 @@
+"""Command line entry point: python -m migrations [status|up|run <version>]"""
+
+import asyncio
+import sys
+
+import database
+from config import settings
+from migrations import MIGRATIONS
+from migrations.runner import MigrationRunner
+
+
+async def main(argv):
+    command = argv[1] if len(argv) > 1 else "status"
+    runner = MigrationRunner(
+        MIGRATIONS,
+        batch_size=settings.migration_batch_size,
+        ops_per_second=settings.migration_ops_per_second,
+    )
+
+    await database.connect_to_mongo()
+    try:
+        if command == "status":
+            for state in await runner.status():
+                print(
+                    f"{state['version']:>4}  {state['name']:<24} {state['status']:<10}"
+                    f" processed={state['processed']}"
+                )
+        elif command == "up":
+            ran = await runner.run_pending()
+            print(f"Ran migrations: {ran}" if ran else "No pending migrations")
+        elif command == "run" and len(argv) > 2:
+            version = int(argv[2])
+            migration = next((m for m in MIGRATIONS if m.version == version), None)
+            if migration is None:
+                print(f"Unknown migration version: {version}")
+                return
+            await runner.run(migration)
+        else:
+            print("Usage: python -m migrations [status|up|run <version>]")
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv))
@@ -0,0 +1,19 @@
+"""Backfill project counters and drop the legacy projects.task_ids array"""
+
+from typing import Any, Dict, List
+
+from migrations.runner import Migration
+from project_counters import reconcile_project_counters
+
+
+class ProjectCountersMigration(Migration):
+    version = 1
+    name = "project_counters"
+    collection = "projects"
+    query = {
+        "$or": [{"counters": {"$exists": False}}, {"task_ids": {"$exists": True}}]
+    }
+    projection = {"_id": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        return await reconcile_project_counters(doc["_id"] for doc in docs)
@@ -0,0 +1,56 @@
+"""Move project_working.annotator_assignments task_ids into task_assignments"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+import database
+from migrations.runner import Migration
+
+
+class TaskAssignmentsMigration(Migration):
+    version = 2
+    name = "task_assignments"
+    collection = "project_working"
+    query = {"annotator_assignments.task_ids": {"$exists": True}}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        operations = []
+        for pw in docs:
+            for assignment in pw.get("annotator_assignments", []):
+                for task_id in assignment.get("task_ids", []):
+                    operations.append(
+                        UpdateOne(
+                            {
+                                "task_id": task_id,
+                                "annotator_id": assignment["annotator_id"],
+                            },
+                            {
+                                "$setOnInsert": {
+                                    "project_id": pw["project_id"],
+                                    "assigned_at": assignment.get(
+                                        "assigned_at", datetime.utcnow()
+                                    ),
+                                }
+                            },
+                            upsert=True,
+                        )
+                    )
+
+        # Upserts are idempotent, so a batch interrupted here is simply replayed
+        if operations:
+            await database.task_assignments_collection.bulk_write(
+                operations, ordered=False
+            )
+        await database.project_working_collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": pw["_id"]},
+                    {"$unset": {"annotator_assignments.$[].task_ids": ""}},
+                )
+                for pw in docs
+            ],
+            ordered=False,
+        )
+        return len(operations) + len(docs)
@@ -0,0 +1,34 @@
+"""Move embedded task remarks into the task_remarks collection"""
+
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+import database
+from migrations.runner import Migration
+from task_remarks import embedded_remark_operations
+
+
+class TaskRemarksMigration(Migration):
+    version = 3
+    name = "task_remarks"
+    collection = "tasks"
+    query = {"remarks": {"$exists": True}}
+    projection = {"project_id": 1, "remarks": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        remark_operations: List[UpdateOne] = []
+        task_updates: List[UpdateOne] = []
+        for task in docs:
+            operations, task_filter, task_update = embedded_remark_operations(task)
+            remark_operations += operations
+            task_updates.append(UpdateOne(task_filter, task_update))
+
+        # Remarks first: a task only loses its array once they are stored
+        if remark_operations:
+            await database.bulk_upsert(
+                database.task_remarks_collection, remark_operations
+            )
+        if task_updates:
+            await database.tasks_collection.bulk_write(task_updates, ordered=False)
+        return len(remark_operations) + len(task_updates)
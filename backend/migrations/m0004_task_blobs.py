@@ -0,0 +1,31 @@
+"""Move large task_data fields of existing tasks into the blob store"""
+
+from typing import Any, Dict, List
+
+import database
+from blob_store import externalize_task_data, release_blobs
+from migrations.runner import Migration
+
+
+class TaskBlobsMigration(Migration):
+    version = 4
+    name = "task_blobs"
+    collection = "tasks"
+    query = {"task_data_blobs": {"$exists": False}}
+    projection = {"task_data": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        ops = 0
+        for task in docs:
+            inline, refs = await externalize_task_data(task.get("task_data") or {})
+            if not refs:
+                continue
+            result = await database.tasks_collection.update_one(
+                {"_id": task["_id"], "task_data_blobs": {"$exists": False}},
+                {"$set": {"task_data": inline, "task_data_blobs": refs}},
+            )
+            if not result.modified_count:
+                # Migrated concurrently; drop the references taken above
+                await release_blobs(ref["sha256"] for ref in refs.values())
+            ops += len(refs) + 1
+        return ops
@@ -0,0 +1,81 @@
+"""Drop stored null/default fields from task documents and rebuild partial indexes"""
+
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+import database
+from indexes import drop_outdated_indexes, ensure_indexes
+from migrations.runner import Migration
+from utils import SPARSE_TASK_DEFAULTS
+
+
+async def collection_sizes(name: str) -> Dict[str, int]:
+    stats = await database.get_database().command("collStats", name)
+    return {
+        "documents": stats.get("count", 0),
+        "data_bytes": stats.get("size", 0),
+        "storage_bytes": stats.get("storageSize", 0),
+        "index_bytes": stats.get("totalIndexSize", 0),
+    }
+
+
+def _report(label: str, sizes: Dict[str, int]) -> None:
+    print(
+        f"  {label:<7} documents={sizes['documents']} "
+        f"data={sizes['data_bytes']}B storage={sizes['storage_bytes']}B "
+        f"indexes={sizes['index_bytes']}B"
+    )
+
+
+class SparseTasksMigration(Migration):
+    version = 5
+    name = "sparse_tasks"
+    collection = "tasks"
+    query = {
+        "$or": [
+            {field: default if default is not None else {"$type": "null"}}
+            for field, default in SPARSE_TASK_DEFAULTS.items()
+        ]
+    }
+    projection = {field: 1 for field in SPARSE_TASK_DEFAULTS}
+
+    def __init__(self):
+        self.before: Optional[Dict[str, int]] = None
+
+    async def prepare(self) -> None:
+        self.before = await collection_sizes(self.collection)
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        operations = []
+        for task in docs:
+            stale = [
+                field
+                for field, default in SPARSE_TASK_DEFAULTS.items()
+                if field in task and task[field] is default
+            ]
+            if stale:
+                # Guard on the values read so a concurrent write is not undone
+                guard = {field: task[field] for field in stale}
+                operations.append(
+                    UpdateOne(
+                        {"_id": task["_id"], **guard},
+                        {"$unset": {field: "" for field in stale}},
+                    )
+                )
+        if operations:
+            await database.tasks_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def finalize(self) -> None:
+        db = database.get_database()
+        dropped = await drop_outdated_indexes(db)
+        created = await ensure_indexes(db)
+        if dropped or created:
+            print(f"  rebuilt indexes: dropped {dropped}, created {created}")
+        # Storage size only shrinks after an operator compacts the collection,
+        # a blocking step kept out of the migration (see README)
+        print(f"[{self.version}] {self.collection} sizes")
+        if self.before is not None:
+            _report("before", self.before)
+        _report("after", await collection_sizes(self.collection))
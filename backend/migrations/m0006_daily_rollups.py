@@ -0,0 +1,158 @@
+"""Backfill daily_rollups from existing tasks, annotator records and return remarks
+
+Live events are recorded by the workflow write paths from the moment this code
+is deployed. To avoid counting them twice, the backfill only counts events
+that happened before the earliest live rollup event (``first_event_at``),
+fixed as the migration's cutoff when the first batch runs.
+
+Each task is first marked ``rollups_backfilled`` by a guarded update, and its
+events are only counted if that update matched, so a batch replayed after a
+crash or a lost lease never counts a task twice.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import database
+from migrations.runner import MIGRATIONS_COLLECTION, Migration
+from rollups import day_of, first_live_event_at, rollup_update
+
+RollupKey = Tuple[datetime, Any, Any]
+
+
+class DailyRollupsMigration(Migration):
+    version = 6
+    name = "daily_rollups"
+    collection = "tasks"
+    annotator_tasks_collection = "annotator_tasks"
+    remarks_collection = "task_remarks"
+    projection = {
+        "project_id": 1,
+        "created_at": 1,
+        "assigned_annotator_id": 1,
+        "assigned_qa_id": 1,
+        "completed_status": 1,
+        "annotator_completed_at": 1,
+        "qa_completed_at": 1,
+        "accumulated_time": 1,
+        "qa_accumulated_time": 1,
+    }
+    query = {"rollups_backfilled": {"$exists": False}}
+
+    def __init__(self):
+        self.cutoff: Optional[datetime] = None
+
+    async def _cutoff(self) -> datetime:
+        """Return the cutoff, fixing it in the migration state on first use."""
+        if self.cutoff is None:
+            state_collection = database.get_database().get_collection(
+                MIGRATIONS_COLLECTION
+            )
+            state = await state_collection.find_one({"_id": self.version})
+            cutoff = (state or {}).get("cutoff")
+            if cutoff is None:
+                cutoff = await first_live_event_at() or datetime.utcnow()
+                await state_collection.update_one(
+                    {"_id": self.version}, {"$set": {"cutoff": cutoff}}
+                )
+            self.cutoff = cutoff
+        return self.cutoff
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        db = database.get_database()
+        cutoff = await self._cutoff()
+        task_ids = [task["_id"] for task in docs]
+        project_ids = list({task["project_id"] for task in docs})
+
+        # Annotation time as recorded on the annotator's task record
+        completion_times = {
+            (record["task_id"], record["annotator_id"]): record.get("completion_time")
+            async for record in db.get_collection(self.annotator_tasks_collection).find(
+                {"project_id": {"$in": project_ids}, "task_id": {"$in": task_ids}},
+                {"task_id": 1, "annotator_id": 1, "completion_time": 1},
+            )
+        }
+        return_times: Dict[Any, List[datetime]] = defaultdict(list)
+        async for remark in db.get_collection(self.remarks_collection).find(
+            {"task_id": {"$in": task_ids}, "remark_type": "qa_return"},
+            {"task_id": 1, "created_at": 1},
+        ):
+            if remark.get("created_at"):
+                return_times[remark["task_id"]].append(remark["created_at"])
+
+        def before_cutoff(value: Any) -> bool:
+            return isinstance(value, datetime) and value < cutoff
+
+        tasks = db.get_collection(self.collection)
+        rows: Dict[RollupKey, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        writes = 0
+        for task in docs:
+            project_id = task["project_id"]
+            status = task.get("completed_status") or {}
+            annotator_id = task.get("assigned_annotator_id")
+            rolled: Dict[str, float] = {}
+            task_rows: Dict[RollupKey, Dict[str, float]] = defaultdict(
+                lambda: defaultdict(int)
+            )
+
+            if before_cutoff(task.get("created_at")):
+                key = (day_of(task["created_at"]), project_id, None)
+                task_rows[key]["tasks_created"] += 1
+
+            completed_at = task.get("annotator_completed_at")
+            if status.get("annotator_part") and before_cutoff(completed_at):
+                # The stored completion time adds the pre-return time to a timer
+                # that already includes it; the difference is the timer total
+                total = completion_times.get((task["_id"], annotator_id)) or 0
+                seconds = max(0, total - (task.get("accumulated_time") or 0))
+                row = task_rows[(day_of(completed_at), project_id, annotator_id)]
+                row["annotations_submitted"] += 1
+                row["annotation_seconds"] += seconds
+                rolled["rolled_up_seconds.annotation"] = seconds
+
+            qa_completed_at = task.get("qa_completed_at")
+            if status.get("qa_part") and before_cutoff(qa_completed_at):
+                seconds = task.get("qa_accumulated_time") or 0
+                qa_id = task.get("assigned_qa_id")
+                row = task_rows[(day_of(qa_completed_at), project_id, qa_id)]
+                row["qa_completed"] += 1
+                row["qa_seconds"] += seconds
+                rolled["rolled_up_seconds.qa"] = seconds
+
+            for returned_at in return_times.get(task["_id"], []):
+                if before_cutoff(returned_at):
+                    key = (day_of(returned_at), project_id, annotator_id)
+                    task_rows[key]["returns"] += 1
+
+            update: Dict[str, Any] = {"$set": {"rollups_backfilled": True}}
+            if rolled:
+                update["$max"] = rolled
+            result = await tasks.update_one(
+                {"_id": task["_id"], "rollups_backfilled": {"$exists": False}}, update
+            )
+            writes += 1
+            if not result.modified_count:
+                continue
+            for key, deltas in task_rows.items():
+                for field, delta in deltas.items():
+                    rows[key][field] += delta
+
+        operations = [
+            rollup_update(project_id, user_id, day, deltas, live=False)
+            for (day, project_id, user_id), deltas in rows.items()
+        ]
+        operations = [op for op in operations if op is not None]
+        if operations:
+            await database.bulk_upsert(database.daily_rollups_collection, operations)
+        return writes + len(operations)
+
+
+class ArchivedDailyRollupsMigration(DailyRollupsMigration):
+    version = 7
+    name = "daily_rollups_archive"
+    collection = database.archive_name("tasks")
+    annotator_tasks_collection = database.archive_name("annotator_tasks")
+    remarks_collection = database.archive_name("task_remarks")
@@ -0,0 +1,70 @@
+"""Backfill completion_sketches from annotator task records
+
+Each record with a completion time is first marked with ``sketched_time`` by
+a guarded update, and only added to the sketches if that update matched, so
+records submitted live while the backfill runs are never counted twice.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from pymongo import UpdateOne
+
+import database
+from ddsketch import sketch_increments
+from migrations.runner import Migration
+
+
+class CompletionSketchesMigration(Migration):
+    version = 8
+    name = "completion_sketches"
+    collection = "annotator_tasks"
+    query = {
+        "completion_time": {"$type": "number"},
+        "sketched_time": {"$exists": False},
+    }
+    projection = {"project_id": 1, "annotator_id": 1, "completion_time": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        records = database.get_database().get_collection(self.collection)
+        increments: Dict[Tuple[Any, Any], Dict[str, float]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        writes = 0
+        for record in docs:
+            value = record["completion_time"]
+            result = await records.update_one(
+                {
+                    "_id": record["_id"],
+                    "completion_time": value,
+                    "sketched_time": {"$exists": False},
+                },
+                {"$set": {"sketched_time": value}},
+            )
+            writes += 1
+            if not result.modified_count:
+                continue
+            for owner in (None, record["annotator_id"]):
+                row = increments[(record["project_id"], owner)]
+                for key, delta in sketch_increments(value).items():
+                    row[key] += delta
+
+        operations = [
+            UpdateOne(
+                {"project_id": project_id, "annotator_id": owner},
+                {"$inc": dict(row)},
+                upsert=True,
+            )
+            for (project_id, owner), row in increments.items()
+        ]
+        if operations:
+            await database.bulk_upsert(
+                database.completion_sketches_collection, operations
+            )
+        return writes + len(operations)
+
+
+class ArchivedCompletionSketchesMigration(CompletionSketchesMigration):
+    version = 9
+    name = "completion_sketches_archive"
+    collection = database.archive_name("annotator_tasks")
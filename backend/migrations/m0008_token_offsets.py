@@ -0,0 +1,48 @@
+"""Store token offsets on existing NER tasks (see ner_tokens)"""
+
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+import database
+from blob_store import resolve_task_data_many
+from migrations.runner import Migration
+from ner_tokens import TOKEN_OFFSETS_FIELD, pack_offsets, token_offsets
+from schemas import TaskCategory
+
+
+class TokenOffsetsMigration(Migration):
+    version = 10
+    name = "token_offsets"
+    collection = "tasks"
+    query = {
+        "category": TaskCategory.NER.value,
+        TOKEN_OFFSETS_FIELD: {"$exists": False},
+    }
+    projection = {"task_data.text": 1, "task_data_blobs.text": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        # Long texts live in the blob store; fetch them in one query
+        await resolve_task_data_many(docs)
+        operations = []
+        for task in docs:
+            text = (task.get("task_data") or {}).get("text")
+            if not isinstance(text, str):
+                continue
+            operations.append(
+                UpdateOne(
+                    {"_id": task["_id"], TOKEN_OFFSETS_FIELD: {"$exists": False}},
+                    {"$set": {TOKEN_OFFSETS_FIELD: pack_offsets(token_offsets(text))}},
+                )
+            )
+        if operations:
+            await database.get_database().get_collection(self.collection).bulk_write(
+                operations, ordered=False
+            )
+        return len(operations)
+
+
+class ArchivedTokenOffsetsMigration(TokenOffsetsMigration):
+    version = 11
+    name = "token_offsets_archive"
+    collection = database.archive_name("tasks")
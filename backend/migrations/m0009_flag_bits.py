@@ -0,0 +1,52 @@
+"""Store flag bitmasks on submitted chatbot assessments (see chatbot_flags)"""
+
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+import database
+from annotation_codec import decode_annotation
+from chatbot_flags import FLAGS_FIELD, flag_bits
+from migrations.runner import Migration
+from schemas import TaskCategory
+
+
+class FlagBitsMigration(Migration):
+    version = 12
+    name = "flag_bits"
+    collection = "tasks"
+    query = {
+        "category": TaskCategory.CHATBOT_MODEL_ASSESSMENT.value,
+        "annotation": {"$exists": True},
+        FLAGS_FIELD: {"$exists": False},
+    }
+    projection = {"annotation": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        operations = []
+        for task in docs:
+            bits = flag_bits(decode_annotation(task.get("annotation")))
+            if bits is None:
+                continue
+            # Skip tasks resubmitted or reset since they were read
+            operations.append(
+                UpdateOne(
+                    {
+                        "_id": task["_id"],
+                        "annotation": task["annotation"],
+                        FLAGS_FIELD: {"$exists": False},
+                    },
+                    {"$set": {FLAGS_FIELD: bits}},
+                )
+            )
+        if operations:
+            await database.get_database().get_collection(self.collection).bulk_write(
+                operations, ordered=False
+            )
+        return len(operations)
+
+
+class ArchivedFlagBitsMigration(FlagBitsMigration):
+    version = 13
+    name = "flag_bits_archive"
+    collection = database.archive_name("tasks")
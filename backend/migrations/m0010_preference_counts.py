@@ -0,0 +1,67 @@
+"""Backfill preference_counts from submitted response selections
+
+Each task's pairs are first stored in ``preference_pairs`` by a guarded
+update and only counted if that update matched, so selections submitted live
+while the backfill runs are never counted twice.
+"""
+
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+import database
+from annotation_codec import decode_annotation
+from migrations.runner import Migration
+from preferences import (
+    PREFERENCE_PAIRS_FIELD,
+    pair_updates,
+    selection_pairs,
+)
+from schemas import TaskCategory
+
+
+class PreferenceCountsMigration(Migration):
+    version = 14
+    name = "preference_counts"
+    collection = "tasks"
+    query = {
+        "category": TaskCategory.RESPONSE_SELECTION.value,
+        "annotation": {"$exists": True},
+        "task_data.response_models": {"$type": "array"},
+        PREFERENCE_PAIRS_FIELD: {"$exists": False},
+    }
+    projection = {"project_id": 1, "annotation": 1, "task_data.response_models": 1}
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        tasks = database.get_database().get_collection(self.collection)
+        operations: List[UpdateOne] = []
+        writes = 0
+        for task in docs:
+            pairs = selection_pairs(
+                task.get("task_data"), decode_annotation(task.get("annotation"))
+            )
+            if not pairs:
+                continue
+            result = await tasks.update_one(
+                {
+                    "_id": task["_id"],
+                    "annotation": task["annotation"],
+                    PREFERENCE_PAIRS_FIELD: {"$exists": False},
+                },
+                {"$set": {PREFERENCE_PAIRS_FIELD: pairs}},
+            )
+            writes += 1
+            if result.modified_count:
+                operations += pair_updates(task["project_id"], [], pairs)
+
+        if operations:
+            await database.bulk_upsert(
+                database.preference_counts_collection, operations
+            )
+        return writes + len(operations)
+
+
+class ArchivedPreferenceCountsMigration(PreferenceCountsMigration):
+    version = 15
+    name = "preference_counts_archive"
+    collection = database.archive_name("tasks")
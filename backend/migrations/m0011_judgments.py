@@ -0,0 +1,86 @@
+"""Backfill judgments from the annotations already submitted
+
+Each task's annotation becomes its assigned annotator's judgment. The judgment
+is upserted with ``$setOnInsert`` and the task's ``judgment_count`` only
+incremented if this migration inserted it, so a label submitted live while the
+backfill runs is never counted twice.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo.errors import DuplicateKeyError
+
+import database
+from annotation_codec import decode_annotation
+from judgments import (
+    JUDGMENT_COUNT_FIELD,
+    JUDGMENT_FIELDS,
+    judgment_label,
+)
+from migrations.runner import Migration
+
+
+class JudgmentsMigration(Migration):
+    version = 16
+    name = "judgments"
+    collection = "tasks"
+    query = {
+        "category": {"$in": list(JUDGMENT_FIELDS)},
+        "annotation": {"$exists": True},
+        "assigned_annotator_id": {"$exists": True},
+        JUDGMENT_COUNT_FIELD: {"$exists": False},
+    }
+    projection = {
+        "project_id": 1,
+        "category": 1,
+        "annotation": 1,
+        "assigned_annotator_id": 1,
+        "annotator_completed_at": 1,
+    }
+
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        tasks = database.get_database().get_collection(self.collection)
+        writes = 0
+        for task in docs:
+            label = judgment_label(
+                task["category"], decode_annotation(task.get("annotation"))
+            )
+            if label is None:
+                await tasks.update_one(
+                    {"_id": task["_id"], JUDGMENT_COUNT_FIELD: {"$exists": False}},
+                    {"$set": {JUDGMENT_COUNT_FIELD: 0}},
+                )
+                writes += 1
+                continue
+
+            key = {
+                "task_id": task["_id"],
+                "annotator_id": task["assigned_annotator_id"],
+            }
+            insert = {
+                "project_id": task["project_id"],
+                "label": label,
+                "submitted_at": task.get("annotator_completed_at")
+                or datetime.utcnow(),
+            }
+            writes += 1
+            try:
+                result = await database.judgments_collection.update_one(
+                    key, {"$setOnInsert": insert}, upsert=True
+                )
+            except DuplicateKeyError:
+                # Submitted live meanwhile, and counted there
+                continue
+            if result.upserted_id is not None:
+                await tasks.update_one(
+                    {"_id": task["_id"]}, {"$inc": {JUDGMENT_COUNT_FIELD: 1}}
+                )
+                writes += 1
+        return writes
+
+
+class ArchivedJudgmentsMigration(JudgmentsMigration):
+    version = 17
+    name = "judgments_archive"
+    collection = database.archive_name("tasks")
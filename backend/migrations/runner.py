@@ -0,0 +1,221 @@
+"""Online batched migration runner.
+
+A migration walks one collection in ``_id`` order, ``batch_size`` documents at
+a time, and applies its changes with ``bulk_write``. After every batch the
+runner checkpoints the last processed ``_id`` in the ``schema_migrations``
+collection, so an interrupted run resumes where it stopped. Writes are
+throttled to an ops/sec budget so a migration can run against the live
+database without starving annotation traffic.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+import database
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+LEASE_SECONDS = 300
+
+
+class Migration(ABC):
+    """Base class for versioned migrations."""
+
+    version: int
+    name: str
+    collection: str  # Collection scanned in _id order
+    query: Dict[str, Any] = {}  # Documents that still need migrating
+    projection: Optional[Dict[str, Any]] = None
+
+    @abstractmethod
+    async def apply_batch(self, docs: List[Dict[str, Any]]) -> int:
+        """Migrate a batch of documents and return the number of write operations."""
+        raise NotImplementedError
+
+    async def prepare(self) -> None:
+        """Hook run before the first batch of a fresh (not resumed) run."""
+        return None
+
+    async def finalize(self) -> None:
+        """Hook run once after the last batch."""
+        return None
+
+
+class MigrationRunner:
+    def __init__(
+        self,
+        migrations: List[Migration],
+        batch_size: int = 500,
+        ops_per_second: float = 1000,
+        progress_interval: float = 5.0,
+    ):
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.batch_size = batch_size
+        self.ops_per_second = ops_per_second
+        self.progress_interval = progress_interval
+
+    @property
+    def state_collection(self):
+        return database.get_database().get_collection(MIGRATIONS_COLLECTION)
+
+    async def status(self) -> List[Dict[str, Any]]:
+        """Return the recorded state of every known migration."""
+        states = {
+            doc["_id"]: doc async for doc in self.state_collection.find({})
+        }
+        return [
+            {
+                "version": m.version,
+                "name": m.name,
+                "status": states.get(m.version, {}).get("status", "pending"),
+                "processed": states.get(m.version, {}).get("processed", 0),
+                "completed_at": states.get(m.version, {}).get("completed_at"),
+            }
+            for m in self.migrations
+        ]
+
+    async def run_pending(self) -> List[int]:
+        """Run every migration that has not completed yet, in version order."""
+        completed = {
+            doc["_id"]
+            async for doc in self.state_collection.find(
+                {"status": "completed"}, {"_id": 1}
+            )
+        }
+        ran = []
+        for migration in self.migrations:
+            if migration.version not in completed:
+                await self.run(migration)
+                ran.append(migration.version)
+        return ran
+
+    async def _acquire(self, migration: Migration) -> Dict[str, Any]:
+        """Take the migration's lease, creating its state document on first run."""
+        now = datetime.utcnow()
+        lease = {
+            "status": "running",
+            "lease_expires_at": now + timedelta(seconds=LEASE_SECONDS),
+            "updated_at": now,
+        }
+        try:
+            state = await self.state_collection.find_one_and_update(
+                {
+                    "_id": migration.version,
+                    "status": {"$ne": "completed"},
+                    "$or": [
+                        {"status": {"$ne": "running"}},
+                        {"lease_expires_at": {"$lt": now}},
+                    ],
+                },
+                {
+                    "$set": lease,
+                    "$setOnInsert": {
+                        "name": migration.name,
+                        "last_id": None,
+                        "processed": 0,
+                        "ops": 0,
+                        "started_at": now,
+                    },
+                },
+                upsert=True,
+                return_document=True,
+            )
+        except DuplicateKeyError:
+            raise RuntimeError(
+                f"Migration {migration.version} is completed or running elsewhere"
+            )
+        return state
+
+    async def _throttle(self, ops: int, started: float) -> None:
+        if self.ops_per_second <= 0:
+            return
+        # Sleep until the ops written so far fit within the budget
+        expected = ops / self.ops_per_second
+        elapsed = time.monotonic() - started
+        if expected > elapsed:
+            await asyncio.sleep(expected - elapsed)
+
+    async def run(self, migration: Migration) -> Dict[str, Any]:
+        """Run (or resume) a single migration to completion."""
+        state = await self._acquire(migration)
+        collection = database.get_database().get_collection(migration.collection)
+        last_id = state.get("last_id")
+        processed = state.get("processed", 0)
+        ops = state.get("ops", 0)
+
+        if last_id is None:
+            await migration.prepare()
+
+        remaining = await collection.count_documents(migration.query)
+        resume = f" (resuming after {last_id})" if last_id else ""
+        print(
+            f"[{migration.version}] {migration.name}: "
+            f"{remaining} documents to migrate{resume}"
+        )
+
+        started = time.monotonic()
+        run_ops = 0
+        run_processed = 0
+        last_report = started
+        while True:
+            query = dict(migration.query)
+            if last_id is not None:
+                query = {"$and": [migration.query, {"_id": {"$gt": last_id}}]}
+            batch = (
+                await collection.find(query, migration.projection)
+                .sort("_id", 1)
+                .limit(self.batch_size)
+                .to_list(self.batch_size)
+            )
+            if not batch:
+                break
+
+            batch_ops = await migration.apply_batch(batch)
+            last_id = batch[-1]["_id"]
+            processed += len(batch)
+            run_processed += len(batch)
+            ops += batch_ops
+            run_ops += batch_ops
+
+            now = datetime.utcnow()
+            await self.state_collection.update_one(
+                {"_id": migration.version},
+                {
+                    "$set": {
+                        "last_id": last_id,
+                        "processed": processed,
+                        "ops": ops,
+                        "updated_at": now,
+                        "lease_expires_at": now + timedelta(seconds=LEASE_SECONDS),
+                    }
+                },
+            )
+
+            if time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                rate = run_processed / max(last_report - started, 1e-6)
+                print(
+                    f"[{migration.version}] {run_processed}/{remaining} documents, "
+                    f"{run_ops} ops, {rate:.0f} docs/s"
+                )
+
+            await self._throttle(run_ops, started)
+
+        await migration.finalize()
+        completed_at = datetime.utcnow()
+        await self.state_collection.update_one(
+            {"_id": migration.version},
+            {
+                "$set": {"status": "completed", "completed_at": completed_at},
+                "$unset": {"lease_expires_at": ""},
+            },
+        )
+        print(
+            f"[{migration.version}] {migration.name}: completed, "
+            f"{processed} documents, {ops} ops"
+        )
+        return {"version": migration.version, "processed": processed, "ops": ops}
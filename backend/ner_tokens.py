@@ -0,0 +1,116 @@
+"""Token offsets of NER task texts and entity span snapping.
+
+The tokens of an NER task's text (runs of word characters, and single
+punctuation marks) are computed once when the task is created and stored on
+the task as ``token_offsets``: the start and end of every token packed as
+little-endian uint32 pairs (8 bytes per token). Tasks are returned with the
+offsets as a flat ``[start0, end0, start1, end1, ...]`` list so the UI does
+not tokenize the text again.
+
+Offsets count UTF-16 code units, the indices JavaScript strings use, so the
+UI can slice the text with them and the entity spans it submits are on the
+same scale. ``snap_entities`` checks submitted spans against the text and
+widens each to whole tokens with two bisections over the offsets.
+"""
+
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Any, Dict, List, Optional
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+TOKEN_OFFSETS_FIELD = "token_offsets"
+_TYPECODE = "I"
+
+
+def _utf16_positions(text: str) -> Optional[List[int]]:
+    """UTF-16 index of every code point index, or None when they coincide."""
+    if text.isascii() or all(ord(char) <= 0xFFFF for char in text):
+        return None
+    positions = [0]
+    for char in text:
+        positions.append(positions[-1] + (2 if ord(char) > 0xFFFF else 1))
+    return positions
+
+
+def token_offsets(text: str) -> array:
+    """Interleaved start/end offsets of the tokens of a text."""
+    offsets = array(
+        _TYPECODE, chain.from_iterable(m.span() for m in TOKEN_PATTERN.finditer(text))
+    )
+    positions = _utf16_positions(text)
+    if positions is not None:
+        offsets = array(_TYPECODE, (positions[offset] for offset in offsets))
+    return offsets
+
+
+def pack_offsets(offsets: array) -> bytes:
+    packed = array(_TYPECODE, offsets)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_offsets(data: bytes) -> array:
+    offsets = array(_TYPECODE)
+    offsets.frombytes(bytes(data))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets
+
+
+def offsets_for_response(value: Any) -> Optional[List[int]]:
+    """Stored (packed) offsets as the flat list returned to clients."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return unpack_offsets(value).tolist()
+    return value
+
+
+def snap_entities(
+    text: str, offsets: array, entities: List[Any]
+) -> List[Dict[str, Any]]:
+    """Check entity spans against a text and snap them to token boundaries.
+
+    A span starting or ending inside a token is widened to include the whole
+    token; its ``text`` is set to the snapped span. Raises ValueError for an
+    entity whose span is not a valid range of the text or covers no token.
+    """
+    starts = offsets[0::2]
+    ends = offsets[1::2]
+    positions = _utf16_positions(text)
+    length = len(text) if positions is None else positions[-1]
+    encoded = None if positions is None else text.encode("utf-16-le")
+
+    snapped = []
+    for index, entity in enumerate(entities):
+        start = entity.get("start") if isinstance(entity, dict) else None
+        end = entity.get("end") if isinstance(entity, dict) else None
+        if (
+            not isinstance(start, int)
+            or not isinstance(end, int)
+            or isinstance(start, bool)
+            or isinstance(end, bool)
+            or not 0 <= start < end <= length
+        ):
+            raise ValueError(
+                f"Entity {index} span [{start}, {end}) is not a range of the text"
+            )
+        # First token ending after start, last token starting before end
+        first = bisect_right(starts, start) - 1
+        if first < 0 or ends[first] <= start:
+            first += 1
+        last = bisect_left(ends, end)
+        if last >= len(ends) or starts[last] >= end:
+            last -= 1
+        if first >= len(starts) or last < first:
+            raise ValueError(f"Entity {index} span [{start}, {end}) covers no token")
+
+        start, end = starts[first], ends[last]
+        if encoded is None:
+            span_text = text[start:end]
+        else:
+            span_text = encoded[2 * start : 2 * end].decode("utf-16-le")
+        snapped.append({**entity, "start": start, "end": end, "text": span_text})
+    return snapped
@@ -1,11 +1,16 @@
 """Notification endpoints"""
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime, timezone
 
-import database
+from archive import (
+    archive_collection,
+    count_with_archive,
+    find_page_with_archive,
+    live_collection,
+)
 from schemas import NotificationResponse, UserInDB
 from utils import as_response, get_current_user
 
@@ -18,16 +23,26 @@ router = APIRouter()
     response_model_by_alias=False,
 )
 async def get_notifications(
-    limit: int = 50, current_user: UserInDB = Depends(get_current_user)
+    limit: int = 50,
+    before: Optional[str] = None,
+    current_user: UserInDB = Depends(get_current_user),
 ):
-    """Get all notifications for current user"""
-    from datetime import timezone
-    
-    notifications = (
-        await database.notifications_collection.find({"recipient_id": current_user.id})
-        .sort("created_at", -1)
-        .limit(limit)
-        .to_list(limit)
+    """Get the current user's notifications, newest first
+
+    Notifications of archived projects are read from the archive tier. Pass
+    the ``id`` of the last notification received as ``before`` for the next
+    page.
+    """
+    if before is not None and not ObjectId.is_valid(before):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+    notifications, _ = await find_page_with_archive(
+        "notifications",
+        {"recipient_id": current_user.id},
+        limit,
+        ObjectId(before) if before else None,
     )
     
     # Convert notifications and ensure datetime is timezone-aware for proper serialization
@@ -46,8 +61,8 @@ async def get_notifications(
 @router.get("/notifications/unread-count")
 async def get_unread_count(current_user: UserInDB = Depends(get_current_user)):
     """Get count of unread notifications"""
-    count = await database.notifications_collection.count_documents(
-        {"recipient_id": current_user.id, "is_read": False}
+    count = await count_with_archive(
+        "notifications", {"recipient_id": current_user.id, "is_read": False}
     )
     return {"unread_count": count}
 
@@ -62,9 +77,14 @@ async def mark_notification_read(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid notification ID"
         )
 
-    notification = await database.notifications_collection.find_one(
-        {"_id": ObjectId(notification_id)}
-    )
+    # Look in the live tier first, then in the archive
+    for collection in (
+        live_collection("notifications"),
+        archive_collection("notifications"),
+    ):
+        notification = await collection.find_one({"_id": ObjectId(notification_id)})
+        if notification:
+            break
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found"
@@ -76,7 +96,7 @@ async def mark_notification_read(
             detail="Not authorized to modify this notification",
         )
 
-    await database.notifications_collection.update_one(
+    await collection.update_one(
         {"_id": ObjectId(notification_id)}, {"$set": {"is_read": True}}
     )
     return {"message": "Notification marked as read"}
@@ -87,8 +107,14 @@ async def mark_all_notifications_read(
     current_user: UserInDB = Depends(get_current_user),
 ):
     """Mark all user's notifications as read"""
-    result = await database.notifications_collection.update_many(
-        {"recipient_id": current_user.id, "is_read": False},
-        {"$set": {"is_read": True}},
-    )
-    return {"message": f"Marked {result.modified_count} notifications as read"}
+    modified = 0
+    for collection in (
+        live_collection("notifications"),
+        archive_collection("notifications"),
+    ):
+        result = await collection.update_many(
+            {"recipient_id": current_user.id, "is_read": False},
+            {"$set": {"is_read": True}},
+        )
+        modified += result.modified_count
+    return {"message": f"Marked {modified} notifications as read"}
@@ -0,0 +1,146 @@
+"""Materialized platform statistics for the admin dashboard.
+
+A single ``platform_stats`` document holds the dashboard totals. Write paths
+adjust it with ``$inc`` as users, projects and tasks change, and
+``reconcile_platform_stats`` periodically recomputes it. Reconciling never
+scans the tasks collection: task totals are summed from the per-project
+counters, the project total comes from ``estimated_document_count`` and the
+role totals are index-only counts. ``/admin/stats`` therefore costs one
+document read however large the data gets.
+
+Every ``$inc`` also bumps ``version``. A recount is only written if the
+version it started from is unchanged, so an increment landing mid-recount is
+never overwritten; the recount is retried instead.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+import database
+
+STATS_ID = "platform"
+STAT_NAMES = (
+    "total_managers",
+    "total_annotators",
+    "total_projects",
+    "total_tasks",
+    "completed_tasks",
+)
+ROLE_STATS = {"manager": "total_managers", "annotator": "total_annotators"}
+VERSION_FIELD = "version"
+RECONCILE_ATTEMPTS = 3
+
+# Snapshots older than this are reconciled before being served
+PLATFORM_STATS_MAX_AGE_SECONDS = float(
+    os.getenv("PLATFORM_STATS_MAX_AGE_SECONDS", "900")
+)
+
+
+async def bump_platform_stats(**deltas: int) -> None:
+    """Apply incremental changes, e.g. ``bump_platform_stats(total_projects=1)``."""
+    changes = {name: value for name, value in deltas.items() if value}
+    if not changes:
+        return
+    await database.platform_stats_collection.update_one(
+        {"_id": STATS_ID},
+        {
+            "$inc": {**changes, VERSION_FIELD: 1},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+
+
+async def record_role_change(old_role: Optional[str], new_role: Optional[str]):
+    """Adjust the role totals for a user created (old_role None) or re-roled."""
+    deltas: Dict[str, int] = {}
+    if old_role in ROLE_STATS:
+        deltas[ROLE_STATS[old_role]] = deltas.get(ROLE_STATS[old_role], 0) - 1
+    if new_role in ROLE_STATS:
+        deltas[ROLE_STATS[new_role]] = deltas.get(ROLE_STATS[new_role], 0) + 1
+    await bump_platform_stats(**deltas)
+
+
+async def _recount() -> Dict[str, Any]:
+    totals = {"total_tasks": 0, "completed_tasks": 0}
+    pipeline = [
+        {
+            "$group": {
+                "_id": None,
+                "total_tasks": {"$sum": "$counters.total"},
+                "completed_tasks": {"$sum": "$counters.completed"},
+            }
+        }
+    ]
+    async for row in database.projects_collection.aggregate(pipeline):
+        totals = {name: row[name] for name in totals}
+
+    users = database.users_collection
+    projects = database.projects_collection
+    return {
+        # Index-only counts; the project total only needs collection metadata
+        "total_managers": await users.count_documents({"role": "manager"}),
+        "total_annotators": await users.count_documents({"role": "annotator"}),
+        "total_projects": await projects.estimated_document_count(),
+        **totals,
+    }
+
+
+async def reconcile_platform_stats() -> Dict[str, Any]:
+    """Recompute the snapshot from indexes, collection metadata and project counters.
+
+    Retried up to ``RECONCILE_ATTEMPTS`` times while increments keep landing
+    during the recount; the last recount is returned even if it was not
+    written.
+    """
+    for _ in range(RECONCILE_ATTEMPTS):
+        current = await database.platform_stats_collection.find_one(
+            {"_id": STATS_ID}, {VERSION_FIELD: 1}
+        )
+        version = (current or {}).get(VERSION_FIELD)
+        now = datetime.utcnow()
+        snapshot = {**await _recount(), "reconciled_at": now, "updated_at": now}
+        guard = {"$exists": False} if version is None else version
+        try:
+            result = await database.platform_stats_collection.update_one(
+                {"_id": STATS_ID, VERSION_FIELD: guard},
+                {"$set": snapshot},
+                upsert=current is None,
+            )
+        except DuplicateKeyError:
+            # The first increment created the document meanwhile
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            break
+    return snapshot
+
+
+async def get_platform_stats(
+    max_age_seconds: float = PLATFORM_STATS_MAX_AGE_SECONDS,
+) -> Dict[str, Any]:
+    """Return the snapshot, reconciling first if it is missing or too old."""
+    snapshot = await database.platform_stats_collection.find_one({"_id": STATS_ID})
+    reconciled_at = (snapshot or {}).get("reconciled_at")
+    if reconciled_at is None or datetime.utcnow() - reconciled_at > timedelta(
+        seconds=max_age_seconds
+    ):
+        snapshot = await reconcile_platform_stats()
+    return {
+        **{name: max(0, snapshot.get(name, 0)) for name in STAT_NAMES},
+        "as_of": snapshot.get("updated_at"),
+        "reconciled_at": snapshot.get("reconciled_at"),
+    }
+
+
+async def run_periodic_stats_reconciliation(interval_seconds: float) -> None:
+    """Reconcile the platform stats every ``interval_seconds`` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await reconcile_platform_stats()
+        except Exception as e:
+            print(f"Platform stats reconciliation failed: {e}")
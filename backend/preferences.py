@@ -0,0 +1,110 @@
+"""Pairwise preference counts of response selection projects.
+
+A response selection task may name the candidate behind each response option
+in ``task_data.response_models``. Selecting a response is then a set of
+preference judgments: the selected candidate beat each of the others. The
+``preference_counts`` collection keeps one counter per project and ordered
+``(winner, loser)`` pair, adjusted with ``$inc`` upserts as selections are
+submitted, changed or reset, so the ranking (see analytics.bradley_terry) is
+fitted from those counters instead of from the tasks.
+
+The task stores the pairs it contributed as ``preference_pairs``. Recording a
+selection swaps that field atomically and moves the counts from the old pairs
+to the new ones, so resubmissions and resets never count a task twice.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+import database
+
+PREFERENCE_PAIRS_FIELD = "preference_pairs"
+
+
+def selection_pairs(task_data: Any, annotation: Any) -> List[List[str]]:
+    """``[winner, loser]`` candidate pairs of a selection; empty if not rankable."""
+    if not isinstance(task_data, dict) or not isinstance(annotation, dict):
+        return []
+    models = task_data.get("response_models")
+    selected = annotation.get("selected_response")
+    if (
+        not isinstance(models, list)
+        or not isinstance(selected, int)
+        or isinstance(selected, bool)
+        or not 1 <= selected <= len(models)
+    ):
+        return []
+    winner = models[selected - 1]
+    if not isinstance(winner, str) or not winner:
+        return []
+    return [
+        [winner, loser]
+        for loser in dict.fromkeys(models)
+        if isinstance(loser, str) and loser and loser != winner
+    ]
+
+
+def pair_updates(
+    project_id: ObjectId,
+    removed: Iterable[Iterable[str]],
+    added: Iterable[Iterable[str]],
+) -> List[UpdateOne]:
+    """Counter upserts replacing the ``removed`` pairs with the ``added`` ones."""
+    deltas = Counter(tuple(pair) for pair in added)
+    deltas.subtract(tuple(pair) for pair in removed)
+    return [
+        UpdateOne(
+            {"project_id": project_id, "winner": winner, "loser": loser},
+            {"$inc": {"count": delta}},
+            upsert=True,
+        )
+        for (winner, loser), delta in deltas.items()
+        if delta
+    ]
+
+
+async def _swap_pairs(
+    task_id: ObjectId, project_id: ObjectId, pairs: Optional[List[List[str]]]
+) -> None:
+    update = (
+        {"$set": {PREFERENCE_PAIRS_FIELD: pairs}}
+        if pairs
+        else {"$unset": {PREFERENCE_PAIRS_FIELD: ""}}
+    )
+    before = await database.tasks_collection.find_one_and_update(
+        {"_id": task_id}, update, projection={PREFERENCE_PAIRS_FIELD: 1}
+    )
+    if before is None:
+        return
+    operations = pair_updates(
+        project_id, before.get(PREFERENCE_PAIRS_FIELD) or [], pairs or []
+    )
+    if operations:
+        await database.bulk_upsert(database.preference_counts_collection, operations)
+
+
+async def record_selection(task: Dict[str, Any], annotation: Any) -> None:
+    """Count a task's (new) selection in place of whatever it counted before."""
+    pairs = selection_pairs(task.get("task_data"), annotation)
+    await _swap_pairs(task["_id"], task["project_id"], pairs)
+
+
+async def release_selection(task: Dict[str, Any]) -> None:
+    """Remove a task's selection from the counts (unassigned, skipped, deleted)."""
+    await _swap_pairs(task["_id"], task["project_id"], None)
+
+
+async def project_preferences(
+    project_id: ObjectId,
+) -> List[Tuple[str, str, int]]:
+    """A project's ``(winner, loser, count)`` rows with a positive count."""
+    return [
+        (row["winner"], row["loser"], row["count"])
+        async for row in database.preference_counts_collection.find(
+            {"project_id": project_id, "count": {"$gt": 0}},
+            {"_id": 0, "winner": 1, "loser": 1, "count": 1},
+        )
+    ]
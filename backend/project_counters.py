@@ -0,0 +1,269 @@
+"""Incrementally maintained per-project task counters.
+
+Projects keep a small ``counters`` sub-document instead of an ever-growing
+``task_ids`` array. Every workflow write path reports the task's state before
+and after the change and the difference is applied with a single ``$inc``.
+``reconcile_project_counters`` recomputes the counters from the tasks
+collection and is used both as the migration off ``task_ids`` and as the
+periodic drift correction job.
+
+The same write also increments the project's ``data_version`` whenever a task
+is added or removed or its annotations change, so results derived from a
+project's annotations can be cached and keyed by that version.
+"""
+
+import asyncio
+from copy import deepcopy
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+import database
+from platform_stats import bump_platform_stats
+
+COUNTER_NAMES = ("total", "annotated", "qa_done", "completed", "returned")
+
+# Fields needed to derive a task's counter contribution
+COUNTER_PROJECTION = {
+    "project_id": 1,
+    "completed_status": 1,
+    "is_returned": 1,
+}
+
+
+# Task fields whose changes bump the project's data_version
+VERSIONED_FIELDS = ("annotation", "qa_annotation")
+DATA_VERSION_FIELD = "data_version"
+
+# Recounts of a project whose counters keep moving during reconciliation
+RECONCILE_ATTEMPTS = 3
+
+
+def empty_counters() -> Dict[str, int]:
+    return {name: 0 for name in COUNTER_NAMES}
+
+
+def task_counter_flags(task: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Return the contribution (0/1 per counter) of a single task document."""
+    if task is None:
+        return empty_counters()
+
+    status = task.get("completed_status") or {}
+    annotated = bool(status.get("annotator_part"))
+    qa_done = bool(status.get("qa_part"))
+    return {
+        "total": 1,
+        "annotated": int(annotated),
+        "qa_done": int(qa_done),
+        "completed": int(annotated and qa_done),
+        "returned": int(bool(task.get("is_returned"))),
+    }
+
+
+def counter_deltas(
+    before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+) -> Dict[str, int]:
+    """Return the non-zero counter changes caused by a task going from before to after."""
+    old = task_counter_flags(before)
+    new = task_counter_flags(after)
+    return {
+        name: new[name] - old[name]
+        for name in COUNTER_NAMES
+        if new[name] != old[name]
+    }
+
+
+def apply_update_document(
+    doc: Dict[str, Any], update: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return a copy of ``doc`` with the ``$set``/``$unset`` parts of ``update`` applied.
+
+    Only dotted paths into sub-documents are supported, which is all the task
+    write paths use.
+    """
+    result = deepcopy(doc)
+    changes: Dict[str, Any] = dict(update.get("$set", {}))
+    changes.update({path: None for path in update.get("$unset", {})})
+    for path, value in changes.items():
+        parts = path.split(".")
+        target = result
+        for part in parts[:-1]:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[parts[-1]] = value
+    return result
+
+
+def changes_versioned_fields(update: Dict[str, Any]) -> bool:
+    """Whether a task update sets or unsets any of ``VERSIONED_FIELDS``."""
+    return any(
+        path.split(".")[0] in VERSIONED_FIELDS
+        for operator in ("$set", "$unset")
+        for path in update.get(operator, {})
+    )
+
+
+async def apply_task_transition(
+    project_id: ObjectId,
+    before: Optional[Dict[str, Any]],
+    after: Optional[Dict[str, Any]],
+    data_changed: bool = False,
+) -> None:
+    """Adjust the project's counters for a task created, changed or deleted.
+
+    ``data_changed`` bumps the project's data_version even when no counter
+    moved; adding or removing a task always bumps it.
+    """
+    deltas = counter_deltas(before, after)
+    if not deltas and not data_changed:
+        return
+    increments = {f"counters.{name}": value for name, value in deltas.items()}
+    increments[DATA_VERSION_FIELD] = 1
+    await database.projects_collection.update_one(
+        {"_id": project_id}, {"$inc": increments}
+    )
+    if deltas:
+        await bump_platform_stats(
+            total_tasks=deltas.get("total", 0),
+            completed_tasks=deltas.get("completed", 0),
+        )
+
+
+async def update_task_with_counters(
+    task_id: ObjectId, update: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Apply ``update`` to a task and keep its project's counters in step.
+
+    The pre-image is captured atomically with ``find_one_and_update`` so the
+    counter delta reflects exactly the transition this write performed, even
+    when two requests race on the same task. Returns the pre-image (counter
+    fields only) or None if the task does not exist.
+    """
+    before = await database.tasks_collection.find_one_and_update(
+        {"_id": task_id}, update, projection=COUNTER_PROJECTION
+    )
+    if before is None:
+        return None
+    after = apply_update_document(before, update)
+    await apply_task_transition(
+        before["project_id"], before, after, changes_versioned_fields(update)
+    )
+    return before
+
+
+async def get_project_counters(project: Dict[str, Any]) -> Dict[str, int]:
+    """Return a project's counters, reconciling them first for unmigrated projects."""
+    counters = project.get("counters")
+    if counters is None:
+        await reconcile_project_counters([project["_id"]])
+        refreshed = await database.projects_collection.find_one(
+            {"_id": project["_id"]}, {"counters": 1}
+        )
+        counters = (refreshed or {}).get("counters")
+    return {**empty_counters(), **(counters or {})}
+
+
+async def reconcile_project_counters(
+    project_ids: Optional[Iterable[ObjectId]] = None,
+) -> int:
+    """Recompute counters from the tasks collection and drop legacy ``task_ids``.
+
+    With no ``project_ids`` every project is reconciled. Every counter ``$inc``
+    also bumps the project's data_version, so the recomputed counters are only
+    written if the version is still the one read before counting; projects
+    written to meanwhile are recounted, up to ``RECONCILE_ATTEMPTS`` times,
+    and otherwise left for the next run. Returns the number of project
+    documents written.
+    """
+    # Archived projects have no live tasks; their counters are frozen on archive
+    project_filter: Dict[str, Any] = {"archive_state": {"$exists": False}}
+    if project_ids is not None:
+        project_filter["_id"] = {"$in": list(project_ids)}
+
+    written = 0
+    for _ in range(RECONCILE_ATTEMPTS):
+        versions = {
+            project["_id"]: project.get(DATA_VERSION_FIELD)
+            async for project in database.projects_collection.find(
+                project_filter, {DATA_VERSION_FIELD: 1}
+            )
+        }
+        if not versions:
+            break
+        computed = await _count_project_tasks(
+            list(versions) if "_id" in project_filter else None
+        )
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": project_id, DATA_VERSION_FIELD: version},
+                {
+                    "$set": {
+                        "counters": computed.get(project_id, empty_counters()),
+                        "counters_reconciled_at": now,
+                    },
+                    "$unset": {"task_ids": ""},
+                },
+            )
+            for project_id, version in versions.items()
+        ]
+        result = await database.projects_collection.bulk_write(
+            operations, ordered=False
+        )
+        written += result.matched_count
+        if result.matched_count == len(operations):
+            break
+        # Recount only the projects whose version moved under us
+        project_filter = {
+            "_id": {"$in": list(versions)},
+            "archive_state": {"$exists": False},
+            "counters_reconciled_at": {"$ne": now},
+        }
+    return written
+
+
+async def _count_project_tasks(
+    project_ids: Optional[List[ObjectId]],
+) -> Dict[ObjectId, Dict[str, int]]:
+    """Counters of the given projects' (or all) tasks, aggregated from the tasks."""
+    task_match: Dict[str, Any] = {}
+    if project_ids is not None:
+        task_match = {"project_id": {"$in": project_ids}}
+
+    def _flag(expr: Any) -> Dict[str, Any]:
+        return {"$sum": {"$cond": [expr, 1, 0]}}
+
+    annotator_done = {"$eq": ["$completed_status.annotator_part", True]}
+    qa_done = {"$eq": ["$completed_status.qa_part", True]}
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": task_match},
+        {
+            "$group": {
+                "_id": "$project_id",
+                "total": {"$sum": 1},
+                "annotated": _flag(annotator_done),
+                "qa_done": _flag(qa_done),
+                "completed": _flag({"$and": [annotator_done, qa_done]}),
+                "returned": _flag({"$eq": ["$is_returned", True]}),
+            }
+        },
+    ]
+    return {
+        row["_id"]: {name: row[name] for name in COUNTER_NAMES}
+        async for row in database.tasks_collection.aggregate(pipeline)
+    }
+
+
+async def run_periodic_reconciliation(interval_seconds: float) -> None:
+    """Reconcile all project counters every ``interval_seconds`` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            updated = await reconcile_project_counters()
+            print(f"Reconciled counters for {updated} projects")
+        except Exception as e:
+            print(f"Project counter reconciliation failed: {e}")
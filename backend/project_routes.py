@@ -1,18 +1,34 @@
 """Project management endpoints"""
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from collections import defaultdict
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Depends
+from typing import Dict, List
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import database
+from archive import (
+    archive_project,
+    collections_for,
+    count_project_documents,
+    move_failed,
+    restore_project,
+    start_move,
+)
+from completion_sketches import project_sketches
+from report_cache import delete_project_reports
+from ddsketch import sketch_summary
+from platform_stats import bump_platform_stats
+from project_counters import empty_counters, get_project_counters
 from schemas import (
     ProjectCreate,
+    ProjectRedundancyUpdate,
     ProjectResponse,
     UserInDB,
     InviteResponse,
     UserResponse,
 )
+from rollups import read_rollups
 from utils import as_response, get_current_user
 
 router = APIRouter()
@@ -33,11 +49,13 @@ async def create_project(
         "manager_id": current_user.id,
         "details": project.details,
         "category": project.category,
-        "task_ids": [],
+        "counters": empty_counters(),
+        "redundancy": project.redundancy,
         "created_at": datetime.utcnow(),
     }
 
     result = await database.projects_collection.insert_one(project_dict)
+    await bump_platform_stats(total_projects=1)
     created_project = await database.projects_collection.find_one(
         {"_id": result.inserted_id}
     )
@@ -115,9 +133,18 @@ async def get_project(
     response_model_by_alias=False,
 )
 async def mark_project_complete(
-    project_id: str, current_user: UserInDB = Depends(get_current_user)
+    project_id: str,
+    background_tasks: BackgroundTasks,
+    archive: bool = False,
+    current_user: UserInDB = Depends(get_current_user),
 ):
-    """Mark project as completed (manager only)"""
+    """Mark project as completed (manager only)
+
+    With ``archive=true`` the project's tasks, annotator records, remarks and
+    notifications are moved to the compressed archive collections in the
+    background; they stay readable throughout. Archiving waits until every
+    task has been through QA.
+    """
     if current_user.role != "manager":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -141,33 +168,40 @@ async def mark_project_complete(
             detail="Not authorized to modify this project",
         )
 
-    # Check if all tasks are completed
-    tasks = await database.tasks_collection.find(
-        {"project_id": ObjectId(project_id)}
-    ).to_list(None)
+    # Check if all tasks are completed using the maintained project counters
+    counters = await get_project_counters(project)
 
-    if len(tasks) == 0:
+    if counters["total"] == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot mark project as complete. Project has no tasks.",
         )
 
-    incomplete_tasks = [
-        t
-        for t in tasks
-        if not t.get("completed_status", {}).get("annotator_part", False)
-    ]
+    incomplete_tasks = counters["total"] - counters["annotated"]
 
-    if incomplete_tasks:
+    if incomplete_tasks > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot mark project as complete. {len(incomplete_tasks)} task(s) are still incomplete.",
+            detail=f"Cannot mark project as complete. {incomplete_tasks} task(s) are still incomplete.",
+        )
+
+    # Archived tasks no longer take QA writes, so pending reviews would be lost
+    pending_qa = counters["total"] - counters["qa_done"]
+    if archive and pending_qa > 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot archive the project. {pending_qa} task(s) still await QA.",
         )
 
     # Mark project as completed
     await database.projects_collection.update_one(
         {"_id": ObjectId(project_id)}, {"$set": {"is_completed": True}}
     )
+    # Archive it, or retry a failed archive
+    state = project.get("archive_state")
+    if archive and (not state or (state == "archiving" and move_failed(project))):
+        await start_move(ObjectId(project_id), "archiving")
+        background_tasks.add_task(archive_project, ObjectId(project_id))
 
     updated_project = await database.projects_collection.find_one(
         {"_id": ObjectId(project_id)}
@@ -181,9 +215,16 @@ async def mark_project_complete(
     response_model_by_alias=False,
 )
 async def reopen_project(
-    project_id: str, current_user: UserInDB = Depends(get_current_user)
+    project_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: UserInDB = Depends(get_current_user),
 ):
-    """Reopen a completed project (manager only)"""
+    """Reopen a completed project (manager only)
+
+    An archived project's data is moved back to the working collections in
+    the background; it stays readable throughout. Reopening also recovers a
+    project whose archive or restore failed.
+    """
     if current_user.role != "manager":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -207,6 +248,18 @@ async def reopen_project(
             detail="Not authorized to modify this project",
         )
 
+    state = project.get("archive_state")
+    if state in ("archiving", "restoring") and not move_failed(project):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Project is {state}. Try again once it has finished.",
+        )
+
+    # Bring archived data back to the working collections
+    if state:
+        await start_move(ObjectId(project_id), "restoring")
+        background_tasks.add_task(restore_project, ObjectId(project_id))
+
     # Reopen project
     await database.projects_collection.update_one(
         {"_id": ObjectId(project_id)}, {"$set": {"is_completed": False}}
@@ -218,6 +271,53 @@ async def reopen_project(
     return as_response(ProjectResponse, updated_project)
 
 
+@router.put(
+    "/projects/{project_id}/redundancy",
+    response_model=ProjectResponse,
+    response_model_by_alias=False,
+)
+async def update_project_redundancy(
+    project_id: str,
+    payload: ProjectRedundancyUpdate,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Set how many annotators should label each task (manager only)
+
+    Lowering it keeps the judgments already collected.
+    """
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only managers can modify projects",
+        )
+
+    if not ObjectId.is_valid(project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid project ID"
+        )
+
+    project = await database.projects_collection.find_one({"_id": ObjectId(project_id)})
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    if project["manager_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to modify this project",
+        )
+
+    await database.projects_collection.update_one(
+        {"_id": ObjectId(project_id)}, {"$set": {"redundancy": payload.redundancy}}
+    )
+
+    updated_project = await database.projects_collection.find_one(
+        {"_id": ObjectId(project_id)}
+    )
+    return as_response(ProjectResponse, updated_project)
+
+
 @router.delete("/projects/{project_id}")
 async def delete_project(
     project_id: str, current_user: UserInDB = Depends(get_current_user)
@@ -247,8 +347,8 @@ async def delete_project(
         )
 
     # Check if project has any tasks
-    tasks_count = await database.tasks_collection.count_documents(
-        {"project_id": ObjectId(project_id)}
+    tasks_count = await count_project_documents(
+        project, "tasks", {"project_id": ObjectId(project_id)}
     )
 
     if tasks_count > 0:
@@ -265,9 +365,26 @@ async def delete_project(
     await database.annotator_tasks_collection.delete_many(
         {"project_id": ObjectId(project_id)}
     )
+    await database.task_assignments_collection.delete_many(
+        {"project_id": ObjectId(project_id)}
+    )
+    await database.completion_sketches_collection.delete_many(
+        {"project_id": ObjectId(project_id)}
+    )
+    await delete_project_reports(ObjectId(project_id))
+    await database.preference_counts_collection.delete_many(
+        {"project_id": ObjectId(project_id)}
+    )
+    await database.judgments_collection.delete_many(
+        {"project_id": ObjectId(project_id)}
+    )
 
     # Delete the project
-    await database.projects_collection.delete_one({"_id": ObjectId(project_id)})
+    result = await database.projects_collection.delete_one(
+        {"_id": ObjectId(project_id)}
+    )
+    if result.deleted_count:
+        await bump_platform_stats(total_projects=-1)
 
     return {"message": "Project deleted successfully"}
 
@@ -461,6 +578,15 @@ async def update_project_qa_annotators(
     return {"message": "QA annotators updated successfully"}
 
 
+THROUGHPUT_DAYS = 14
+
+
+def _format_duration(seconds) -> str:
+    if seconds is None:
+        return "N/A"
+    return f"{int(seconds // 60)}m {int(seconds % 60)}s"
+
+
 @router.get("/projects/{project_id}/annotator-stats")
 async def get_annotator_task_stats(
     project_id: str,
@@ -487,69 +613,70 @@ async def get_annotator_task_stats(
             detail="Not authorized to view project statistics",
         )
 
-    # Fetch all annotator task records for this project
-    cursor = database.annotator_tasks_collection.find(
-        {"project_id": ObjectId(project_id)}
-    )
-    annotator_tasks = await cursor.to_list(length=None)
-
-    # Group statistics by annotator
-    stats_by_annotator = {}
-    for task_record in annotator_tasks:
-        annotator_id = str(task_record["annotator_id"])
-
-        if annotator_id not in stats_by_annotator:
-            # Fetch annotator info
-            annotator = await database.users_collection.find_one(
-                {"_id": task_record["annotator_id"]}
-            )
-            stats_by_annotator[annotator_id] = {
-                "annotator_id": annotator_id,
-                "annotator_name": (
-                    annotator.get("name", "Unknown") if annotator else "Unknown"
-                ),
-                "annotator_email": annotator.get("email", "") if annotator else "",
-                "total_tasks_assigned": 0,
-                "total_tasks_completed": 0,
-                "total_time_seconds": 0,
-                "average_time_seconds": 0,
-                "tasks": [],
-            }
+    project_oid = ObjectId(project_id)
 
-        stats_by_annotator[annotator_id]["total_tasks_assigned"] += 1
+    # Assigned task records per annotator, counted from the index alone
+    assigned: Dict[ObjectId, int] = defaultdict(int)
+    for collection in collections_for(project, "annotator_tasks"):
+        async for row in collection.aggregate(
+            [
+                {"$match": {"project_id": project_oid}},
+                {"$group": {"_id": "$annotator_id", "count": {"$sum": 1}}},
+            ]
+        ):
+            assigned[row["_id"]] += row["count"]
 
-        # Task is completed if completion_time is not None
-        if task_record.get("completion_time") is not None:
-            stats_by_annotator[annotator_id]["total_tasks_completed"] += 1
-            completion_time = task_record.get("completion_time", 0)
-            stats_by_annotator[annotator_id]["total_time_seconds"] += completion_time
+    # Completion time distributions, kept up to date by submit_annotation
+    sketches = await project_sketches(project_oid)
+    annotator_ids = sorted(
+        (oid for oid in set(assigned) | set(sketches) if oid is not None), key=str
+    )
+    users = {
+        user["_id"]: user
+        async for user in database.users_collection.find(
+            {"_id": {"$in": annotator_ids}}, {"name": 1, "email": 1}
+        )
+    }
 
-            stats_by_annotator[annotator_id]["tasks"].append(
-                {
-                    "task_id": str(task_record["task_id"]),
-                    "completion_time_seconds": completion_time,
-                    "completion_time_formatted": f"{int(completion_time // 60)}m {int(completion_time % 60)}s",
-                }
-            )
+    annotators = []
+    for annotator_id in annotator_ids:
+        annotator = users.get(annotator_id) or {}
+        summary = sketch_summary(sketches.get(annotator_id))
+        annotators.append(
+            {
+                "annotator_id": str(annotator_id),
+                "annotator_name": annotator.get("name", "Unknown"),
+                "annotator_email": annotator.get("email", ""),
+                "total_tasks_assigned": assigned.get(annotator_id, 0),
+                "total_tasks_completed": summary["count"],
+                "total_time_seconds": summary["total_seconds"],
+                "average_time_seconds": summary["mean_seconds"] or 0,
+                "average_time_formatted": _format_duration(summary["mean_seconds"]),
+                "completion_time": summary,
+            }
+        )
 
-    # Calculate averages
-    for annotator_id in stats_by_annotator:
-        completed = stats_by_annotator[annotator_id]["total_tasks_completed"]
-        if completed > 0:
-            avg_time = (
-                stats_by_annotator[annotator_id]["total_time_seconds"] / completed
-            )
-            stats_by_annotator[annotator_id]["average_time_seconds"] = round(
-                avg_time, 2
-            )
-            stats_by_annotator[annotator_id][
-                "average_time_formatted"
-            ] = f"{int(avg_time // 60)}m {int(avg_time % 60)}s"
-        else:
-            stats_by_annotator[annotator_id]["average_time_formatted"] = "N/A"
+    # Daily throughput over the last two weeks
+    since = datetime.utcnow() - timedelta(days=THROUGHPUT_DAYS - 1)
+    throughput: Dict[datetime, Dict[str, float]] = defaultdict(
+        lambda: {"annotations_submitted": 0, "annotation_seconds": 0}
+    )
+    for row in await read_rollups(
+        {"project_id": project_oid},
+        since,
+        ["annotations_submitted", "annotation_seconds"],
+    ):
+        day = throughput[row["day"]]
+        day["annotations_submitted"] += row.get("annotations_submitted", 0)
+        day["annotation_seconds"] += row.get("annotation_seconds", 0)
 
     return {
         "project_id": project_id,
         "project_name": project.get("name", ""),
-        "annotators": list(stats_by_annotator.values()),
+        "completion_time": sketch_summary(sketches.get(None)),
+        "daily_throughput": [
+            {"date": day.strftime("%Y-%m-%d"), **throughput[day]}
+            for day in sorted(throughput)
+        ],
+        "annotators": annotators,
     }
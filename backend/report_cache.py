@@ -0,0 +1,67 @@
+"""Cache of per-project analytics reports, keyed by the project's data_version.
+
+Every task write that adds or removes a task or changes its annotations bumps
+the project's ``data_version`` (see project_counters). A report computed from
+a project's annotations is stored in the ``report_cache`` collection with the
+version it was computed at and served from there until the version moves on.
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from bson import ObjectId
+
+import database
+from project_counters import DATA_VERSION_FIELD
+
+
+async def cached_report(
+    project: Dict[str, Any],
+    report: str,
+    compute: Callable[[Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Return a project's cached ``report``, computing it if it is stale.
+
+    ``compute`` is passed the stale cached result (or None) for reports that
+    can be updated from it. ``project`` must be read before the report is
+    computed: the result is stored under that version, so a write racing the
+    computation leaves it stale rather than serving old data under a new
+    version.
+    """
+    version = project.get(DATA_VERSION_FIELD, 0)
+    key = {"project_id": project["_id"], "report": report}
+    cached = await database.report_cache_collection.find_one(key)
+    if cached and cached.get(DATA_VERSION_FIELD) == version:
+        return cached["result"]
+
+    previous = cached.get("result") if cached else None
+    result = {**await compute(previous), "computed_at": datetime.utcnow()}
+    return await save_report(project, report, result)
+
+
+async def save_report(
+    project: Dict[str, Any],
+    report: str,
+    result: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Store a report computed at the project's (pre-computation) data_version."""
+    version = project.get(DATA_VERSION_FIELD, 0)
+    result = {**result, DATA_VERSION_FIELD: version}
+    await database.report_cache_collection.update_one(
+        {"project_id": project["_id"], "report": report},
+        {"$set": {"result": result, DATA_VERSION_FIELD: version}},
+        upsert=True,
+    )
+    return result
+
+
+async def load_report(project_id: ObjectId, report: str) -> Optional[Dict[str, Any]]:
+    """A project's last stored ``report``, whatever its version, or None."""
+    cached = await database.report_cache_collection.find_one(
+        {"project_id": project_id, "report": report}
+    )
+    return cached.get("result") if cached else None
+
+
+async def delete_project_reports(project_id: ObjectId) -> None:
+    await database.report_cache_collection.delete_many({"project_id": project_id})
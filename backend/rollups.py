@@ -0,0 +1,97 @@
+"""Daily activity rollups for the dashboards.
+
+Workflow write paths record their events as ``$inc`` upserts into
+``daily_rollups``, one document per (day, project_id, user_id):
+
+    {"day": 2024-05-01T00:00, "project_id": ..., "user_id": ...,
+     "annotations_submitted": 12, "annotation_seconds": 5400, ...}
+
+Project-level events that have no acting user (tasks created) are stored with
+``user_id`` None. Dashboards read a bounded number of these rows instead of
+scanning task history; ``migrations.m0006_daily_rollups`` backfills them from
+existing documents.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+import database
+
+ROLLUP_FIELDS = (
+    "tasks_created",
+    "annotations_submitted",
+    "qa_completed",
+    "returns",
+    "annotation_seconds",
+    "qa_seconds",
+)
+
+
+def day_of(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_update(
+    project_id: ObjectId,
+    user_id: Optional[ObjectId],
+    at: datetime,
+    deltas: Dict[str, float],
+    live: bool = True,
+) -> Optional[UpdateOne]:
+    """Return the upsert adding ``deltas`` to a rollup row, or None if all are zero.
+
+    Live events also record ``first_event_at``, which bounds what the backfill
+    may still count (see m0006).
+    """
+    changes = {name: value for name, value in deltas.items() if value}
+    unknown = set(changes) - set(ROLLUP_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown rollup fields: {sorted(unknown)}")
+    if not changes:
+        return None
+    update: Dict[str, Any] = {"$inc": changes}
+    if live:
+        update["$min"] = {"first_event_at": at}
+    return UpdateOne(
+        {"day": day_of(at), "project_id": project_id, "user_id": user_id},
+        update,
+        upsert=True,
+    )
+
+
+async def first_live_event_at() -> Optional[datetime]:
+    """Return when the earliest live event was recorded, if any."""
+    row = await database.daily_rollups_collection.find_one(
+        {"first_event_at": {"$exists": True}},
+        {"first_event_at": 1},
+        sort=[("first_event_at", 1)],
+    )
+    return row["first_event_at"] if row else None
+
+
+async def record_activity(
+    project_id: ObjectId,
+    user_id: Optional[ObjectId],
+    at: Optional[datetime] = None,
+    **deltas: float,
+) -> None:
+    """Add workflow activity to today's rollup, e.g. ``annotations_submitted=1``."""
+    operation = rollup_update(project_id, user_id, at or datetime.utcnow(), deltas)
+    if operation is not None:
+        await database.bulk_upsert(database.daily_rollups_collection, [operation])
+
+
+async def read_rollups(
+    match: Dict[str, Any], since: datetime, fields: List[str]
+) -> List[Dict[str, Any]]:
+    """Return the rollup rows matching ``match`` from ``since`` onwards."""
+    projection = {"_id": 0, "day": 1, "project_id": 1, "user_id": 1}
+    projection.update({field: 1 for field in fields})
+    return await (
+        database.daily_rollups_collection
+        .find({**match, "day": {"$gte": day_of(since)}}, projection)
+        .to_list(None)
+    )
@@ -10,6 +10,8 @@ import task_routes
 import invite_routes
 import notification_routes
 import admin_routes
+import analytics_routes
+import judgment_routes
 
 # Create main router
 router = APIRouter()
@@ -22,3 +24,5 @@ router.include_router(task_routes.router, tags=["Tasks"])
 router.include_router(invite_routes.router, tags=["Invites"])
 router.include_router(notification_routes.router, tags=["Notifications"])
 router.include_router(admin_routes.router, tags=["Admin"])
+router.include_router(analytics_routes.router, tags=["Analytics"])
+router.include_router(judgment_routes.router, tags=["Judgments"])
@@ -4,6 +4,7 @@ from pydantic import (
     EmailStr,
     GetCoreSchemaHandler,
     GetJsonSchemaHandler,
+    field_validator,
 )
 from typing import Optional, List, Literal, Dict, Any, Union
 from datetime import datetime
@@ -11,6 +12,9 @@ from bson import ObjectId
 from enum import Enum
 from pydantic_core import core_schema
 
+from annotation_codec import decode_annotation
+from ner_tokens import offsets_for_response
+
 
 # Custom ObjectId handler compatible with Pydantic v2
 class PyObjectId(ObjectId):
@@ -108,9 +112,28 @@ class UserResponse(BaseModel):
 
 
 # Project Schema
+class ProjectCounters(BaseModel):
+    """Task counters maintained incrementally by the workflow write paths"""
+
+    total: int = 0
+    annotated: int = 0
+    qa_done: int = 0
+    completed: int = 0  # Both annotator and QA parts done
+    returned: int = 0
+
+
+# Most annotators that may label the same task (see judgments)
+MAX_REDUNDANCY = 10
+
+
 class ProjectCreate(BaseModel):
     details: str
     category: TaskCategory
+    redundancy: int = Field(1, ge=1, le=MAX_REDUNDANCY)
+
+
+class ProjectRedundancyUpdate(BaseModel):
+    redundancy: int = Field(..., ge=1, le=MAX_REDUNDANCY)
 
 
 class Project(BaseModel):
@@ -118,8 +141,15 @@ class Project(BaseModel):
     manager_id: PyObjectId
     details: str
     category: TaskCategory  # Added category field
-    task_ids: List[PyObjectId] = []
+    counters: ProjectCounters = Field(default_factory=ProjectCounters)
+    # Judgments (annotator labels) wanted per task for consensus
+    redundancy: int = 1
     is_completed: bool = False  # Track if project is marked as completed
+    # Cold-tier state; None while the project's data is in the working collections
+    archive_state: Optional[Literal["archiving", "archived", "restoring"]] = None
+    archived_at: Optional[datetime] = None
+    # Why the last archive or restore move failed (see archive.py)
+    archive_error: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
@@ -134,8 +164,12 @@ class ProjectResponse(BaseModel):
     manager_id: str
     details: str
     category: TaskCategory
-    task_ids: List[str] = []
+    counters: ProjectCounters = Field(default_factory=ProjectCounters)
+    redundancy: int = 1
     is_completed: bool = False
+    archive_state: Optional[Literal["archiving", "archived", "restoring"]] = None
+    archived_at: Optional[datetime] = None
+    archive_error: Optional[str] = None
     created_at: datetime
 
 
@@ -170,6 +204,8 @@ class ResponseSelectionData(BaseModel):
     dialogue: List[DialogueMessage]  # Conversation history leading to this point
     response_options: List[str]  # Multiple response options to choose from
     context: Optional[str] = None  # Additional context if needed
+    # Optional: the candidate (model/system) behind each option, for rankings
+    response_models: Optional[List[str]] = None
 
 
 class ImageClassificationData(BaseModel):
@@ -303,6 +339,35 @@ class TaskRemark(BaseModel):
         json_encoders = {ObjectId: str}
 
 
+class TaskRemarkResponse(BaseModel):
+    id: str = Field(alias="_id")
+    task_id: str
+    message: str
+    author_id: str
+    author_name: Optional[str] = None
+    author_role: Literal["admin", "manager", "annotator"]
+    remark_type: Literal["qa_return", "annotator_reply", "qa_note", "manager_note"]
+    created_at: datetime
+
+
+class TaskRemarkPage(BaseModel):
+    remarks: List[TaskRemarkResponse]
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
+    total: int = 0
+
+
+class TaskDataRange(BaseModel):
+    """A slice of a long task_data field (document paragraphs, chat messages)"""
+
+    field: str
+    offset: int
+    limit: int
+    unit: Literal["items", "characters"]  # Characters when the field is one string
+    total: int
+    items: Union[List[Any], str]
+    next_offset: Optional[int] = None  # None once the end has been reached
+
+
 # Main Task Schema
 class Task(BaseModel):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -320,6 +385,10 @@ class Task(BaseModel):
         NERData,
         Dict[str, Any],  # Fallback for custom categories
     ]
+    # Large task_data fields stored in the blob store: field -> {sha256, size}
+    task_data_blobs: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    # NER tasks: packed token start/end offsets of task_data.text (see ner_tokens)
+    token_offsets: Optional[bytes] = None
 
     # Annotation data - filled by annotator
     annotation: Optional[
@@ -352,7 +421,8 @@ class Task(BaseModel):
     returned_by: Optional[PyObjectId] = None  # User who returned the task
     accumulated_time: Optional[float] = None  # Time spent by annotator before return (in seconds)
     qa_accumulated_time: Optional[float] = None  # Time spent by QA annotator (in seconds)
-    remarks: List[TaskRemark] = Field(default_factory=list)
+    remark_count: int = 0  # Remarks are stored in the task_remarks collection
+    last_remark_at: Optional[datetime] = None
 
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -409,10 +479,9 @@ class ManagerProject(BaseModel):
         json_encoders = {ObjectId: str}
 
 
-# Project Working Schema - Tracks annotator assignments
+# Project Working Schema - Tracks project membership
 class AnnotatorTaskAssignment(BaseModel):
     annotator_id: PyObjectId
-    task_ids: List[PyObjectId] = []
     assigned_at: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -431,6 +500,20 @@ class ProjectWorking(BaseModel):
         json_encoders = {ObjectId: str}
 
 
+# Task Assignment Schema - One document per open (task, annotator) assignment
+class TaskAssignment(BaseModel):
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    project_id: PyObjectId
+    annotator_id: PyObjectId
+    task_id: PyObjectId
+    assigned_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
 # Annotator Tasks Schema - Tracks completion times
 class TaskCompletion(BaseModel):
     task_id: PyObjectId
@@ -462,6 +545,10 @@ class TaskResponse(BaseModel):
     project_id: str
     category: TaskCategory
     task_data: Dict[str, Any]
+    # Fields of task_data not inlined in list responses; open the task to load them
+    task_data_blobs: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    # Full length of each range field cut by ?lazy=true (see TaskDataRange)
+    task_data_totals: Optional[Dict[str, int]] = None
     annotation: Optional[Dict[str, Any]] = None
     qa_annotation: Optional[Dict[str, Any]] = None
     qa_feedback: Optional[str] = None
@@ -474,12 +561,29 @@ class TaskResponse(BaseModel):
     returned_by: Optional[str] = None
     accumulated_time: Optional[float] = None
     qa_accumulated_time: Optional[float] = None
-    remarks: List[TaskRemark] = Field(default_factory=list)
+    remark_count: int = 0
+    last_remark_at: Optional[datetime] = None
     created_at: datetime
     annotator_started_at: Optional[datetime] = None
     annotator_completed_at: Optional[datetime] = None
     qa_started_at: Optional[datetime] = None
     qa_completed_at: Optional[datetime] = None
+    # NER token start/end offsets, flattened (see ner_tokens); single-task reads only
+    token_offsets: Optional[List[int]] = None
+    # Labels submitted for the task and the latest consensus (see judgments)
+    judgment_count: int = 0
+    consensus: Optional[Dict[str, Any]] = None
+
+    # Annotations may be stored column-packed (see annotation_codec)
+    @field_validator("annotation", "qa_annotation", mode="before")
+    @classmethod
+    def _decode_annotation(cls, value):
+        return decode_annotation(value)
+
+    @field_validator("token_offsets", mode="before")
+    @classmethod
+    def _unpack_token_offsets(cls, value):
+        return offsets_for_response(value)
 
 
 class AssignTaskRequest(BaseModel):
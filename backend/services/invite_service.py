@@ -133,7 +133,6 @@ class InviteService(InviteServiceInterface):
 
         annotator_entry = {
             "annotator_id": current_user.id,
-            "task_ids": [],
             "assigned_at": datetime.utcnow(),
         }
 
@@ -1,12 +1,78 @@
+import os
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
+from bson import ObjectId
 from fastapi import HTTPException, status
 
 import database
+from rollups import read_rollups
 from schemas import UserInDB
 
+# Cached work stats are recomputed after this long even without submissions
+WORK_STATS_CACHE_SECONDS = float(os.getenv("WORK_STATS_CACHE_SECONDS", "300"))
+
+
+async def invalidate_work_stats(*user_ids: Optional[ObjectId]) -> None:
+    """Mark the cached work stats of the given users as stale."""
+    now = datetime.utcnow()
+    for user_id in {user_id for user_id in user_ids if user_id is not None}:
+        await database.work_stats_cache_collection.update_one(
+            {"_id": user_id}, {"$set": {"invalidated_at": now}}, upsert=True
+        )
+
+
+def _role_totals(
+    user_id: ObjectId, role_field: str, done_field: str, seconds_field: str, prefix: str
+) -> List[Dict[str, Any]]:
+    """Pipeline summing one workflow role's task counts and time for a user."""
+    return [
+        {"$match": {role_field: user_id}},
+        {
+            "$group": {
+                "_id": None,
+                f"{prefix}_assigned": {"$sum": 1},
+                f"{prefix}_completed": {"$sum": {"$cond": [f"${done_field}", 1, 0]}},
+                f"{prefix}_seconds": {"$sum": {"$ifNull": [f"${seconds_field}", 0]}},
+            }
+        },
+    ]
+
+
+async def work_totals(user_id: ObjectId) -> Dict[str, float]:
+    """Lifetime task counts and time for a user across both tiers, in one aggregate."""
+    annotation = _role_totals(
+        user_id,
+        "assigned_annotator_id",
+        "completed_status.annotator_part",
+        "accumulated_time",
+        "annotation",
+    )
+    qa = _role_totals(
+        user_id,
+        "assigned_qa_id",
+        "completed_status.qa_part",
+        "qa_accumulated_time",
+        "qa",
+    )
+    archive = database.archive_name("tasks")
+    fields = [
+        f"{prefix}_{name}"
+        for prefix in ("annotation", "qa")
+        for name in ("assigned", "completed", "seconds")
+    ]
+    pipeline = [
+        *annotation,
+        {"$unionWith": {"coll": "tasks", "pipeline": qa}},
+        {"$unionWith": {"coll": archive, "pipeline": annotation}},
+        {"$unionWith": {"coll": archive, "pipeline": qa}},
+        {"$group": {"_id": None, **{field: {"$sum": f"${field}"} for field in fields}}},
+    ]
+    rows = await database.tasks_collection.aggregate(pipeline).to_list(1)
+    totals = rows[0] if rows else {}
+    return {field: totals.get(field, 0) for field in fields}
+
 
 class UserServiceInterface(ABC):
     @abstractmethod
@@ -23,18 +89,36 @@ class UserService(UserServiceInterface):
                 detail="Only annotators can view work stats",
             )
 
-        annotator_tasks = await database.tasks_collection.find(
-            {"assigned_annotator_id": current_user.id}
-        ).to_list(None)
-
-        qa_tasks = await database.tasks_collection.find(
-            {"assigned_qa_id": current_user.id}
-        ).to_list(None)
-
-        total_annotation_seconds = 0
-        total_qa_seconds = 0
-
         now = datetime.utcnow()
+        cached = await database.work_stats_cache_collection.find_one(
+            {"_id": current_user.id}
+        )
+        if (
+            cached
+            and cached.get("stats") is not None
+            and cached["computed_at"] >= cached.get("invalidated_at", datetime.min)
+            and cached["computed_at"].date() == now.date()
+            and now - cached["computed_at"]
+            < timedelta(seconds=WORK_STATS_CACHE_SECONDS)
+        ):
+            return cached["stats"]
+
+        stats = await self._compute_work_stats(current_user.id, now)
+        # Stored with the start time, so an invalidation during the
+        # computation still marks the result stale
+        await database.work_stats_cache_collection.update_one(
+            {"_id": current_user.id},
+            {"$set": {"stats": stats, "computed_at": now}},
+            upsert=True,
+        )
+        return stats
+
+    async def _compute_work_stats(self, user_id: ObjectId, now: datetime) -> Dict:
+        # Include tasks of archived projects so totals do not drop on archiving
+        totals = await work_totals(user_id)
+        total_annotation_seconds = totals["annotation_seconds"]
+        total_qa_seconds = totals["qa_seconds"]
+
         start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
         start_of_week = start_of_today - timedelta(days=start_of_today.weekday())
         start_of_month = start_of_today.replace(day=1)
@@ -44,47 +128,31 @@ class UserService(UserServiceInterface):
             date = (start_of_today - timedelta(days=i)).strftime("%Y-%m-%d")
             daily_hours[date] = {"annotation": 0, "qa": 0}
 
-        for task in annotator_tasks:
-            accumulated_time = task.get("accumulated_time", 0) or 0
-            total_annotation_seconds += accumulated_time
-
-            completed_at = task.get("annotator_completed_at")
-            if completed_at and accumulated_time > 0:
-                if isinstance(completed_at, str):
-                    completed_at = datetime.fromisoformat(
-                        completed_at.replace("Z", "+00:00")
-                    )
-                date_str = completed_at.strftime("%Y-%m-%d")
-                if date_str in daily_hours:
-                    daily_hours[date_str]["annotation"] += accumulated_time
-
-        for task in qa_tasks:
-            qa_time = task.get("qa_accumulated_time", 0) or 0
-            total_qa_seconds += qa_time
-
-            qa_completed_at = task.get("qa_completed_at")
-            if qa_completed_at and qa_time > 0:
-                if isinstance(qa_completed_at, str):
-                    qa_completed_at = datetime.fromisoformat(
-                        qa_completed_at.replace("Z", "+00:00")
-                    )
-                date_str = qa_completed_at.strftime("%Y-%m-%d")
-                if date_str in daily_hours:
-                    daily_hours[date_str]["qa"] += qa_time
-
+        # Daily, weekly and monthly hours come from the activity rollups (one
+        # row per project and day worked) instead of the task history
         week_annotation_seconds = 0
         week_qa_seconds = 0
         month_annotation_seconds = 0
         month_qa_seconds = 0
 
-        for date_str, hours in daily_hours.items():
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            if date >= start_of_week:
-                week_annotation_seconds += hours["annotation"]
-                week_qa_seconds += hours["qa"]
-            if date >= start_of_month:
-                month_annotation_seconds += hours["annotation"]
-                month_qa_seconds += hours["qa"]
+        rows = await read_rollups(
+            {"user_id": user_id},
+            min(start_of_today - timedelta(days=29), start_of_month),
+            ["annotation_seconds", "qa_seconds"],
+        )
+        for row in rows:
+            annotation = row.get("annotation_seconds", 0)
+            qa = row.get("qa_seconds", 0)
+            date_str = row["day"].strftime("%Y-%m-%d")
+            if date_str in daily_hours:
+                daily_hours[date_str]["annotation"] += annotation
+                daily_hours[date_str]["qa"] += qa
+            if row["day"] >= start_of_week:
+                week_annotation_seconds += annotation
+                week_qa_seconds += qa
+            if row["day"] >= start_of_month:
+                month_annotation_seconds += annotation
+                month_qa_seconds += qa
 
         def seconds_to_hours(seconds: float) -> float:
             return round(seconds / 3600, 2)
@@ -140,20 +208,12 @@ class UserService(UserServiceInterface):
                 "total": seconds_to_hours(month_annotation_seconds + month_qa_seconds),
             },
             "tasks_completed": {
-                "annotation": len(
-                    [
-                        task
-                        for task in annotator_tasks
-                        if task.get("completed_status", {}).get("annotator_part")
-                    ]
-                ),
-                "qa": len(
-                    [task for task in qa_tasks if task.get("completed_status", {}).get("qa_part")]
-                ),
+                "annotation": totals["annotation_completed"],
+                "qa": totals["qa_completed"],
             },
             "tasks_assigned": {
-                "annotation": len(annotator_tasks),
-                "qa": len(qa_tasks),
+                "annotation": totals["annotation_assigned"],
+                "qa": totals["qa_assigned"],
             },
             "weekly_data": weekly_data,
             "monthly_data": monthly_data,
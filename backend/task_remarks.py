@@ -0,0 +1,125 @@
+"""Task remark storage.
+
+Remarks live in their own collection, indexed by (task_id, created_at, _id),
+instead of an embedded ``remarks`` array on the task. Task documents only keep
+``remark_count`` and ``last_remark_at`` so list endpoints stay small no matter
+how long a QA discussion gets.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+import database
+from schemas import TaskRemark
+
+
+def remark_document(task_id: ObjectId, project_id: ObjectId, remark: TaskRemark):
+    """Build the stored document for a remark on a task."""
+    return {
+        "task_id": task_id,
+        "project_id": project_id,
+        **remark.model_dump(by_alias=True),
+    }
+
+
+def remark_task_update(remark: TaskRemark) -> Dict[str, Any]:
+    """Return the task update operators that account for one new remark."""
+    return {
+        "$inc": {"remark_count": 1},
+        "$max": {"last_remark_at": remark.created_at},
+    }
+
+
+async def insert_remark(
+    task_id: ObjectId, project_id: ObjectId, remark: TaskRemark
+) -> ObjectId:
+    """Store a remark; the caller updates the task with ``remark_task_update``."""
+    result = await database.task_remarks_collection.insert_one(
+        remark_document(task_id, project_id, remark)
+    )
+    return result.inserted_id
+
+
+def embedded_remark_operations(
+    task: Dict[str, Any],
+) -> Tuple[List[UpdateOne], Dict[str, Any], Dict[str, Any]]:
+    """Writes moving a task's legacy embedded ``remarks`` into the collection.
+
+    Remarks are upserted on their natural key so an interrupted migration can
+    be rerun. The task update adjusts the counters and removes the array, and
+    its filter is guarded on the array still being present. Returns ``(remark
+    upserts, task filter, task update)``.
+    """
+    remarks: List[Dict[str, Any]] = task.get("remarks") or []
+    operations = []
+    for remark in remarks:
+        key = {
+            "task_id": task["_id"],
+            "author_id": remark.get("author_id"),
+            "created_at": remark.get("created_at"),
+            "message": remark.get("message"),
+        }
+        operations.append(
+            UpdateOne(
+                key,
+                {
+                    "$setOnInsert": {
+                        **{k: v for k, v in remark.items() if k not in key},
+                        "project_id": task["project_id"],
+                    }
+                },
+                upsert=True,
+            )
+        )
+
+    update: Dict[str, Any] = {"$unset": {"remarks": ""}}
+    if remarks:
+        update["$inc"] = {"remark_count": len(remarks)}
+        timestamps = [r["created_at"] for r in remarks if r.get("created_at")]
+        if timestamps:
+            update["$max"] = {"last_remark_at": max(timestamps)}
+    return operations, {"_id": task["_id"], "remarks": {"$exists": True}}, update
+
+
+async def migrate_embedded_remarks(task: Dict[str, Any]) -> int:
+    """Move one task's embedded remarks. Returns the number of remarks moved."""
+    operations, task_filter, task_update = embedded_remark_operations(task)
+    if operations:
+        await database.bulk_upsert(database.task_remarks_collection, operations)
+    result = await database.tasks_collection.update_one(task_filter, task_update)
+    return len(operations) if result.modified_count else 0
+
+
+async def list_remarks(
+    task_id: ObjectId,
+    limit: int,
+    after: Optional[ObjectId] = None,
+    collection=None,
+) -> List[Dict[str, Any]]:
+    """Return up to ``limit`` remarks of a task in thread order, after a cursor.
+
+    ``collection`` defaults to the live remarks collection; archived threads
+    pass the archive collection instead. Raises ValueError if ``after`` is not
+    a remark of the task, rather than starting the thread over.
+    """
+    if collection is None:
+        collection = database.task_remarks_collection
+    query: Dict[str, Any] = {"task_id": task_id}
+    if after is not None:
+        anchor = await collection.find_one(
+            {"_id": after, "task_id": task_id}, {"created_at": 1}
+        )
+        if anchor is None:
+            raise ValueError(f"Remark {after} is not in this thread")
+        query["$or"] = [
+            {"created_at": {"$gt": anchor["created_at"]}},
+            {"created_at": anchor["created_at"], "_id": {"$gt": after}},
+        ]
+    return (
+        await collection.find(query)
+        .sort([("created_at", 1), ("_id", 1)])
+        .limit(limit)
+        .to_list(limit)
+    )
@@ -1,6 +1,6 @@
 """Task management endpoints"""
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from fastapi.responses import StreamingResponse, JSONResponse
 from typing import List, Optional, Dict, Any
 from bson import ObjectId
@@ -10,6 +10,55 @@ import csv
 import json
 
 import database
+from analytics.pool import run_in_pool
+from annotation_codec import decode_annotation, encode_annotation, should_offload
+from archive import (
+    archive_collection,
+    count_with_archive,
+    find_one_with_archive,
+    find_page_with_archive,
+    find_project_documents,
+    find_with_archive,
+)
+from box_validation import normalize_detection_annotation
+from chatbot_flags import FLAGS_FIELD, flag_bits, flags_filter
+from ner_tokens import (
+    TOKEN_OFFSETS_FIELD,
+    pack_offsets,
+    snap_entities,
+    token_offsets,
+    unpack_offsets,
+)
+from completion_sketches import (
+    RECORD_PROJECTION,
+    add_completion_time,
+    release_record_sample,
+)
+from blob_store import (
+    externalize_task_data,
+    release_blobs,
+    release_task_blobs,
+    resolve_task_data,
+    resolve_task_data_many,
+)
+from judgments import (
+    CONSENSUS_FIELD,
+    JUDGMENT_FIELDS,
+    delete_task_judgments,
+    judgment_label,
+    record_judgment,
+    remove_judgment,
+)
+from preferences import record_selection, release_selection
+from project_counters import apply_task_transition, update_task_with_counters
+from rollups import record_activity
+from services.user_service import invalidate_work_stats
+from task_remarks import (
+    insert_remark,
+    list_remarks,
+    migrate_embedded_remarks,
+    remark_task_update,
+)
 from schemas import (
     TaskCreate,
     TaskResponse,
@@ -20,16 +69,28 @@ from schemas import (
     TaskCategory,
     TaskRemark,
     TaskRemarkCreate,
+    TaskDataRange,
+    TaskRemarkPage,
+    TaskRemarkResponse,
 )
 from utils import (
     as_response,
     get_current_user,
+    omit_defaults,
+    sparse_update,
     DATA_MODEL_BY_CATEGORY,
     ANNOTATION_MODEL_BY_CATEGORY,
 )
 
 router = APIRouter()
 
+# Long task_data fields that can be read in ranges
+RANGE_FIELDS = ("document", "messages")
+# Items of each range field included when a task is opened with ?lazy=true
+LAZY_FIRST_PAGE = 20
+# Task lists leave out per-task data only needed once a task is opened
+LIST_PROJECTION = {TOKEN_OFFSETS_FIELD: 0}
+
 
 @router.post(
     "/projects/{project_id}/tasks",
@@ -101,35 +162,45 @@ async def create_task(
     else:
         task_data = task.task_data
 
-    task_dict = {
-        "project_id": ObjectId(project_id),
-        "category": incoming_cat_value,
-        "task_data": task_data,
-        "annotation": None,
-        "qa_annotation": None,
-        "qa_feedback": None,
-        "completed_status": {"annotator_part": False, "qa_part": False},
-        "tag_task": task.tag_task,
-        "assigned_annotator_id": None,
-        "assigned_qa_id": None,
-        "return_reason": None,
-        "returned_by": None,
-        "created_at": datetime.utcnow(),
-        "annotator_started_at": None,
-        "annotator_completed_at": None,
-        "qa_started_at": None,
-        "qa_completed_at": None,
-    }
+    # NER texts are tokenized once here; the offsets are served with the task
+    packed_offsets = None
+    if cat_enum == TaskCategory.NER and isinstance(task_data.get("text"), str):
+        packed_offsets = pack_offsets(token_offsets(task_data["text"]))
+
+    # Large fields (e.g. long source documents) go to the shared blob store
+    task_data, task_data_blobs = await externalize_task_data(task_data)
+
+    # Unset fields (assignments, annotations, timestamps) are simply not stored
+    task_dict = omit_defaults(
+        {
+            "project_id": ObjectId(project_id),
+            "category": incoming_cat_value,
+            "task_data": task_data,
+            "completed_status": {"annotator_part": False, "qa_part": False},
+            "tag_task": task.tag_task,
+            "created_at": datetime.utcnow(),
+        }
+    )
 
-    result = await database.tasks_collection.insert_one(task_dict)
+    if task_data_blobs:
+        task_dict["task_data_blobs"] = task_data_blobs
+    if packed_offsets is not None:
+        task_dict[TOKEN_OFFSETS_FIELD] = packed_offsets
+
+    try:
+        result = await database.tasks_collection.insert_one(task_dict)
+    except Exception:
+        await release_blobs(ref["sha256"] for ref in task_data_blobs.values())
+        raise
 
-    # Update project with new task ID
-    await database.projects_collection.update_one(
-        {"_id": ObjectId(project_id)}, {"$push": {"task_ids": result.inserted_id}}
+    # Update project counters with the new task
+    await apply_task_transition(ObjectId(project_id), None, task_dict)
+    await record_activity(
+        ObjectId(project_id), None, task_dict["created_at"], tasks_created=1
     )
 
     created_task = await database.tasks_collection.find_one({"_id": result.inserted_id})
-    return as_response(TaskResponse, created_task)
+    return as_response(TaskResponse, await resolve_task_data(created_task))
 
 
 @router.get(
@@ -138,9 +209,15 @@ async def create_task(
     response_model_by_alias=False,
 )
 async def get_project_tasks(
-    project_id: str, current_user: UserInDB = Depends(get_current_user)
+    project_id: str,
+    flagged: List[str] = Query([]),
+    current_user: UserInDB = Depends(get_current_user),
 ):
-    """Get all tasks for a project"""
+    """Get all tasks for a project
+
+    ``flagged`` keeps only chatbot assessments submitted with all of the given
+    flags (e.g. ``?flagged=hallucination&flagged=gives_harmful_advice``).
+    """
     if not ObjectId.is_valid(project_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid project ID"
@@ -173,9 +250,14 @@ async def get_project_tasks(
                 detail="Not authorized to view tasks for this project",
             )
 
-    tasks = await database.tasks_collection.find(
-        {"project_id": ObjectId(project_id)}
-    ).to_list(None)
+    query: Dict[str, Any] = {"project_id": ObjectId(project_id)}
+    if flagged:
+        try:
+            query.update(flags_filter(all_of=flagged))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    tasks = await find_project_documents(project, "tasks", query, LIST_PROJECTION)
     return [as_response(TaskResponse, task) for task in tasks]
 
 
@@ -222,7 +304,9 @@ async def get_completed_tasks(
             )
         query["assigned_annotator_id"] = ObjectId(annotator_id)
 
-    tasks = await database.tasks_collection.find(query).to_list(None)
+    tasks = await find_project_documents(project, "tasks", query, LIST_PROJECTION)
+    # The review list renders full task data, so resolve blob fields in one query
+    await resolve_task_data_many(tasks)
     return [as_response(TaskResponse, task) for task in tasks]
 
 
@@ -245,14 +329,16 @@ async def export_completed_tasks(
     ):
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    cursor = database.tasks_collection.find(
+    docs = await find_project_documents(
+        project,
+        "tasks",
         {
             "project_id": ObjectId(project_id),
             "completed_status.annotator_part": True,
             "completed_status.qa_part": True,
-        }
+        },
     )
-    docs = await cursor.to_list(None)
+    await resolve_task_data_many(docs)
 
     # Prepare export rows
     rows = []
@@ -294,11 +380,17 @@ async def export_completed_tasks(
                     else None
                 ),
                 "task_data": json.dumps(d.get("task_data", {}), ensure_ascii=False),
-                "annotation": json.dumps(d.get("annotation", {}), ensure_ascii=False),
+                "annotation": json.dumps(
+                    decode_annotation(d.get("annotation", {})), ensure_ascii=False
+                ),
                 "qa_annotation": json.dumps(
-                    d.get("qa_annotation", {}), ensure_ascii=False
+                    decode_annotation(d.get("qa_annotation", {})), ensure_ascii=False
                 ),
                 "qa_feedback": d.get("qa_feedback"),
+                "consensus_label": (d.get(CONSENSUS_FIELD) or {}).get("label"),
+                "consensus_confidence": (d.get(CONSENSUS_FIELD) or {}).get(
+                    "confidence"
+                ),
             }
         )
 
@@ -356,6 +448,8 @@ async def export_completed_tasks(
             "annotation",
             "qa_annotation",
             "qa_feedback",
+            "consensus_label",
+            "consensus_confidence",
         ]
     )
     writer = csv.DictWriter(output, fieldnames=fieldnames)
@@ -423,43 +517,226 @@ async def get_my_project_tasks(
             )
 
     # Get all tasks assigned to this annotator
-    tasks = await database.tasks_collection.find(
+    tasks = await find_project_documents(
+        project,
+        "tasks",
         {
             "project_id": ObjectId(project_id),
             "$or": [
                 {"assigned_annotator_id": current_user.id},
                 {"assigned_qa_id": current_user.id},
             ],
-        }
-    ).to_list(None)
+        },
+        LIST_PROJECTION,
+    )
     return [as_response(TaskResponse, task) for task in tasks]
 
 
 @router.get(
     "/tasks/{task_id}", response_model=TaskResponse, response_model_by_alias=False
 )
-async def get_task(task_id: str, current_user: UserInDB = Depends(get_current_user)):
-    """Get single task by ID if user has access"""
+async def get_task(
+    task_id: str,
+    lazy: bool = False,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Get single task by ID if user has access
+
+    With ``lazy=true`` the long range fields are cut to their first page, or
+    left unresolved when they are blob stored, and ``task_data_totals`` gives
+    their full length; the rest is fetched through
+    ``/tasks/{task_id}/data/{field}``.
+    """
     if not ObjectId.is_valid(task_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid task ID"
         )
-    task = await database.tasks_collection.find_one({"_id": ObjectId(task_id)})
+    projection = None
+    if lazy:
+        projection = {
+            f"task_data.{field}": {"$slice": LAZY_FIRST_PAGE} for field in RANGE_FIELDS
+        }
+    task = await find_one_with_archive("tasks", {"_id": ObjectId(task_id)}, projection)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
         )
-    # Permission: must be admin, project manager, or invited annotator
+    await _ensure_task_visible(task, current_user)
+    if lazy:
+        task["task_data_totals"] = await _range_totals(task)
+        task = await resolve_task_data(task, keep_refs=RANGE_FIELDS)
+    else:
+        task = await resolve_task_data(task)
+    return as_response(TaskResponse, task)
+
+
+async def _encode_for_storage(annotation: Any) -> Any:
+    """Pack an annotation for storage; large ones in the process pool."""
+    if should_offload(annotation):
+        return await run_in_pool(encode_annotation, annotation)
+    return encode_annotation(annotation)
+
+
+def _size_expression(value: str) -> Dict[str, Any]:
+    """Length of an array in items, or of a string in code points."""
+    return {
+        "$cond": [
+            {"$isArray": value},
+            {"$size": value},
+            {"$strLenCP": {"$ifNull": [value, ""]}},
+        ]
+    }
+
+
+async def _range_totals(task: Dict[str, Any]) -> Dict[str, int]:
+    """Full length of each range field a task has, counted server-side."""
+    refs = task.get("task_data_blobs") or {}
+    task_data = task.get("task_data") or {}
+    inline = [field for field in RANGE_FIELDS if field in task_data]
+    totals: Dict[str, int] = {}
+    if inline:
+        sizes = {field: _size_expression(f"$task_data.{field}") for field in inline}
+        pipeline = [
+            {"$match": {"_id": task["_id"]}},
+            {"$project": {"_id": 0, **sizes}},
+        ]
+        for collection in (database.tasks_collection, archive_collection("tasks")):
+            rows = await collection.aggregate(pipeline).to_list(1)
+            if rows:
+                totals.update(rows[0])
+                break
+    for field in RANGE_FIELDS:
+        if field not in refs:
+            continue
+        rows = await database.blobs_collection.aggregate(
+            [
+                {"$match": {"_id": refs[field]["sha256"]}},
+                {"$project": {"_id": 0, "total": _size_expression("$data")}},
+            ]
+        ).to_list(1)
+        if rows:
+            totals[field] = rows[0]["total"]
+    return totals
+
+
+def _range_pipeline(
+    match: Dict[str, Any], path: str, offset: int, limit: int
+) -> List[Dict[str, Any]]:
+    """Slice an array (or a string, by code points) server-side and report its size."""
+    value = f"${path}"
+    text = {"$ifNull": [value, ""]}
+    is_array = {"$isArray": value}
+    return [
+        {"$match": match},
+        {
+            "$project": {
+                "_id": 0,
+                "present": {"$ne": [{"$type": value}, "missing"]},
+                "is_array": is_array,
+                "total": _size_expression(value),
+                "items": {
+                    "$cond": [
+                        is_array,
+                        {"$slice": [value, offset, limit]},
+                        {"$substrCP": [text, offset, limit]},
+                    ]
+                },
+            }
+        },
+    ]
+
+
+@router.get(
+    "/tasks/{task_id}/data/{field}",
+    response_model=TaskDataRange,
+)
+async def get_task_data_range(
+    task_id: str,
+    field: str,
+    offset: int = 0,
+    limit: int = 50,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Read a range of a long task_data field (document paragraphs or chat messages).
+
+    List fields are sliced by item; a document stored as one string is sliced
+    by character. Only the requested range leaves the database.
+    """
+    if not ObjectId.is_valid(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid task ID"
+        )
+    if field not in RANGE_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range reads are supported for: {', '.join(RANGE_FIELDS)}",
+        )
+    offset = max(0, offset)
+    limit = max(1, min(limit, 100_000))
+
+    task = await find_one_with_archive(
+        "tasks",
+        {"_id": ObjectId(task_id)},
+        {
+            "project_id": 1,
+            "assigned_annotator_id": 1,
+            "assigned_qa_id": 1,
+            f"task_data_blobs.{field}": 1,
+        },
+    )
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    await _ensure_task_visible(task, current_user)
+
+    blob_ref = (task.get("task_data_blobs") or {}).get(field)
+    if blob_ref:
+        sources = [
+            (database.blobs_collection, {"_id": blob_ref["sha256"]}, "data"),
+        ]
+    else:
+        match = {"_id": ObjectId(task_id)}
+        sources = [
+            (database.tasks_collection, match, f"task_data.{field}"),
+            (archive_collection("tasks"), match, f"task_data.{field}"),
+        ]
+
+    result = None
+    for collection, match, path in sources:
+        rows = await collection.aggregate(
+            _range_pipeline(match, path, offset, limit)
+        ).to_list(1)
+        if rows:
+            result = rows[0]
+            break
+    if not result or not result["present"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task has no {field}",
+        )
+
+    end = offset + limit
+    return TaskDataRange(
+        field=field,
+        offset=offset,
+        limit=limit,
+        unit="items" if result["is_array"] else "characters",
+        total=result["total"],
+        items=result["items"],
+        next_offset=end if end < result["total"] else None,
+    )
+
+
+async def _ensure_task_visible(task: Dict[str, Any], current_user: UserInDB):
+    """Raise 403 unless the user is an admin, the project manager or invited."""
     project = await database.projects_collection.find_one({"_id": task["project_id"]})
-    if current_user.role == "admin":
-        return as_response(TaskResponse, task)
-    if (
+    allowed = current_user.role == "admin" or (
         current_user.role == "manager"
         and project
         and project["manager_id"] == current_user.id
-    ):
-        return as_response(TaskResponse, task)
-    if current_user.role == "annotator":
+    )
+    if not allowed and current_user.role == "annotator":
         invite = await database.invites_collection.find_one(
             {
                 "project_id": task["project_id"],
@@ -467,9 +744,11 @@ async def get_task(task_id: str, current_user: UserInDB = Depends(get_current_us
                 "accepted_status": True,
             }
         )
-        if invite:
-            return as_response(TaskResponse, task)
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+        allowed = invite is not None
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized"
+        )
 
 
 @router.put("/tasks/{task_id}/assign")
@@ -527,13 +806,13 @@ async def assign_task(
 
         # Validate that annotator belongs to project_working for this project
         pw = await database.project_working_collection.find_one(
-            {"project_id": task["project_id"]}
-        )
-        allowed_annotators = set(
-            a.get("annotator_id")
-            for a in (pw.get("annotator_assignments", []) if pw else [])
+            {
+                "project_id": task["project_id"],
+                "annotator_assignments.annotator_id": ObjectId(payload.annotator_id),
+            },
+            {"_id": 1},
         )
-        if ObjectId(payload.annotator_id) not in allowed_annotators:
+        if not pw:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Annotator is not part of this project (invite not accepted)",
@@ -628,16 +907,20 @@ async def assign_task(
         }
         await database.notifications_collection.insert_one(notification)
 
-    # If annotator was assigned, update project_working
+    # If annotator was assigned, record the open assignment
     if payload.annotator_id:
-        await database.project_working_collection.update_one(
+        await database.task_assignments_collection.update_one(
             {
-                "project_id": task["project_id"],
-                "annotator_assignments.annotator_id": ObjectId(payload.annotator_id),
+                "task_id": ObjectId(task_id),
+                "annotator_id": ObjectId(payload.annotator_id),
             },
             {
-                "$addToSet": {"annotator_assignments.$.task_ids": ObjectId(task_id)},
+                "$setOnInsert": {
+                    "project_id": task["project_id"],
+                    "assigned_at": datetime.utcnow(),
+                }
             },
+            upsert=True,
         )
 
         # Create entry in annotator_tasks_collection for time tracking
@@ -660,7 +943,7 @@ async def assign_task(
             await database.annotator_tasks_collection.insert_one(annotator_task_entry)
         else:
             # Reset completion_time if reassigning
-            await database.annotator_tasks_collection.update_one(
+            record = await database.annotator_tasks_collection.find_one_and_update(
                 {
                     "task_id": ObjectId(task_id),
                     "annotator_id": ObjectId(payload.annotator_id),
@@ -668,13 +951,45 @@ async def assign_task(
                 {
                     "$set": {
                         "completion_time": None,
-                    }
+                    },
+                    "$unset": {"sketched_time": ""},
                 },
+                projection=RECORD_PROJECTION,
             )
+            await release_record_sample(record)
 
     return {"message": "Task assignment updated"}
 
 
+async def _snap_ner_entities(
+    task: Dict[str, Any], annotation: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Validate NER entity spans against the task text and snap them to tokens."""
+    entities = annotation.get("entities") if isinstance(annotation, dict) else None
+    if not isinstance(entities, list) or not entities:
+        return annotation
+    if "text" in (task.get("task_data_blobs") or {}):
+        task = await resolve_task_data(dict(task))
+    text = (task.get("task_data") or {}).get("text")
+    if not isinstance(text, str):
+        return annotation
+
+    if task.get(TOKEN_OFFSETS_FIELD) is not None:
+        offsets = unpack_offsets(task[TOKEN_OFFSETS_FIELD])
+    else:
+        # Tasks created before offsets were stored get them on first submission
+        offsets = token_offsets(text)
+        await database.tasks_collection.update_one(
+            {"_id": task["_id"]},
+            {"$set": {TOKEN_OFFSETS_FIELD: pack_offsets(offsets)}},
+        )
+    try:
+        entities = snap_entities(text, offsets, entities)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {**annotation, "entities": entities}
+
+
 @router.put("/tasks/{task_id}/annotation")
 async def submit_annotation(
     task_id: str,
@@ -760,17 +1075,60 @@ async def submit_annotation(
             # Store as-is without strict validation to avoid blocking annotators
             annotation_dict = payload.annotation
 
+    # Flip, clamp and deduplicate-check detection boxes before storing them
+    box_checks = None
+    if category == TaskCategory.OBJECT_DETECTION:
+        annotation_dict, box_checks = normalize_detection_annotation(annotation_dict)
+    elif category == TaskCategory.NER:
+        annotation_dict = await _snap_ner_entities(task, annotation_dict)
+
     completed_at = datetime.utcnow()
+    # The timer reports the task's running total; roll up only the new part
+    reported_seconds = payload.completion_time or 0
+    rolled_seconds = (task.get("rolled_up_seconds") or {}).get("annotation", 0)
     updates = {
-        "annotation": annotation_dict,
+        "annotation": await _encode_for_storage(annotation_dict),
         "completed_status.annotator_part": True,
         "annotator_completed_at": completed_at,
         "is_returned": False,  # Clear returned status when resubmitted
+        "rolled_up_seconds.annotation": max(reported_seconds, rolled_seconds),
     }
-
-    await database.tasks_collection.update_one(
-        {"_id": ObjectId(task_id)}, {"$set": updates}
-    )
+    if category == TaskCategory.CHATBOT_MODEL_ASSESSMENT:
+        updates[FLAGS_FIELD] = flag_bits(annotation_dict)
+    elif category == TaskCategory.RESPONSE_SELECTION:
+        # Counted before the task write, which invalidates cached rankings
+        await record_selection(task, annotation_dict)
+
+    before = await update_task_with_counters(ObjectId(task_id), sparse_update(updates))
+    if before is not None and category.value in JUDGMENT_FIELDS:
+        # The assigned annotator's label is one of the task's judgments
+        annotator_id = task.get("assigned_annotator_id") or current_user.id
+        label = judgment_label(category, annotation_dict)
+        if label is None:
+            await remove_judgment(task["_id"], annotator_id)
+        else:
+            project = await database.projects_collection.find_one(
+                {"_id": task["project_id"]}, {"redundancy": 1}
+            )
+            # Extra annotators leave this slot free (see open_slot_filter)
+            await record_judgment(
+                task,
+                annotator_id,
+                label,
+                limit=(project or {}).get("redundancy", 1),
+            )
+    if before is not None:
+        already_submitted = (before.get("completed_status") or {}).get("annotator_part")
+        await record_activity(
+            task["project_id"],
+            task.get("assigned_annotator_id") or current_user.id,
+            completed_at,
+            annotations_submitted=0 if already_submitted else 1,
+            annotation_seconds=max(0, reported_seconds - rolled_seconds),
+        )
+        await invalidate_work_stats(
+            task.get("assigned_annotator_id") or current_user.id
+        )
 
     # Send notification to project manager when task is completed
     project = await database.projects_collection.find_one({"_id": task["project_id"]})
@@ -811,14 +1169,13 @@ async def submit_annotation(
         }
         await database.notifications_collection.insert_one(notification)
 
-    # After submission: remove this task from project_working assigned task list
+    # After submission: close this task's open assignment for the annotator
     if task.get("assigned_annotator_id"):
-        await database.project_working_collection.update_one(
+        await database.task_assignments_collection.delete_one(
             {
-                "project_id": task["project_id"],
-                "annotator_assignments.annotator_id": task["assigned_annotator_id"],
-            },
-            {"$pull": {"annotator_assignments.$.task_ids": ObjectId(task_id)}},
+                "task_id": ObjectId(task_id),
+                "annotator_id": task["assigned_annotator_id"],
+            }
         )
 
         # Update annotator_tasks_collection with completion time
@@ -826,7 +1183,9 @@ async def submit_annotation(
         accumulated_time = task.get("accumulated_time", 0) or 0
         total_time = accumulated_time + completion_time
 
-        await database.annotator_tasks_collection.update_one(
+        # The completion time also replaces this record's sample in the
+        # project and annotator completion time sketches
+        record = await database.annotator_tasks_collection.find_one_and_update(
             {
                 "task_id": ObjectId(task_id),
                 "annotator_id": task["assigned_annotator_id"],
@@ -834,11 +1193,21 @@ async def submit_annotation(
             {
                 "$set": {
                     "completion_time": total_time,
+                    "sketched_time": total_time,
                 }
             },
+            projection=RECORD_PROJECTION,
         )
+        if record is not None:
+            await release_record_sample(record)
+            await add_completion_time(
+                task["project_id"], task["assigned_annotator_id"], total_time
+            )
 
-    return {"message": "Annotation submitted"}
+    response: Dict[str, Any] = {"message": "Annotation submitted"}
+    if box_checks:
+        response["box_checks"] = box_checks
+    return response
 
 
 @router.put("/tasks/{task_id}/qa")
@@ -880,20 +1249,36 @@ async def submit_qa(
             detail="Not authorized to submit QA for this task",
         )
 
+    qa_completed_at = datetime.utcnow()
     updates = {
-        "qa_annotation": payload.qa_annotation,
+        "qa_annotation": await _encode_for_storage(payload.qa_annotation),
         "qa_feedback": payload.qa_feedback,
         "completed_status.qa_part": True,
-        "qa_completed_at": datetime.utcnow(),
+        "qa_completed_at": qa_completed_at,
     }
 
     # Save QA time spent if provided
     if payload.qa_time_spent is not None:
         updates["qa_accumulated_time"] = payload.qa_time_spent
 
-    await database.tasks_collection.update_one(
-        {"_id": ObjectId(task_id)}, {"$set": updates}
+    # Like the annotation timer, the QA timer reports a running total
+    reported_seconds = updates.get(
+        "qa_accumulated_time", task.get("qa_accumulated_time") or 0
     )
+    rolled_seconds = (task.get("rolled_up_seconds") or {}).get("qa", 0)
+    updates["rolled_up_seconds.qa"] = max(reported_seconds, rolled_seconds)
+
+    before = await update_task_with_counters(ObjectId(task_id), sparse_update(updates))
+    if before is not None:
+        already_done = (before.get("completed_status") or {}).get("qa_part")
+        await record_activity(
+            task["project_id"],
+            task.get("assigned_qa_id") or current_user.id,
+            qa_completed_at,
+            qa_completed=0 if already_done else 1,
+            qa_seconds=max(0, reported_seconds - rolled_seconds),
+        )
+        await invalidate_work_stats(task.get("assigned_qa_id") or current_user.id)
 
     # Send notifications when QA is completed
     project = await database.projects_collection.find_one({"_id": task["project_id"]})
@@ -1072,10 +1457,18 @@ async def return_task_to_annotator(
         "annotator_completed_at": None,
     }
 
-    await database.tasks_collection.update_one(
-        {"_id": ObjectId(task_id)},
-        {"$set": updates, "$push": {"remarks": remark_entry.model_dump(by_alias=True)}},
+    await insert_remark(ObjectId(task_id), task["project_id"], remark_entry)
+    await update_task_with_counters(
+        ObjectId(task_id),
+        {**sparse_update(updates), **remark_task_update(remark_entry)},
+    )
+    await record_activity(
+        task["project_id"],
+        task.get("assigned_annotator_id"),
+        remark_entry.created_at,
+        returns=1,
     )
+    await invalidate_work_stats(task.get("assigned_annotator_id"))
 
     # Send notification to annotator when task is returned
     if task.get("assigned_annotator_id"):
@@ -1098,20 +1491,24 @@ async def return_task_to_annotator(
         }
         await database.notifications_collection.insert_one(notification)
 
-    # Add task back to project_working for the annotator
+    # Reopen the task's assignment for the annotator
     if task.get("assigned_annotator_id"):
-        await database.project_working_collection.update_one(
+        await database.task_assignments_collection.update_one(
             {
-                "project_id": task["project_id"],
-                "annotator_assignments.annotator_id": task["assigned_annotator_id"],
+                "task_id": ObjectId(task_id),
+                "annotator_id": task["assigned_annotator_id"],
             },
             {
-                "$addToSet": {"annotator_assignments.$.task_ids": ObjectId(task_id)},
+                "$setOnInsert": {
+                    "project_id": task["project_id"],
+                    "assigned_at": datetime.utcnow(),
+                }
             },
+            upsert=True,
         )
 
         # Reset completion time in annotator_tasks_collection
-        await database.annotator_tasks_collection.update_one(
+        record = await database.annotator_tasks_collection.find_one_and_update(
             {
                 "task_id": ObjectId(task_id),
                 "annotator_id": task["assigned_annotator_id"],
@@ -1119,9 +1516,12 @@ async def return_task_to_annotator(
             {
                 "$set": {
                     "completion_time": None,
-                }
+                },
+                "$unset": {"sketched_time": ""},
             },
+            projection=RECORD_PROJECTION,
         )
+        await release_record_sample(record)
 
     return {"message": "Task returned to annotator"}
 
@@ -1199,14 +1599,101 @@ async def add_task_remark(
         created_at=datetime.utcnow(),
     )
 
+    await insert_remark(ObjectId(task_id), task["project_id"], remark)
     await database.tasks_collection.update_one(
-        {"_id": ObjectId(task_id)},
-        {"$push": {"remarks": remark.model_dump(by_alias=True)}},
+        {"_id": ObjectId(task_id)}, remark_task_update(remark)
     )
 
     return remark
 
 
+@router.get(
+    "/tasks/{task_id}/remarks",
+    response_model=TaskRemarkPage,
+    response_model_by_alias=False,
+)
+async def get_task_remarks(
+    task_id: str,
+    limit: int = 50,
+    after: Optional[str] = None,
+    current_user: UserInDB = Depends(get_current_user),
+):
+    """Get a page of a task's remark thread in chronological order."""
+    if not ObjectId.is_valid(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid task ID"
+        )
+    if after is not None and not ObjectId.is_valid(after):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    limit = max(1, min(limit, 200))
+
+    projection = {
+        "project_id": 1,
+        "assigned_annotator_id": 1,
+        "assigned_qa_id": 1,
+        "remarks": 1,
+        "remark_count": 1,
+    }
+    remarks_collection = database.task_remarks_collection
+    task = await database.tasks_collection.find_one(
+        {"_id": ObjectId(task_id)}, projection
+    )
+    if not task:
+        # Tasks of archived projects are read from the archive tier
+        task = await archive_collection("tasks").find_one(
+            {"_id": ObjectId(task_id)}, projection
+        )
+        remarks_collection = archive_collection("task_remarks")
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+
+    project = await database.projects_collection.find_one({"_id": task["project_id"]})
+
+    allowed = False
+    if current_user.role == "admin":
+        allowed = True
+    elif current_user.role == "manager":
+        allowed = project and project.get("manager_id") == current_user.id
+    elif current_user.role == "annotator":
+        allowed = current_user.id in [
+            task.get("assigned_annotator_id"),
+            task.get("assigned_qa_id"),
+        ]
+
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view remarks for this task",
+        )
+
+    # Online migration: move a legacy embedded thread on first read
+    total = task.get("remark_count", 0)
+    if "remarks" in task and remarks_collection is database.task_remarks_collection:
+        total += await migrate_embedded_remarks(task)
+
+    try:
+        remarks = await list_remarks(
+            ObjectId(task_id),
+            limit,
+            ObjectId(after) if after else None,
+            collection=remarks_collection,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown cursor"
+        )
+    next_cursor = str(remarks[-1]["_id"]) if len(remarks) == limit else None
+    return TaskRemarkPage(
+        remarks=[as_response(TaskRemarkResponse, r) for r in remarks],
+        next_cursor=next_cursor,
+        total=total,
+    )
+
+
 @router.delete("/tasks/{task_id}")
 async def delete_task(task_id: str, current_user: UserInDB = Depends(get_current_user)):
     """Delete a task (manager only, cannot delete assigned tasks)"""
@@ -1242,19 +1729,23 @@ async def delete_task(task_id: str, current_user: UserInDB = Depends(get_current
             detail="Cannot delete assigned task. Please unassign the task first.",
         )
 
-    # Remove task from project_working assignments
-    await database.project_working_collection.update_many(
-        {"project_id": task["project_id"]},
-        {"$pull": {"annotator_assignments.$[].task_ids": ObjectId(task_id)}},
+    # Remove the task's open assignments
+    await database.task_assignments_collection.delete_many(
+        {"task_id": ObjectId(task_id)}
     )
 
-    # Delete related annotator_tasks records
+    # Delete related annotator_tasks records, remarks and judgments
     await database.annotator_tasks_collection.delete_many(
         {"task_id": ObjectId(task_id)}
     )
+    await database.task_remarks_collection.delete_many({"task_id": ObjectId(task_id)})
+    await delete_task_judgments(ObjectId(task_id), task["project_id"])
 
-    # Delete the task
-    await database.tasks_collection.delete_one({"_id": ObjectId(task_id)})
+    # Delete the task and drop it from the project counters
+    result = await database.tasks_collection.delete_one({"_id": ObjectId(task_id)})
+    if result.deleted_count:
+        await apply_task_transition(task["project_id"], task, None)
+        await release_task_blobs(task)
 
     return {"message": "Task deleted successfully"}
 
@@ -1293,6 +1784,7 @@ async def unassign_task(
         "assigned_annotator_id": None,
         "assigned_qa_id": None,
         "annotation": None,
+        FLAGS_FIELD: None,
         "qa_annotation": None,
         "qa_feedback": None,
         "completed_status": {"annotator_part": False, "qa_part": False},
@@ -1301,23 +1793,36 @@ async def unassign_task(
         "annotator_completed_at": None,
         "qa_started_at": None,
         "qa_completed_at": None,
+        # New assignees start their timers from zero
+        "rolled_up_seconds": None,
     }
 
+    if task.get("category") == TaskCategory.RESPONSE_SELECTION:
+        await release_selection(task)
+    await remove_judgment(task["_id"], task.get("assigned_annotator_id"))
+
     # Update the task
-    await database.tasks_collection.update_one(
-        {"_id": ObjectId(task_id)}, {"$set": update}
+    await update_task_with_counters(ObjectId(task_id), sparse_update(update))
+    await invalidate_work_stats(
+        task.get("assigned_annotator_id"), task.get("assigned_qa_id")
     )
 
-    # Remove task from project_working assignments
-    await database.project_working_collection.update_many(
-        {"project_id": task["project_id"]},
-        {"$pull": {"annotator_assignments.$[].task_ids": ObjectId(task_id)}},
+    # Remove the task's open assignments
+    await database.task_assignments_collection.delete_many(
+        {"task_id": ObjectId(task_id)}
     )
 
-    # Delete related annotator_tasks records
+    # Delete related annotator_tasks records, dropping their completion times
+    # from the sketches
+    records = await database.annotator_tasks_collection.find(
+        {"task_id": ObjectId(task_id), "sketched_time": {"$exists": True}},
+        RECORD_PROJECTION,
+    ).to_list(None)
     await database.annotator_tasks_collection.delete_many(
         {"task_id": ObjectId(task_id)}
     )
+    for record in records:
+        await release_record_sample(record)
 
     return {"message": "Task unassigned successfully"}
 
@@ -1362,24 +1867,24 @@ async def skip_task(
     update = {
         "assigned_annotator_id": None,
         "annotation": None,
+        FLAGS_FIELD: None,
         "completed_status.annotator_part": False,
         "is_returned": False,
         "annotator_started_at": None,
         "annotator_completed_at": None,
         "accumulated_time": None,
+        "rolled_up_seconds.annotation": None,
     }
 
-    await database.tasks_collection.update_one(
-        {"_id": ObjectId(task_id)}, {"$set": update}
-    )
+    if task.get("category") == TaskCategory.RESPONSE_SELECTION:
+        await release_selection(task)
+    await remove_judgment(task["_id"], current_user.id)
+    await update_task_with_counters(ObjectId(task_id), sparse_update(update))
+    await invalidate_work_stats(current_user.id)
 
-    # Remove task from project_working assignments for this annotator
-    await database.project_working_collection.update_one(
-        {
-            "project_id": task["project_id"],
-            "annotator_assignments.annotator_id": current_user.id,
-        },
-        {"$pull": {"annotator_assignments.$.task_ids": ObjectId(task_id)}},
+    # Remove the task's open assignment for this annotator
+    await database.task_assignments_collection.delete_one(
+        {"task_id": ObjectId(task_id), "annotator_id": current_user.id}
     )
 
     # Delete related annotator_tasks records for this annotator
@@ -1392,9 +1897,16 @@ async def skip_task(
 @router.get("/annotators/my-task-history")
 async def get_my_task_history(
     project_id: str = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
     current_user: UserInDB = Depends(get_current_user),
 ):
-    """Get task completion history for the current annotator"""
+    """Get task completion history for the current annotator
+
+    Newest assignments first, ``limit`` records per page; pass ``next_cursor``
+    back as ``cursor`` for the next page. Summary totals are computed on the
+    first page only.
+    """
     if current_user.role != "annotator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1408,17 +1920,41 @@ async def get_my_task_history(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid project ID"
             )
         query["project_id"] = ObjectId(project_id)
+    if cursor is not None and not ObjectId.is_valid(cursor):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    limit = max(1, min(limit, 500))
 
-    cursor = database.annotator_tasks_collection.find(query)
-    task_records = await cursor.to_list(length=None)
+    # Records of archived projects live in the archive tier
+    task_records, next_cursor = await find_page_with_archive(
+        "annotator_tasks",
+        query,
+        limit,
+        before_id=ObjectId(cursor) if cursor else None,
+        projection={"task_id": 1, "project_id": 1, "completion_time": 1},
+    )
+
+    # One batched lookup per collection for the whole page
+    task_ids = list({record["task_id"] for record in task_records})
+    project_ids = list({record["project_id"] for record in task_records})
+    tasks = {
+        task["_id"]: task
+        for task in await find_with_archive(
+            "tasks", {"_id": {"$in": task_ids}}, {"category": 1}
+        )
+    }
+    projects = {
+        project["_id"]: project
+        async for project in database.projects_collection.find(
+            {"_id": {"$in": project_ids}}, {"name": 1}
+        )
+    }
 
     history = []
     for record in task_records:
-        # Fetch task details
-        task = await database.tasks_collection.find_one({"_id": record["task_id"]})
-        project = await database.projects_collection.find_one(
-            {"_id": record["project_id"]}
-        )
+        task = tasks.get(record["task_id"])
+        project = projects.get(record["project_id"])
 
         completion_time = record.get("completion_time")
         is_completed = completion_time is not None
@@ -1439,10 +1975,15 @@ async def get_my_task_history(
             }
         )
 
-    return {
+    response = {
         "annotator_id": str(current_user.id),
         "annotator_name": current_user.name,
-        "total_tasks": len(history),
-        "completed_tasks": sum(1 for h in history if h["status"] == "Completed"),
         "history": history,
+        "next_cursor": str(next_cursor) if next_cursor else None,
     }
+    if cursor is None:
+        response["total_tasks"] = await count_with_archive("annotator_tasks", query)
+        response["completed_tasks"] = await count_with_archive(
+            "annotator_tasks", {**query, "completion_time": {"$type": "number"}}
+        )
+    return response
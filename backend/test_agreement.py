@@ -0,0 +1,94 @@
+"""Tests for the vectorized annotator-vs-QA agreement metrics."""
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics.agreement import (  # noqa: E402
+    confusion_matrices,
+    encode_labels,
+    flag_agreement,
+    kappa,
+    label_agreement,
+)
+
+
+def _reference_kappa(pairs, categories, weighting=None):
+    """Textbook (weighted) kappa computed with plain loops."""
+    k = len(categories)
+    n = len(pairs)
+
+    def weight(i, j):
+        if weighting is None:
+            return 1.0 if i == j else 0.0
+        distance = abs(i - j) / (k - 1)
+        return 1 - distance if weighting == "linear" else 1 - distance**2
+
+    index = {label: i for i, label in enumerate(categories)}
+    observed = sum(weight(index[a], index[b]) for a, b in pairs) / n
+    a_share = [sum(a == c for a, _ in pairs) / n for c in categories]
+    b_share = [sum(b == c for _, b in pairs) / n for c in categories]
+    expected = sum(
+        weight(i, j) * a_share[i] * b_share[j] for i in range(k) for j in range(k)
+    )
+    return (observed - expected) / (1 - expected)
+
+
+def test_textbook_kappa():
+    # 20 yes/yes, 5 yes/no, 10 no/yes, 15 no/no
+    _, observed, expected, result = kappa(np.array([[20, 5], [10, 15]]))
+    assert observed[0] == pytest.approx(0.7)
+    assert expected[0] == pytest.approx(0.5)
+    assert result[0] == pytest.approx(0.4)
+
+
+@pytest.mark.parametrize("weighting", [None, "linear", "quadratic"])
+def test_grouped_kappa_matches_reference(weighting):
+    rng = random.Random(0)
+    categories = [1, 2, 3, 4, 5]
+    rows = []
+    for _ in range(3000):
+        a = rng.choice(categories)
+        q = min(5, max(1, a + rng.choice([-1, 0, 0, 0, 1])))
+        rows.append((rng.randrange(4), a, q))
+
+    vocab, a_codes, q_codes, valid = encode_labels(
+        [a for _, a, _ in rows], [q for _, _, q in rows], categories
+    )
+    assert vocab == categories and valid.all()
+    groups = np.array([g for g, _, _ in rows])
+    matrices = confusion_matrices(groups, a_codes, q_codes, 4, len(vocab))
+    _, _, _, grouped = kappa(matrices, weighting)
+    for group in range(4):
+        pairs = [(a, q) for g, a, q in rows if g == group]
+        expected = _reference_kappa(pairs, categories, weighting)
+        assert grouped[group] == pytest.approx(expected)
+
+
+def test_encode_labels_marks_unknown_categories():
+    vocab, a_codes, q_codes, valid = encode_labels([1, 9, 3], [1, 2, 3], range(1, 4))
+    assert vocab == [1, 2, 3]
+    assert valid.tolist() == [True, False, True]
+    assert a_codes[valid].tolist() == [0, 2]
+
+
+def test_label_and_flag_agreement():
+    vocab, a_codes, q_codes, _ = encode_labels(
+        ["cat", "dog", "cat"], ["cat", "cat", "cat"]
+    )
+    matrix = confusion_matrices(np.zeros(3, int), a_codes, q_codes, 1, len(vocab))[0]
+    annotator_count, qa_count, _, specific = label_agreement(matrix)
+    assert vocab == ["cat", "dog"]
+    assert annotator_count.tolist() == [2, 1]
+    assert qa_count.tolist() == [3, 0]
+    assert specific[0] == pytest.approx(0.8)
+    assert specific[1] == 0
+
+    annotator = np.array([[1, 0], [1, np.nan], [0, 0]])
+    qa = np.array([[1, 1], [0, 0], [0, 0]])
+    n, observed, _, _ = flag_agreement(annotator, qa)
+    assert n.tolist() == [3, 2]
+    assert observed[0] == pytest.approx(2 / 3)
+    assert observed[1] == pytest.approx(0.5)
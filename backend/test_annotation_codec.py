@@ -0,0 +1,111 @@
+"""Round-trip tests for the columnar annotation codec."""
+
+import json
+import random
+
+from annotation_codec import (
+    MIN_ITEMS,
+    OFFLOAD_ITEMS,
+    decode_annotation,
+    encode_annotation,
+    is_packed,
+    should_offload,
+)
+
+
+def _shapes(n, seed=0):
+    rng = random.Random(seed)
+    shapes = []
+    for i in range(n):
+        shape = {
+            "id": f"shape-{i}",
+            "type": "polygon" if i % 3 == 0 else "bbox",
+            "label": rng.choice(["car", "person", "bus"]),
+            "confidence": rng.randint(1, 5),
+        }
+        if shape["type"] == "polygon":
+            shape["points"] = [
+                {"x": round(rng.uniform(0, 100), 1), "y": round(rng.uniform(0, 100), 1)}
+                for _ in range(rng.randint(3, 8))
+            ]
+        else:
+            shape.update(
+                x=round(rng.uniform(0, 90), 2),
+                y=round(rng.uniform(0, 90), 2),
+                width=round(rng.uniform(1, 10), 2),
+                height=round(rng.uniform(1, 10), 2),
+            )
+        if i % 5 == 0:
+            shape["bounds"] = {"x": 1.5, "y": 2.25, "width": 10, "height": None}
+        shapes.append(shape)
+    return shapes
+
+
+def test_object_detection_round_trip():
+    annotation = {"annotations": _shapes(500), "image_url": "img.jpg", "notes": None}
+    encoded = encode_annotation(annotation)
+    assert is_packed(encoded["annotations"])
+    assert encoded["image_url"] == "img.jpg"
+    assert decode_annotation(encoded) == annotation
+
+
+def test_ner_round_trip():
+    entities = [
+        {
+            "entity": f"word{i}",
+            "type": "PERSON" if i % 2 else "ORG",
+            "start": i * 10,
+            "end": i * 10 + 5,
+        }
+        for i in range(200)
+    ]
+    encoded = encode_annotation({"entities": entities})
+    assert is_packed(encoded["entities"])
+    assert decode_annotation(encoded) == {"entities": entities}
+
+
+def test_small_and_irregular_lists_are_left_alone():
+    small = {"annotations": _shapes(MIN_ITEMS - 1)}
+    assert encode_annotation(small) == small
+
+    mixed = {"entities": [{"a": 1}] * MIN_ITEMS + ["not a dict"]}
+    assert encode_annotation(mixed) == mixed
+
+    assert decode_annotation(None) is None
+    assert decode_annotation({"rating": 4}) == {"rating": 4}
+
+
+def test_round_trip_is_exact():
+    shapes = [
+        {
+            "x": i,
+            "y": 0.1 + 0.2,
+            "width": 123456.789 if i % 2 else 2 ** 40 + i,
+            "score": 0.5 if i % 2 else 1,
+            "points": [{"x": i, "y": 1.25}, {"x": 2.5, "y": 1 / 3}],
+        }
+        for i in range(MIN_ITEMS * 2)
+    ]
+    encoded = encode_annotation({"annotations": shapes})
+    assert is_packed(encoded["annotations"])
+    # json.dumps tells 10 from 10.0 and shows every digit kept
+    decoded = decode_annotation(encoded)["annotations"]
+    assert json.dumps(decoded) == json.dumps(shapes)
+
+
+def test_column_width_follows_values():
+    shapes = [
+        {"x": i * 0.5, "y": 1 / 3, "w": i}
+        for i in range(MIN_ITEMS * 2)
+    ]
+    encoded = encode_annotation({"annotations": shapes})
+    types = {c["k"]: c["t"] for c in encoded["annotations"]["cols"]}
+    assert types == {"x": "f4", "y": "f8", "w": "i4"}
+    decoded = decode_annotation(encoded)["annotations"]
+    assert json.dumps(decoded) == json.dumps(shapes)
+
+
+def test_offload_threshold():
+    assert not should_offload({"annotations": [{}] * (OFFLOAD_ITEMS - 1)})
+    assert should_offload({"entities": [{}] * OFFLOAD_ITEMS})
+    assert not should_offload(None)
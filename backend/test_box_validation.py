@@ -0,0 +1,115 @@
+"""Tests for detection box normalization and near-duplicate detection."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics.detection import pairwise_iou  # noqa: E402
+from box_validation import (  # noqa: E402
+    _benchmark_boxes,
+    near_duplicates,
+    normalize_detection_annotation,
+)
+
+
+def _box(label, x, y, width, height):
+    return dict(type="bbox", label=label, x=x, y=y, width=width, height=height)
+
+
+def test_flip_clamp_and_drop():
+    annotation = {
+        "annotations": [
+            _box("car", 10, 10, 5, 5),
+            _box("car", 20, 20, -5, -4),  # drawn from the bottom-right
+            _box("car", 98, -2, 5, 5),  # hangs off the image
+            _box("car", 101, 50, 3, 3),  # entirely outside
+            _box("car", 30, 30, 0, 5),  # no area
+            {"type": "polygon", "label": "car", "points": []},
+        ],
+        "notes": "kept",
+    }
+    normalized, reports = normalize_detection_annotation(annotation)
+    items = normalized["annotations"]
+    assert normalized["notes"] == "kept"
+    assert len(items) == 4
+    assert items[0] is annotation["annotations"][0]
+    assert (items[1]["x"], items[1]["y"]) == (15, 16)
+    assert (items[1]["width"], items[1]["height"]) == (5, 4)
+    assert (items[2]["x"], items[2]["y"], items[2]["width"]) == (98, 0, 2)
+    assert items[2]["height"] == 3
+    assert items[3]["type"] == "polygon"
+    assert reports["annotations"] == {
+        "boxes": 5,
+        "clamped": 1,
+        "dropped": 2,
+        "near_duplicates": [],
+    }
+
+
+def test_legacy_objects_keep_their_convention():
+    annotation = {"objects": [{"class": "car", "bbox": [50, 50, -10, 10]}]}
+    normalized, _ = normalize_detection_annotation(annotation)
+    assert normalized["objects"] == [{"class": "car", "bbox": [40, 50, 10, 10]}]
+
+
+def test_irregular_lists_match_the_column_path():
+    boxes = _benchmark_boxes(300, seed=1)
+    _, expected = normalize_detection_annotation({"annotations": boxes})
+    # A non-box item and a box without coordinates force the per-item path
+    irregular = boxes + ["note", _box("car", None, 1, 2, 3)]
+    normalized, reports = normalize_detection_annotation({"annotations": irregular})
+    assert reports["annotations"] == expected["annotations"]
+    assert normalized["annotations"][-2:] == irregular[-2:]
+
+
+def test_labels_fall_back_to_class():
+    annotation = {
+        "bounding_boxes": [
+            {"class": "car", "x": 10, "y": 10, "width": 10, "height": 10},
+            {"label": "car", "x": 10.1, "y": 10, "width": 10, "height": 10},
+            {"label": 7, "x": 10, "y": 10, "width": 10, "height": 10},
+            {"label": "7", "x": 10.1, "y": 10, "width": 10, "height": 10},
+        ]
+    }
+    _, reports = normalize_detection_annotation(annotation)
+    assert reports["bounding_boxes"]["near_duplicates"] == [[0, 1], [2, 3]]
+
+
+def test_near_duplicate_positions_skip_dropped_boxes():
+    annotation = {
+        "bounding_boxes": [
+            _box("car", 10, 10, 0, 0),
+            _box("car", 10, 10, 10, 10),
+            _box("bus", 10.1, 10, 10, 10),
+            _box("car", 10.1, 10, 10, 10),
+        ]
+    }
+    _, reports = normalize_detection_annotation(annotation)
+    assert reports["bounding_boxes"]["near_duplicates"] == [[0, 2]]
+
+
+def test_near_duplicates_match_brute_force():
+    rng = np.random.default_rng(0)
+    corners_list, labels_list = [], []
+    for _ in range(400):
+        x, y = rng.uniform(0, 90, 2)
+        w, h = rng.uniform(0.5, 8, 2)
+        corners_list.append([x, y, x + w, y + h])
+        labels_list.append(rng.integers(0, 3))
+        if rng.random() < 0.2:
+            dx, dy = rng.uniform(-0.3, 0.3, 2)
+            corners_list.append([x + dx, y + dy, x + w + dx, y + h + dy])
+            labels_list.append(labels_list[-1])
+    corners = np.array(corners_list)
+    labels = np.array(labels_list)
+
+    iou = pairwise_iou(corners, corners)
+    expected = [
+        [i, j]
+        for i in range(len(corners))
+        for j in range(i + 1, len(corners))
+        if labels[i] == labels[j] and iou[i, j] >= 0.9
+    ]
+    assert expected
+    assert near_duplicates(corners, labels).tolist() == expected
+
@@ -0,0 +1,81 @@
+"""Tests for the Bradley–Terry ranking of response selection candidates."""
+
+import itertools
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics.bradley_terry import (  # noqa: E402
+    ELO_BASE,
+    elo,
+    fit_bradley_terry,
+    standard_errors,
+)
+
+
+def _expected_counts(log_strength, comparisons=1000):
+    """Win counts every pair would show on average under the model."""
+    winners, losers, counts = [], [], []
+    for i, j in itertools.combinations(range(len(log_strength)), 2):
+        p = 1 / (1 + np.exp(log_strength[j] - log_strength[i]))
+        winners += [i, j]
+        losers += [j, i]
+        counts += [comparisons * p, comparisons * (1 - p)]
+    return np.array(winners), np.array(losers), np.array(counts)
+
+
+def test_recovers_strengths():
+    truth = np.array([0.0, 0.5, -1.0, 1.5, 0.2])
+    winners, losers, counts = _expected_counts(truth)
+    fitted, _ = fit_bradley_terry(winners, losers, counts, len(truth), prior=0)
+    # Without the reference the scale is free; compare differences
+    assert np.allclose(fitted - fitted[0], truth - truth[0], atol=1e-6)
+
+
+def test_prior_keeps_unbeaten_candidates_finite():
+    # a beats b 5 times, b never wins; c is compared with nobody
+    fitted, _ = fit_bradley_terry(np.array([0]), np.array([1]), np.array([5]), 3)
+    assert np.isfinite(fitted).all()
+    assert fitted[0] > 0 > fitted[1]
+    assert fitted[2] == pytest.approx(0)
+    assert elo(fitted)[2] == pytest.approx(ELO_BASE)
+
+
+def test_warm_start_converges_faster_to_the_same_fit():
+    truth = np.linspace(-1, 1, 8)
+    winners, losers, counts = _expected_counts(truth, 50)
+    cold, cold_iterations = fit_bradley_terry(winners, losers, counts, 8)
+    # A few more judgments arrive
+    counts = counts.copy()
+    counts[:3] += 1
+    refit, _ = fit_bradley_terry(winners, losers, counts, 8)
+    warm, warm_iterations = fit_bradley_terry(winners, losers, counts, 8, cold)
+    assert np.allclose(warm, refit, atol=1e-6)
+    assert warm_iterations < cold_iterations
+
+
+def test_standard_errors_shrink_with_more_judgments():
+    truth = np.array([0.0, 0.4, -0.4])
+    few = _expected_counts(truth, 10)
+    many = _expected_counts(truth, 1000)
+    errors_few = standard_errors(fit_bradley_terry(*few, 3)[0], *few)
+    errors_many = standard_errors(fit_bradley_terry(*many, 3)[0], *many)
+    assert (errors_many < errors_few).all()
+    assert (errors_many > 0).all()
+
+
+def test_selection_pairs():
+    pytest.importorskip("motor")
+    from preferences import pair_updates, selection_pairs
+
+    task_data = {
+        "response_options": ["x", "y", "z"],
+        "response_models": ["a", "b", "a"],
+    }
+    assert selection_pairs(task_data, {"selected_response": 2}) == [["b", "a"]]
+    assert selection_pairs(task_data, {"selected_response": 1}) == [["a", "b"]]
+    assert selection_pairs(task_data, {"selected_response": 4}) == []
+    assert selection_pairs({"response_options": ["x"]}, {"selected_response": 1}) == []
+    # Resubmitting the same selection changes nothing
+    assert pair_updates("p", [["a", "b"]], [["a", "b"]]) == []
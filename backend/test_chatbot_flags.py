@@ -0,0 +1,86 @@
+"""Tests for chatbot assessment flag bitmasks and their vectorized statistics."""
+
+import random
+
+import pytest
+
+from chatbot_flags import FLAG_NAMES, flag_bits, flag_names, flags_filter, flags_mask
+
+np = pytest.importorskip("numpy")
+
+from analytics.flags import (  # noqa: E402
+    bit_matrix,
+    flag_histograms,
+    flag_statistics,
+    rates,
+)
+
+
+def _annotation(*flagged):
+    return {"likert_scale": 4, **{name: name in flagged for name in FLAG_NAMES}}
+
+
+def test_flag_bits_round_trip():
+    annotation = _annotation("hallucination", "gives_harmful_advice")
+    bits = flag_bits(annotation)
+    assert bits == 1 << 2 | 1 << 8
+    assert flag_names(bits) == ["hallucination", "gives_harmful_advice"]
+    assert flag_bits(_annotation()) == 0
+
+
+def test_flag_bits_without_flags():
+    assert flag_bits(None) is None
+    assert flag_bits({"likert_scale": 3}) is None
+    # Only real booleans count
+    assert flag_bits({"hallucination": "yes", "contains_violent": True}) == 1 << 5
+
+
+def test_flags_filter():
+    assert flags_filter(["hallucination", "gives_harmful_advice"]) == {
+        "flag_bits": {"$exists": True, "$bitsAllSet": 260}
+    }
+    assert flags_filter(none_of=["satisfies_constraint"]) == {
+        "flag_bits": {"$exists": True, "$bitsAllClear": 8}
+    }
+    assert flags_filter() == {"flag_bits": {"$exists": True}}
+    with pytest.raises(ValueError):
+        flags_mask(["likert_scale"])
+
+
+def test_bit_matrix():
+    bits = bit_matrix(3)
+    assert bits.shape == (8, 3)
+    assert bits[5].tolist() == [1, 0, 1]
+
+
+def test_statistics_match_loops():
+    rng = random.Random(3)
+    n_flags = len(FLAG_NAMES)
+    tasks = [
+        (rng.randrange(4), [rng.random() < 0.2 for _ in range(n_flags)])
+        for _ in range(2000)
+    ]
+    # Collapse into (group, bitmask) -> count rows as the $group stage does
+    rows = {}
+    for group, flags in tasks:
+        bits = flag_bits(dict(zip(FLAG_NAMES, flags)))
+        rows[group, bits] = rows.get((group, bits), 0) + 1
+    groups, bits = (np.array(column) for column in zip(*rows))
+    counts = np.array(list(rows.values()), dtype=float)
+
+    histograms = flag_histograms(groups, bits, counts, 4, n_flags)
+    totals, flag_counts, cooccurrence = flag_statistics(histograms, n_flags)
+    for group in range(4):
+        members = [flags for g, flags in tasks if g == group]
+        assert totals[group] == len(members)
+        for i in range(n_flags):
+            assert flag_counts[group, i] == sum(flags[i] for flags in members)
+            for j in range(n_flags):
+                expected = sum(flags[i] and flags[j] for flags in members)
+                assert cooccurrence[group, i, j] == expected
+    assert np.allclose(rates(flag_counts, totals) * totals[:, None], flag_counts)
+
+
+def test_rates_of_empty_group():
+    result = rates(np.zeros((1, 3)), np.zeros(1))
+    assert np.isnan(result).all()
@@ -0,0 +1,72 @@
+"""Tests for majority vote and Dawid–Skene consensus aggregation."""
+
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics.consensus import (  # noqa: E402
+    aggregate_labels,
+    confusion_matrices,
+    majority_posteriors,
+)
+
+
+def _simulate(n_items, accuracies, k=4, per_item=3, seed=0):
+    """Judgments of workers with the given accuracies (uniform errors)."""
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(k, size=n_items)
+    items = np.repeat(np.arange(n_items), per_item)
+    workers = np.concatenate(
+        [rng.choice(len(accuracies), per_item, replace=False) for _ in range(n_items)]
+    )
+    correct = rng.random(len(items)) < np.asarray(accuracies)[workers]
+    wrong = (truth[items] + rng.integers(1, k, size=len(items))) % k
+    labels = np.where(correct, truth[items], wrong)
+    return truth, items, workers, labels
+
+
+def test_majority_vote():
+    items = np.array([0, 0, 0, 1, 1])
+    labels = np.array([2, 2, 1, 0, 1])
+    posteriors = majority_posteriors(items, labels, 2, 3)
+    assert posteriors[0].tolist() == pytest.approx([0, 1 / 3, 2 / 3])
+    workers = np.array([0, 1, 2, 0, 1])
+    result = aggregate_labels(items, workers, labels, 2, 3, 3, "majority")
+    assert result["labels"].tolist() == [2, 0]
+    assert result["confidence"][0] == pytest.approx(2 / 3)
+    assert result["agreement"].tolist() == pytest.approx([1, 0.5, 0])
+
+
+def test_confusion_matrices_with_hard_posteriors():
+    posteriors = np.eye(2)[[0, 1, 1]]
+    items = np.array([0, 1, 2])
+    workers = np.array([0, 0, 0])
+    labels = np.array([0, 0, 1])
+    confusions = confusion_matrices(posteriors, items, workers, labels, 1, 0)
+    assert confusions[0].tolist() == [[1, 0], [0.5, 0.5]]
+
+
+def test_dawid_skene_beats_majority_with_unreliable_workers():
+    # Two careless workers outvote the expert under majority vote
+    accuracies = [0.95, 0.9, 0.45, 0.4, 0.35]
+    truth, items, workers, labels = _simulate(3000, accuracies)
+    args = (items, workers, labels, len(truth), len(accuracies), 4)
+    majority = aggregate_labels(*args, "majority")
+    em = aggregate_labels(*args)
+    assert (em["labels"] == truth).mean() > (majority["labels"] == truth).mean()
+    observed = [
+        (labels[workers == j] == truth[items[workers == j]]).mean() for j in range(5)
+    ]
+    assert em["accuracy"] == pytest.approx(observed, abs=0.05)
+    assert em["priors"].sum() == pytest.approx(1)
+    assert em["iterations"] > 1
+
+
+def test_dawid_skene_scales():
+    truth, items, workers, labels = _simulate(100_000, [0.9, 0.8, 0.7, 0.6, 0.5, 0.8])
+    start = time.perf_counter()
+    result = aggregate_labels(items, workers, labels, len(truth), 6, 4)
+    assert time.perf_counter() - start < 10
+    assert (result["labels"] == truth).mean() > 0.85
@@ -0,0 +1,62 @@
+"""Accuracy and bookkeeping tests for the completion time sketches."""
+
+import random
+
+from ddsketch import (
+    RELATIVE_ACCURACY,
+    add_sample,
+    empty_sketch,
+    merge_sketches,
+    sketch_quantiles,
+    sketch_summary,
+)
+
+
+def _exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def _sketch(values):
+    sketch = empty_sketch()
+    for value in values:
+        add_sample(sketch, value)
+    return sketch
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(20000)]
+    estimates = sketch_quantiles(_sketch(values), (0.01, 0.5, 0.9, 0.99))
+    for q, estimate in estimates.items():
+        exact = _exact_quantile(values, q)
+        assert abs(estimate - exact) <= RELATIVE_ACCURACY * exact
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(1)
+    values = [rng.uniform(1, 3600) for _ in range(5000)]
+    merged = merge_sketches([_sketch(values[:1000]), _sketch(values[1000:])])
+    whole = _sketch(values)
+    assert merged["bins"] == whole["bins"]
+    assert merged["count"] == whole["count"] == 5000
+    assert sketch_quantiles(merged) == sketch_quantiles(whole)
+
+
+def test_removing_samples_restores_sketch():
+    sketch = _sketch([10, 20, 30])
+    add_sample(sketch, 500)
+    add_sample(sketch, 0)
+    add_sample(sketch, 500, -1)
+    add_sample(sketch, 0, -1)
+    assert sketch_quantiles(sketch) == sketch_quantiles(_sketch([10, 20, 30]))
+    summary = sketch_summary(sketch)
+    assert summary["count"] == 3
+    assert summary["mean_seconds"] == 20
+
+
+def test_empty_summary():
+    summary = sketch_summary(None)
+    assert summary["count"] == 0
+    assert summary["mean_seconds"] is None
+    assert summary["p50_seconds"] is None
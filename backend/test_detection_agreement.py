@@ -0,0 +1,83 @@
+"""Tests for annotator-vs-QA bounding box matching."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics.detection import (  # noqa: E402
+    extract_boxes,
+    greedy_match,
+    match_chunk,
+    pairwise_iou,
+    summarize,
+)
+
+
+def test_pairwise_iou():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=float)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 101, 101]], dtype=float)
+    iou = pairwise_iou(a, b)
+    assert iou.shape == (2, 3)
+    assert iou[0, 0] == pytest.approx(1.0)
+    assert iou[0, 1] == pytest.approx(50 / 150)
+    assert iou[1].tolist() == [0, 0, 0]
+
+
+def test_greedy_match_prefers_highest_iou():
+    iou = np.array([[0.9, 0.6], [0.8, 0.0]])
+    rows, cols = greedy_match(iou, 0.5)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+    rows, cols = greedy_match(np.array([[0.6, 0.9], [0.8, 0.0]]), 0.5)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+
+
+def test_extract_boxes_formats():
+    legacy = {"objects": [{"class": "car", "bbox": [1, 2, 3, 4]}]}
+    current = {
+        "annotations": [
+            {"type": "bbox", "label": "car", "x": 1, "y": 2, "width": 3, "height": 4},
+            {"type": "polygon", "label": "car", "points": []},
+        ]
+    }
+    for annotation in (legacy, current):
+        boxes, labels = extract_boxes(annotation)
+        assert boxes.tolist() == [[1, 2, 4, 6]]
+        assert labels == ["car"]
+    assert extract_boxes({"notes": "none"}) is None
+
+
+def test_match_chunk_counts_per_annotator_and_class():
+    annotation = {
+        "bounding_boxes": [
+            {"label": "car", "x": 0, "y": 0, "width": 10, "height": 10},
+            {"label": "bus", "x": 50, "y": 50, "width": 10, "height": 10},
+        ]
+    }
+    corrected = {
+        "decision": "revise",
+        "corrections": {
+            "bounding_boxes": [
+                {"label": "car", "x": 1, "y": 0, "width": 10, "height": 10},
+                {"label": "car", "x": 80, "y": 80, "width": 5, "height": 5},
+            ]
+        },
+    }
+    accepted = {"decision": "approve", "bounding_boxes": annotation["bounding_boxes"]}
+    totals, without_qa = match_chunk(
+        [
+            ("a1", annotation, corrected),
+            ("a1", annotation, accepted),
+            ("a1", annotation, {"decision": "approve", "corrections": {}}),
+            ("a1", annotation, None),
+        ]
+    )
+    assert without_qa == 2
+    car = totals[("a1", "car")]
+    assert car[:3] == [2, 2, 3]
+    assert car[3] == pytest.approx(1 + 90 / 110)
+    assert totals[("a1", "bus")][:3] == [1, 2, 1]
+
+    summary = summarize(totals.values())
+    assert summary["precision"] == 0.75
+    assert summary["recall"] == 0.75
+    assert summarize([])["precision"] is None
@@ -0,0 +1,422 @@
+"""
+Index coverage tests for the query shapes used by the routers.
+
+Each shape is explained against a scratch database that has the registry
+indexes applied; a winning plan containing a COLLSCAN or an in-memory SORT
+fails the test. Requires a reachable MongoDB (TEST_MONGODB_URL, defaulting to
+mongodb://localhost:27017); the tests are skipped otherwise.
+"""
+
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+pymongo = pytest.importorskip("pymongo")
+
+from bson import ObjectId  # noqa: E402
+
+from indexes import specs_by_collection  # noqa: E402
+
+TEST_MONGODB_URL = os.getenv("TEST_MONGODB_URL", "mongodb://localhost:27017")
+TEST_DATABASE_NAME = "patterncrafter_index_coverage"
+
+OID = ObjectId()
+
+# (name, collection, filter, sort) for every filtered query issued by the routers
+Sort = Optional[List[Tuple[str, int]]]
+QUERY_SHAPES: List[Tuple[str, str, Dict[str, Any], Sort]] = [
+    ("user by email", "users", {"email": "a@b.c"}, None),
+    ("users by role", "users", {"role": "annotator"}, None),
+    ("users by roles", "users", {"role": {"$in": ["manager", "annotator"]}}, None),
+    (
+        "users created before",
+        "users",
+        {"role": "manager", "created_at": {"$lt": OID.generation_time}},
+        None,
+    ),
+    (
+        "users created since",
+        "users",
+        {
+            "role": {"$in": ["manager", "annotator"]},
+            "created_at": {"$gte": OID.generation_time},
+        },
+        None,
+    ),
+    ("projects by manager", "projects", {"manager_id": OID}, None),
+    ("project tasks", "tasks", {"project_id": OID}, None),
+    (
+        "completed project tasks",
+        "tasks",
+        {
+            "project_id": OID,
+            "completed_status.annotator_part": True,
+            "completed_status.qa_part": True,
+        },
+        None,
+    ),
+    (
+        "completed project tasks by annotator",
+        "tasks",
+        {
+            "project_id": OID,
+            "completed_status.annotator_part": True,
+            "completed_status.qa_part": True,
+            "assigned_annotator_id": OID,
+        },
+        None,
+    ),
+    (
+        "my project tasks",
+        "tasks",
+        {
+            "project_id": OID,
+            "$or": [{"assigned_annotator_id": OID}, {"assigned_qa_id": OID}],
+        },
+        None,
+    ),
+    ("tasks by annotator", "tasks", {"assigned_annotator_id": OID}, None),
+    (
+        "completed tasks by annotator",
+        "tasks",
+        {"assigned_annotator_id": OID, "completed_status.annotator_part": True},
+        None,
+    ),
+    ("tasks by qa", "tasks", {"assigned_qa_id": OID}, None),
+    (
+        "completed tasks by qa",
+        "tasks",
+        {"assigned_qa_id": OID, "completed_status.qa_part": True},
+        None,
+    ),
+    (
+        "completed tasks",
+        "tasks",
+        {"completed_status.annotator_part": True, "completed_status.qa_part": True},
+        None,
+    ),
+    (
+        "assigned tasks",
+        "tasks",
+        {"assigned_annotator_id": {"$exists": True}},
+        None,
+    ),
+    ("qa assigned tasks", "tasks", {"assigned_qa_id": {"$exists": True}}, None),
+    ("tasks by tag", "tasks", {"tag_task": "batch-1"}, None),
+    (
+        "flagged project tasks",
+        "tasks",
+        {"project_id": OID, "flag_bits": {"$exists": True, "$bitsAllSet": 260}},
+        None,
+    ),
+    (
+        "judgment queue",
+        "tasks",
+        {
+            "project_id": OID,
+            "judgment_count": {"$not": {"$gte": 3}},
+            "$or": [
+                {"judgment_count": {"$not": {"$gte": 2}}},
+                {"assigned_annotator_id": None},
+                {"completed_status.annotator_part": True},
+            ],
+            "assigned_annotator_id": {"$ne": OID},
+            "$and": [
+                {
+                    "$or": [
+                        {"judgment_count": {"$gt": 1}},
+                        {"judgment_count": 1, "_id": {"$gt": OID}},
+                    ]
+                }
+            ],
+        },
+        [("judgment_count", 1), ("_id", 1)],
+    ),
+    (
+        "tasks created before",
+        "tasks",
+        {"created_at": {"$lt": OID.generation_time}},
+        None,
+    ),
+    (
+        "membership invite",
+        "invites",
+        {"project_id": OID, "user_id": OID, "accepted_status": True},
+        None,
+    ),
+    ("project invites", "invites", {"project_id": OID}, None),
+    ("accepted invites", "invites", {"accepted_status": True}, None),
+    ("user invites", "invites", {"user_id": OID}, None),
+    (
+        "accepted invites by user",
+        "invites",
+        {"user_id": OID, "accepted_status": True},
+        None,
+    ),
+    ("project working", "project_working", {"project_id": OID}, None),
+    (
+        "project membership",
+        "project_working",
+        {"project_id": OID, "annotator_assignments.annotator_id": OID},
+        None,
+    ),
+    ("project annotator tasks", "annotator_tasks", {"project_id": OID}, None),
+    ("annotator history", "annotator_tasks", {"annotator_id": OID}, None),
+    (
+        "annotator project history",
+        "annotator_tasks",
+        {"annotator_id": OID, "project_id": OID},
+        None,
+    ),
+    (
+        "annotator history page",
+        "annotator_tasks",
+        {"annotator_id": OID, "_id": {"$lt": OID}},
+        [("_id", -1)],
+    ),
+    (
+        "annotator project history page",
+        "annotator_tasks",
+        {"annotator_id": OID, "project_id": OID, "_id": {"$lt": OID}},
+        [("_id", -1)],
+    ),
+    (
+        "annotator completed records",
+        "annotator_tasks",
+        {"annotator_id": OID, "completion_time": {"$type": "number"}},
+        None,
+    ),
+    (
+        "annotator task record",
+        "annotator_tasks",
+        {"task_id": OID, "annotator_id": OID},
+        None,
+    ),
+    (
+        "notifications feed",
+        "notifications",
+        {"recipient_id": OID, "_id": {"$lt": OID}},
+        [("_id", -1)],
+    ),
+    (
+        "unread notifications",
+        "notifications",
+        {"recipient_id": OID, "is_read": False},
+        None,
+    ),
+    ("task assignments", "task_assignments", {"task_id": OID}, None),
+    (
+        "annotator assignment",
+        "task_assignments",
+        {"task_id": OID, "annotator_id": OID},
+        None,
+    ),
+    (
+        "annotator open assignments",
+        "task_assignments",
+        {"project_id": OID, "annotator_id": OID},
+        None,
+    ),
+    ("project assignments", "task_assignments", {"project_id": OID}, None),
+    (
+        "remark thread",
+        "task_remarks",
+        {"task_id": OID},
+        [("created_at", 1), ("_id", 1)],
+    ),
+    (
+        "remark thread page",
+        "task_remarks",
+        {
+            "task_id": OID,
+            "$or": [
+                {"created_at": {"$gt": OID.generation_time}},
+                {"created_at": OID.generation_time, "_id": {"$gt": OID}},
+            ],
+        },
+        [("created_at", 1), ("_id", 1)],
+    ),
+    (
+        "project rollups since",
+        "daily_rollups",
+        {"day": {"$gte": OID.generation_time}, "user_id": None},
+        None,
+    ),
+    (
+        "user rollups since",
+        "daily_rollups",
+        {"user_id": OID, "day": {"$gte": OID.generation_time}},
+        None,
+    ),
+    (
+        "project throughput since",
+        "daily_rollups",
+        {"project_id": OID, "day": {"$gte": OID.generation_time}},
+        None,
+    ),
+    ("project sketches", "completion_sketches", {"project_id": OID}, None),
+    (
+        "sketch upsert",
+        "completion_sketches",
+        {"project_id": OID, "annotator_id": None},
+        None,
+    ),
+    (
+        "cached report",
+        "report_cache",
+        {"project_id": OID, "report": "scoreboard"},
+        None,
+    ),
+    ("project reports", "report_cache", {"project_id": OID}, None),
+    (
+        "project preferences",
+        "preference_counts",
+        {"project_id": OID, "count": {"$gt": 0}},
+        None,
+    ),
+    (
+        "preference upsert",
+        "preference_counts",
+        {"project_id": OID, "winner": "model-a", "loser": "model-b"},
+        None,
+    ),
+    ("project judgments", "judgments", {"project_id": OID}, None),
+    ("task judgments", "judgments", {"task_id": OID}, None),
+    (
+        "annotator judgment",
+        "judgments",
+        {"task_id": OID, "annotator_id": OID},
+        None,
+    ),
+    (
+        "judged queue tasks",
+        "judgments",
+        {"task_id": {"$in": [OID]}, "annotator_id": OID},
+        None,
+    ),
+    (
+        "sketched task records",
+        "annotator_tasks",
+        {"task_id": OID, "sketched_time": {"$exists": True}},
+        None,
+    ),
+    # archive moves and archive-tier reads
+    ("project notifications", "notifications", {"project_id": OID}, None),
+    ("project remarks", "task_remarks", {"project_id": OID}, None),
+    (
+        "archived notifications feed",
+        "notifications_archive",
+        {"recipient_id": OID, "_id": {"$lt": OID}},
+        [("_id", -1)],
+    ),
+    (
+        "archived unread notifications",
+        "notifications_archive",
+        {"recipient_id": OID, "is_read": False},
+        None,
+    ),
+    ("archived project tasks", "tasks_archive", {"project_id": OID}, None),
+    (
+        "archived completed tasks",
+        "tasks_archive",
+        {
+            "project_id": OID,
+            "completed_status.annotator_part": True,
+            "completed_status.qa_part": True,
+        },
+        None,
+    ),
+    (
+        "archived tasks by annotator",
+        "tasks_archive",
+        {"assigned_annotator_id": OID},
+        None,
+    ),
+    ("archived tasks by qa", "tasks_archive", {"assigned_qa_id": OID}, None),
+    (
+        "archived tasks created since",
+        "tasks_archive",
+        {"created_at": {"$gte": OID.generation_time}},
+        None,
+    ),
+    (
+        "archived assigned tasks",
+        "tasks_archive",
+        {"assigned_annotator_id": {"$exists": True}},
+        None,
+    ),
+    (
+        "archived qa assigned tasks",
+        "tasks_archive",
+        {"assigned_qa_id": {"$exists": True}},
+        None,
+    ),
+    (
+        "archived annotator history",
+        "annotator_tasks_archive",
+        {"annotator_id": OID},
+        None,
+    ),
+    (
+        "archived annotator history page",
+        "annotator_tasks_archive",
+        {"annotator_id": OID, "_id": {"$lt": OID}},
+        [("_id", -1)],
+    ),
+    (
+        "archived project annotator tasks",
+        "annotator_tasks_archive",
+        {"project_id": OID},
+        None,
+    ),
+    (
+        "archived remark thread",
+        "task_remarks_archive",
+        {"task_id": OID},
+        [("created_at", 1), ("_id", 1)],
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def db():
+    client = pymongo.MongoClient(TEST_MONGODB_URL, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except Exception:
+        pytest.skip(f"MongoDB not reachable at {TEST_MONGODB_URL}")
+
+    client.drop_database(TEST_DATABASE_NAME)
+    database = client[TEST_DATABASE_NAME]
+    for collection, specs in specs_by_collection().items():
+        database[collection].create_indexes([spec.model() for spec in specs])
+    yield database
+    client.drop_database(TEST_DATABASE_NAME)
+    client.close()
+
+
+def _stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+@pytest.mark.parametrize(
+    "collection,query,sort",
+    [shape[1:] for shape in QUERY_SHAPES],
+    ids=[shape[0] for shape in QUERY_SHAPES],
+)
+def test_query_shape_uses_index(db, collection, query, sort):
+    command: Dict[str, Any] = {"find": collection, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    explain = db.command("explain", command, verbosity="queryPlanner")
+    stages = set(_stages(explain["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages, f"{collection} {query} scans the collection"
+    assert "SORT" not in stages, f"{collection} {query} sorts in memory"
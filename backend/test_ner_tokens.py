@@ -0,0 +1,59 @@
+"""Tests for NER token offsets and entity span snapping."""
+
+import pytest
+
+from ner_tokens import (
+    offsets_for_response,
+    pack_offsets,
+    snap_entities,
+    token_offsets,
+    unpack_offsets,
+)
+
+TEXT = "Ada Lovelace met Charles Babbage in London, 1833."
+
+
+def test_token_offsets_round_trip():
+    offsets = token_offsets(TEXT)
+    tokens = [TEXT[s:e] for s, e in zip(offsets[0::2], offsets[1::2])]
+    assert tokens == (
+        "Ada Lovelace met Charles Babbage in London , 1833 .".split()
+    )
+    packed = pack_offsets(offsets)
+    assert len(packed) == 8 * len(tokens)
+    assert unpack_offsets(packed) == offsets
+    assert offsets_for_response(packed) == offsets.tolist()
+
+
+def test_snap_entities_to_token_boundaries():
+    offsets = token_offsets(TEXT)
+    entities = [
+        {"type": "PERSON", "start": 0, "end": 12, "text": "Ada Lovelace"},
+        {"type": "PERSON", "start": 19, "end": 30},  # "arles Babba"
+        {"type": "LOC", "start": 35, "end": 43},  # " London,"
+    ]
+    snapped = snap_entities(TEXT, offsets, entities)
+    assert [(e["start"], e["end"], e["text"]) for e in snapped] == [
+        (0, 12, "Ada Lovelace"),
+        (17, 32, "Charles Babbage"),
+        (36, 43, "London,"),
+    ]
+    assert snapped[0]["type"] == "PERSON"
+
+
+@pytest.mark.parametrize(
+    "span", [(-1, 3), (3, 3), (0, len(TEXT) + 1), ("0", 3), (True, 3), (3, 4)]
+)
+def test_snap_entities_rejects_bad_spans(span):
+    start, end = span
+    with pytest.raises(ValueError):
+        snap_entities(TEXT, token_offsets(TEXT), [{"start": start, "end": end}])
+
+
+def test_offsets_count_utf16_code_units():
+    text = "Hi 👋 Zoë"
+    offsets = token_offsets(text)
+    # The emoji takes two UTF-16 code units, as in JavaScript
+    assert offsets.tolist() == [0, 2, 3, 5, 6, 9]
+    snapped = snap_entities(text, offsets, [{"start": 7, "end": 8}])
+    assert snapped[0]["text"] == "Zoë"
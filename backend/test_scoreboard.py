@@ -0,0 +1,49 @@
+"""Tests for the per-model score statistics of LLM grading scoreboards."""
+
+import random
+import statistics
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics.scoreboard import (  # noqa: E402
+    Z_95,
+    confidence_intervals,
+    score_moments,
+)
+
+
+def _histogram(samples):
+    """(group, score) -> count rows, as the $group stage returns them."""
+    rows = {}
+    for group, score in samples:
+        rows[group, score] = rows.get((group, score), 0) + 1
+    groups, scores = (np.array(column) for column in zip(*rows))
+    return groups, scores, np.array(list(rows.values()))
+
+
+def test_moments_match_statistics_module():
+    rng = random.Random(11)
+    samples = [(rng.randrange(5), rng.randint(1, 5)) for _ in range(5000)]
+    n, mean, std = score_moments(*_histogram(samples), 5)
+    for group in range(5):
+        values = [score for g, score in samples if g == group]
+        assert n[group] == len(values)
+        assert mean[group] == pytest.approx(statistics.mean(values))
+        assert std[group] == pytest.approx(statistics.stdev(values))
+
+
+def test_small_and_empty_groups():
+    n, mean, std = score_moments(*_histogram([(0, 4)]), 2)
+    assert n.tolist() == [1, 0]
+    assert mean[0] == 4
+    assert np.isnan(std).all()
+    assert np.isnan(mean[1])
+
+
+def test_confidence_intervals():
+    n, mean, std = np.array([25]), np.array([3.0]), np.array([1.0])
+    low, high = confidence_intervals(n, mean, std)
+    assert low[0] == pytest.approx(3 - Z_95 / 5)
+    assert high[0] == pytest.approx(3 + Z_95 / 5)
@@ -93,3 +93,46 @@ def as_response(model_cls, doc: Dict[str, Any]):
     """Return an instance of model_cls with all ObjectIds converted to strings and aliases preserved."""
     data = _stringify_object_ids(doc)
     return model_cls(**data)
+
+
+# Sparse task storage: these fields are omitted while null (or at their
+# default) and reconstituted from the response model defaults on read
+SPARSE_TASK_DEFAULTS: Dict[str, Any] = {
+    "annotation": None,
+    "qa_annotation": None,
+    "qa_feedback": None,
+    "tag_task": None,
+    "assigned_annotator_id": None,
+    "assigned_qa_id": None,
+    "is_returned": False,
+    "return_reason": None,
+    "returned_by": None,
+    "accumulated_time": None,
+    "qa_accumulated_time": None,
+    "annotator_started_at": None,
+    "annotator_completed_at": None,
+    "qa_started_at": None,
+    "qa_completed_at": None,
+}
+
+
+def _is_sparse_default(field: str, value: Any) -> bool:
+    return value is None or (
+        field in SPARSE_TASK_DEFAULTS and value is SPARSE_TASK_DEFAULTS[field]
+    )
+
+
+def omit_defaults(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop null/default fields from a task document before inserting it."""
+    return {k: v for k, v in doc.items() if not _is_sparse_default(k, v)}
+
+
+def sparse_update(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a task update that $sets real values and $unsets null/default ones."""
+    update: Dict[str, Any] = {}
+    for path, value in fields.items():
+        if _is_sparse_default(path, value):
+            update.setdefault("$unset", {})[path] = ""
+        else:
+            update.setdefault("$set", {})[path] = value
+    return update
@@ -0,0 +1,31 @@
+import { useTaskDataRange } from "@/lib/taskDataRange";
+
+// "Load more" control under a progressively loaded document or transcript
+export default function RangeLoadMore({
+  range,
+  unit,
+}: {
+  range: ReturnType<typeof useTaskDataRange>;
+  unit: string;
+}) {
+  if (range.error) {
+    return <div className="text-xs text-red-600 mt-2">{range.error}</div>;
+  }
+  if (!range.hasMore) return null;
+  const loaded =
+    typeof range.items === "string"
+      ? Array.from(range.items).length
+      : range.items?.length ?? 0;
+  return (
+    <button
+      type="button"
+      className="btn btn-outline btn-sm mt-2"
+      onClick={range.loadMore}
+      disabled={range.loading}
+    >
+      {range.loading
+        ? "Loading…"
+        : `Load more (${loaded} of ${range.total} ${unit})`}
+    </button>
+  );
+}
@@ -1,11 +1,10 @@
 import { FormEvent, useEffect, useMemo, useState } from "react";
-import { TaskRemark } from "@/types";
+import { TaskRemark, TaskRemarkPage } from "@/types";
 import { apiFetch } from "@/api/client";
 import { useAuth } from "@/auth/AuthContext";
 
 type RemarksThreadProps = {
   taskId: string;
-  remarks?: TaskRemark[];
   allowReply?: boolean;
   replyLabel?: string;
   emptyStateLabel?: string;
@@ -14,21 +13,54 @@ type RemarksThreadProps = {
 
 export default function RemarksThread({
   taskId,
-  remarks,
   allowReply = false,
   replyLabel = "Let QA know what changed",
   emptyStateLabel = "No remarks yet.",
   onRemarkAdded,
 }: RemarksThreadProps) {
   const { user } = useAuth();
-  const [thread, setThread] = useState<TaskRemark[]>(remarks ?? []);
+  const [thread, setThread] = useState<TaskRemark[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [message, setMessage] = useState("");
   const [error, setError] = useState<string | null>(null);
   const [isSubmitting, setIsSubmitting] = useState(false);
 
+  const fetchPage = (after?: string | null) =>
+    apiFetch<TaskRemarkPage>(
+      `/tasks/${taskId}/remarks?limit=50${after ? `&after=${after}` : ""}`
+    );
+
   useEffect(() => {
-    setThread(remarks ?? []);
-  }, [remarks]);
+    let cancelled = false;
+    fetchPage()
+      .then((page) => {
+        if (cancelled) return;
+        setThread(page.remarks);
+        setNextCursor(page.next_cursor ?? null);
+      })
+      .catch((err: any) => {
+        if (!cancelled) setError(err?.message || "Failed to load remarks");
+      });
+    return () => {
+      cancelled = true;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [taskId]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setThread((prev) => [...prev, ...page.remarks]);
+      setNextCursor(page.next_cursor ?? null);
+    } catch (err: any) {
+      setError(err?.message || "Failed to load remarks");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
 
   const sortedRemarks = useMemo(() => {
     return [...thread].sort((a, b) => {
@@ -126,6 +158,18 @@ export default function RemarksThread({
                 </div>
               );
             })}
+            {nextCursor && (
+              <div className="flex justify-center">
+                <button
+                  type="button"
+                  className="btn btn-ghost btn-xs"
+                  onClick={loadMore}
+                  disabled={isLoadingMore}
+                >
+                  {isLoadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
 
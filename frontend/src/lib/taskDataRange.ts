@@ -0,0 +1,87 @@
+// Progressive loading of long task_data fields (document paragraphs, chat messages).
+// Tasks opened with ?lazy=true carry only the first page of these fields (or none,
+// when blob stored) plus their full length in task_data_totals; the rest is read
+// page by page from GET /tasks/{id}/data/{field}.
+
+import { useCallback, useEffect, useState } from "react";
+import { apiFetch } from "@/api/client";
+import { Task, TaskDataRange } from "@/types";
+
+export type RangeField = "document" | "messages";
+type Unit = TaskDataRange["unit"];
+
+// Items, or characters for a document stored as one string, per request
+const PAGE_SIZE: Record<Unit, number> = { items: 50, characters: 20000 };
+
+// Strings are sliced by code point on the server, not by UTF-16 unit
+function loadedLength(value: any[] | string | undefined): number {
+  if (value === undefined) return 0;
+  return typeof value === "string" ? Array.from(value).length : value.length;
+}
+
+function unitOf(value: any[] | string | undefined): Unit {
+  return typeof value === "string" ? "characters" : "items";
+}
+
+export function useTaskDataRange(task: Task | null, field: RangeField) {
+  const [items, setItems] = useState<any[] | string | undefined>(undefined);
+  const [total, setTotal] = useState(0);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const fetchPage = useCallback(
+    async (offset: number, unit: Unit) => {
+      if (!task) return;
+      setLoading(true);
+      try {
+        let page = await apiFetch<TaskDataRange>(
+          `/tasks/${task.id}/data/${field}?offset=${offset}&limit=${PAGE_SIZE[unit]}`
+        );
+        // The first read of a blob-stored field cannot know its unit up front
+        if (page.unit !== unit && page.next_offset != null) {
+          const rest = await apiFetch<TaskDataRange>(
+            `/tasks/${task.id}/data/${field}?offset=${page.next_offset}` +
+              `&limit=${PAGE_SIZE[page.unit] - page.items.length}`
+          );
+          page = { ...rest, items: (page.items as string) + rest.items };
+        }
+        setTotal(page.total);
+        setItems((previous) => {
+          if (previous === undefined || offset === 0) return page.items;
+          return typeof previous === "string"
+            ? previous + (page.items as string)
+            : [...previous, ...(page.items as any[])];
+        });
+      } catch (e) {
+        setError(String(e));
+      } finally {
+        setLoading(false);
+      }
+    },
+    [task, field]
+  );
+
+  useEffect(() => {
+    setError(null);
+    const initial = task?.task_data?.[field] as any[] | string | undefined;
+    setItems(initial);
+    setTotal(task?.task_data_totals?.[field] ?? loadedLength(initial));
+    // Blob-stored fields arrive unresolved; fetch their first page
+    if (initial === undefined && task?.task_data_blobs?.[field]) {
+      fetchPage(0, "items");
+    }
+  }, [task, field, fetchPage]);
+
+  const loadMore = useCallback(() => {
+    if (!loading) fetchPage(loadedLength(items), unitOf(items));
+  }, [loading, items, fetchPage]);
+
+  return {
+    items,
+    total,
+    loading,
+    error,
+    hasMore: loadedLength(items) < total,
+    loadMore,
+  };
+}
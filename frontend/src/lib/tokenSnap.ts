@@ -0,0 +1,49 @@
+// Snapping of NER text selections to whole tokens.
+// Offsets come from task.token_offsets: flat [start, end, ...] pairs in UTF-16
+// units, sorted, as computed by the backend tokenizer.
+
+// Index of the first token for which `before(token)` is false
+function firstToken(offsets: number[], before: (token: number) => boolean) {
+  let low = 0;
+  let high = offsets.length / 2;
+  while (low < high) {
+    const mid = (low + high) >> 1;
+    if (before(mid)) low = mid + 1;
+    else high = mid;
+  }
+  return low;
+}
+
+// Widen [start, end) to the tokens it touches; null if it only covers whitespace
+export function snapToTokens(
+  offsets: number[] | null | undefined,
+  text: string,
+  start: number,
+  end: number
+): [number, number] | null {
+  if (!offsets || offsets.length < 2) {
+    // No tokens to snap to: just trim surrounding whitespace
+    while (start < end && /\s/.test(text[start])) start++;
+    while (end > start && /\s/.test(text[end - 1])) end--;
+    return end > start ? [start, end] : null;
+  }
+  const first = firstToken(offsets, (token) => offsets[2 * token + 1] <= start);
+  const last = firstToken(offsets, (token) => offsets[2 * token] < end) - 1;
+  if (first > last) return null;
+  return [offsets[2 * first], offsets[2 * last + 1]];
+}
+
+// UTF-16 offsets of the current selection inside `container`, or null
+export function selectionOffsets(container: HTMLElement): [number, number] | null {
+  const selection = window.getSelection();
+  if (!selection || selection.rangeCount === 0 || selection.isCollapsed) {
+    return null;
+  }
+  const range = selection.getRangeAt(0);
+  if (!container.contains(range.commonAncestorContainer)) return null;
+  const prefix = document.createRange();
+  prefix.selectNodeContents(container);
+  prefix.setEnd(range.startContainer, range.startOffset);
+  const start = prefix.toString().length;
+  return [start, start + range.toString().length];
+}
@@ -101,6 +101,7 @@ interface WeeklyGrowthData {
 }
 
 interface GrowthData {
+  granularity: "day" | "week" | "month";
   daily_data: DailyGrowthData[];
   weekly_data: WeeklyGrowthData[];
   totals: {
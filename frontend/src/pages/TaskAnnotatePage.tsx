@@ -1,8 +1,11 @@
-import { FormEvent, useEffect, useState } from "react";
+import { FormEvent, useEffect, useRef, useState } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import { apiFetch } from "@/api/client";
 import { Task, TaskRemark } from "@/types";
 import RemarksThread from "@/components/RemarksThread";
+import RangeLoadMore from "@/components/RangeLoadMore";
+import { useTaskDataRange } from "@/lib/taskDataRange";
+import { selectionOffsets, snapToTokens } from "@/lib/tokenSnap";
 import {
   ImageClassificationAnnotator,
   ImageClassificationData,
@@ -103,18 +106,24 @@ export default function TaskAnnotatePage() {
   const [task, setTask] = useState<Task | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [success, setSuccess] = useState<string | null>(null);
+  // Long documents and transcripts are paged in (see useTaskDataRange)
+  const documentRange = useTaskDataRange(task, "document");
+  const messagesRange = useTaskDataRange(task, "messages");
+  const sourceDocument = documentRange.items;
+  const chatMessages: any[] | undefined = Array.isArray(messagesRange.items)
+    ? messagesRange.items
+    : task?.task_data?.chat_messages;
   const [skipModalOpen, setSkipModalOpen] = useState(false);
   const [skipping, setSkipping] = useState(false);
-  const hasReturnRemark = task?.remarks?.some(
-    (r) => r.remark_type === "qa_return"
-  );
+  // Returning a task always posts a "qa_return" remark to the thread
+  const hasReturnRemark = (task?.remark_count ?? 0) > 0;
 
-  const handleRemarkAdded = (remark: TaskRemark) => {
+  const handleRemarkAdded = (_remark: TaskRemark) => {
     setTask((prev) =>
       prev
         ? {
             ...prev,
-            remarks: [...(prev.remarks ?? []), remark],
+            remark_count: (prev.remark_count ?? 0) + 1,
           }
         : prev
     );
@@ -162,6 +171,21 @@ export default function TaskAnnotatePage() {
   const [currentEntityType, setCurrentEntityType] = useState("");
   const [currentStart, setCurrentStart] = useState("");
   const [currentEnd, setCurrentEnd] = useState("");
+  const nerTextRef = useRef<HTMLDivElement>(null);
+
+  // Fill the entity form from a text selection widened to whole tokens
+  const handleNerSelection = () => {
+    const text = task?.task_data?.text;
+    if (!nerTextRef.current || typeof text !== "string") return;
+    const selected = selectionOffsets(nerTextRef.current);
+    if (!selected) return;
+    const snapped = snapToTokens(task?.token_offsets, text, ...selected);
+    if (!snapped) return;
+    const [start, end] = snapped;
+    setCurrentEntity(text.slice(start, end));
+    setCurrentStart(String(start));
+    setCurrentEnd(String(end));
+  };
 
   // Text Summarization
   const [summary, setSummary] = useState("");
@@ -188,7 +212,7 @@ export default function TaskAnnotatePage() {
 
   useEffect(() => {
     if (!taskId) return;
-    apiFetch<Task>(`/tasks/${taskId}`)
+    apiFetch<Task>(`/tasks/${taskId}?lazy=true`)
       .then((taskData) => {
         setTask(taskData);
 
@@ -638,10 +662,9 @@ export default function TaskAnnotatePage() {
           </div>
         )}
 
-      {task?.id && (task.is_returned || (task.remarks?.length ?? 0) > 0) && (
+      {task?.id && (task.is_returned || (task.remark_count ?? 0) > 0) && (
         <RemarksThread
           taskId={task.id}
-          remarks={task.remarks}
           allowReply={Boolean(task.is_returned)}
           replyLabel="Let QA know what you fixed"
           emptyStateLabel="No remarks yet. Add a note once you review the feedback."
@@ -787,7 +810,11 @@ export default function TaskAnnotatePage() {
                       </span>
                     </div>
                     <div className="p-6 bg-white">
-                      <div className="text-base text-gray-900 leading-loose whitespace-pre-wrap select-text">
+                      <div
+                        ref={nerTextRef}
+                        onMouseUp={handleNerSelection}
+                        className="text-base text-gray-900 leading-loose whitespace-pre-wrap select-text"
+                      >
                         {task.task_data.text}
                       </div>
                     </div>
@@ -804,8 +831,8 @@ export default function TaskAnnotatePage() {
                             clipRule="evenodd"
                           />
                         </svg>
-                        <strong>Tip:</strong> Select text to identify entity
-                        positions for labeling
+                        <strong>Tip:</strong> Select text to fill in the
+                        entity; selections snap to whole tokens
                       </p>
                     </div>
                   </div>
@@ -1987,9 +2014,9 @@ export default function TaskAnnotatePage() {
                     </h3>
                   </div>
                   <div className="bg-gray-50 border-2 border-gray-200 rounded-lg p-4 max-h-80 overflow-y-auto">
-                    {Array.isArray(task.task_data?.document) ? (
+                    {Array.isArray(sourceDocument) ? (
                       <div className="space-y-3">
-                        {task.task_data.document.map(
+                        {sourceDocument.map(
                           (para: string, idx: number) => (
                             <p
                               key={idx}
@@ -2002,9 +2029,13 @@ export default function TaskAnnotatePage() {
                       </div>
                     ) : (
                       <p className="text-sm text-gray-800 leading-relaxed whitespace-pre-wrap">
-                        {task.task_data?.document || "No document provided"}
+                        {sourceDocument || "No document provided"}
                       </p>
                     )}
+                    <RangeLoadMore
+                      range={documentRange}
+                      unit={Array.isArray(sourceDocument) ? "paragraphs" : "characters"}
+                    />
                   </div>
                   <div className="flex items-center gap-4 mt-3 text-xs text-gray-500">
                     <span className="flex items-center gap-1">
@@ -2022,9 +2053,9 @@ export default function TaskAnnotatePage() {
                       Original source text
                     </span>
                     <span>
-                      {Array.isArray(task.task_data?.document)
-                        ? `${task.task_data.document.length} paragraphs`
-                        : `${task.task_data?.document?.length || 0} characters`}
+                      {Array.isArray(sourceDocument)
+                        ? `${documentRange.total} paragraphs`
+                        : `${documentRange.total} characters`}
                     </span>
                   </div>
                 </div>
@@ -2222,19 +2253,22 @@ export default function TaskAnnotatePage() {
             {task?.category === "generative_ai_chatbot_assessment" && (
               <div className="space-y-6">
                 {/* Conversation Preview */}
-                {Array.isArray(task.task_data?.chat_messages) &&
-                  task.task_data.chat_messages.length > 0 && (
+                {Array.isArray(chatMessages) &&
+                  chatMessages.length > 0 && (
                     <div>
                       <div className="flex items-center justify-between mb-3">
                         <label className="label m-0">
                           💬 Conversation Preview
                         </label>
                         <span className="text-xs text-gray-500 bg-gray-100 px-2 py-1 rounded">
-                          {task.task_data.chat_messages.length} messages
+                          {Array.isArray(messagesRange.items)
+                            ? messagesRange.total
+                            : chatMessages.length}{" "}
+                          messages
                         </span>
                       </div>
                       <div className="rounded-lg border border-gray-200 bg-gradient-to-br from-gray-50 to-white shadow-sm max-h-96 overflow-auto divide-y divide-gray-100">
-                        {task.task_data.chat_messages.map(
+                        {chatMessages.map(
                           (msg: any, idx: number) => (
                             <div
                               key={idx}
@@ -2269,6 +2303,7 @@ export default function TaskAnnotatePage() {
                           )
                         )}
                       </div>
+                      <RangeLoadMore range={messagesRange} unit="messages" />
                       <p className="text-xs text-gray-500 mt-2 italic flex items-center gap-1">
                         <svg
                           className="w-3.5 h-3.5"
@@ -232,12 +232,12 @@ export default function TaskQAPage() {
   const [corrections, setCorrections] = useState("");
   const [notes, setNotes] = useState("");
 
-  const handleRemarkAdded = (remark: TaskRemark) => {
+  const handleRemarkAdded = (_remark: TaskRemark) => {
     setTask((prev) =>
       prev
         ? {
             ...prev,
-            remarks: [...(prev.remarks ?? []), remark],
+            remark_count: (prev.remark_count ?? 0) + 1,
           }
         : prev
     );
@@ -649,7 +649,6 @@ export default function TaskQAPage() {
       {task?.id && (
         <RemarksThread
           taskId={task.id}
-          remarks={task.remarks}
           allowReply={canReplyToThread}
           replyLabel={
             canReplyToThread ? "Leave a note for the annotator" : "Conversation"
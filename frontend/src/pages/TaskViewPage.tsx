@@ -4,6 +4,8 @@ import { apiFetch } from "@/api/client";
 import { Task } from "@/types";
 import { useAuth } from "@/auth/AuthContext";
 import AnnotationViewer from "@/components/AnnotationViewer";
+import RangeLoadMore from "@/components/RangeLoadMore";
+import { RangeField, useTaskDataRange } from "@/lib/taskDataRange";
 
 const LinkFix = RouterLink as unknown as any;
 
@@ -14,11 +16,16 @@ export default function TaskViewPage() {
   const [error, setError] = useState<string | null>(null);
   const [annotatorName, setAnnotatorName] = useState<string>("");
   const [qaName, setQaName] = useState<string>("");
+  const ranges: Record<RangeField, ReturnType<typeof useTaskDataRange>> = {
+    document: useTaskDataRange(task, "document"),
+    messages: useTaskDataRange(task, "messages"),
+  };
 
   useEffect(() => {
     if (!taskId) return;
 
-    apiFetch<Task>(`/tasks/${taskId}`)
+    // Long documents and transcripts are paged in (see useTaskDataRange)
+    apiFetch<Task>(`/tasks/${taskId}?lazy=true`)
       .then(async (t) => {
         setTask(t);
 
@@ -282,7 +289,14 @@ export default function TaskViewPage() {
           <h3 className="text-lg font-semibold mb-3">📄 Task Data</h3>
           <div className="space-y-4">
             {task.task_data && typeof task.task_data === "object" ? (
-              Object.entries(task.task_data).map(([key, value]) => (
+              Object.entries({
+                ...task.task_data,
+                ...Object.fromEntries(
+                  Object.entries(ranges)
+                    .filter(([, range]) => range.items !== undefined)
+                    .map(([field, range]) => [field, range.items])
+                ),
+              }).map(([key, value]) => (
                 <div
                   key={key}
                   className="border-b border-gray-200 pb-3 last:border-b-0"
@@ -385,6 +399,18 @@ export default function TaskViewPage() {
                       <span className="break-words">{String(value)}</span>
                     )}
                   </div>
+                  {key in ranges && (
+                    <RangeLoadMore
+                      range={ranges[key as RangeField]}
+                      unit={
+                        typeof value === "string"
+                          ? "characters"
+                          : key === "messages"
+                          ? "messages"
+                          : "paragraphs"
+                      }
+                    />
+                  )}
                 </div>
               ))
             ) : (
@@ -17,11 +17,32 @@ export type TaskRemark = {
   created_at: string;
 };
 
+export type TaskRemarkPage = {
+  remarks: (TaskRemark & { id: Id; task_id: Id })[];
+  next_cursor?: Id | null;
+  total: number;
+};
+
+// GET /tasks/{id}/data/{document|messages}?offset=&limit=
+export type TaskDataRange = {
+  field: string;
+  offset: number;
+  limit: number;
+  unit: "items" | "characters";
+  total: number;
+  items: any[] | string;
+  next_offset?: number | null;
+};
+
 export type Task = {
   id: Id;
   project_id: Id;
   category: string;
   task_data: any;
+  // task_data fields kept in the blob store; only inlined when a single task is opened
+  task_data_blobs?: Record<string, { sha256: string; size: number }>;
+  // Full length of document/messages when opened with ?lazy=true
+  task_data_totals?: Record<string, number>;
   annotation?: any;
   qa_annotation?: any;
   qa_feedback?: string;
@@ -36,12 +57,15 @@ export type Task = {
   returned_by?: Id | null;
   accumulated_time?: number | null;
   qa_accumulated_time?: number | null;
-  remarks?: TaskRemark[];
+  remark_count?: number;
+  last_remark_at?: string | null;
   created_at?: string;
   annotator_started_at?: string | null;
   annotator_completed_at?: string | null;
   qa_started_at?: string | null;
   qa_completed_at?: string | null;
+  // NER tasks: flat [start, end, ...] token offsets in UTF-16 units; single task reads only
+  token_offsets?: number[] | null;
 };
 
 export type Invite = {